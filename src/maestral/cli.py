@@ -11,7 +11,17 @@ import os
 import os.path as osp
 import functools
 import time
-from typing import Optional, Dict, List, Tuple, Callable, Union, cast, TYPE_CHECKING
+from typing import (
+    Optional,
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Callable,
+    Union,
+    cast,
+    TYPE_CHECKING,
+)
 
 # external imports
 import click
@@ -214,6 +224,33 @@ def check_for_fatal_errors(m: Union["MaestralProxy", "Maestral"]) -> bool:
         return False
 
 
+def echo_status(info: Dict[str, Any]) -> None:
+    """
+    Prints the status of a Maestral daemon to the command line.
+
+    :param info: Dictionary with the keys "email", "account_type", "usage", "status",
+        "transfers", "transfer_limit", "throughput" and "sync_errors".
+    """
+
+    from .utils import natural_size
+
+    n_errors = info["sync_errors"]
+    color = "red" if n_errors > 0 else "green"
+    n_errors_str = click.style(str(n_errors), fg=color)
+    throughput = natural_size(info["throughput"])
+
+    cli.echo("")
+    cli.echo(f"Account:      {info['email']} ({info['account_type']})")
+    cli.echo(f"Usage:        {info['usage']}")
+    cli.echo(f"Status:       {info['status']}")
+    cli.echo(
+        f"Transfers:    {info['transfers']} active, "
+        f"limit {info['transfer_limit']} ({throughput}/s)"
+    )
+    cli.echo(f"Sync errors:  {n_errors_str}")
+    cli.echo("")
+
+
 def convert_py_errors(func: Callable) -> Callable:
     """
     Decorator that catches a MaestralApiError and prints a formatted error message to
@@ -923,31 +960,56 @@ def sharelink_list(dropbox_path: Optional[str], config_name: str) -> None:
 @convert_py_errors
 def status(config_name: str) -> None:
 
-    from .daemon import MaestralProxy, CommunicationError
+    from .statusboard import read_status_board, status_board_path
 
     check_for_updates()
 
+    # Read the status published by the daemon without connecting to it. This is only
+    # possible if there are no errors to list.
+    board = read_status_board(status_board_path(config_name))
+
+    if board and board["sync_errors"] == 0 and board["fatal_errors"] == 0:
+
+        from .config import MaestralState
+
+        state = MaestralState(config_name)
+
+        echo_status(
+            dict(
+                email=state.get("account", "email"),
+                account_type=state.get("account", "type").capitalize(),
+                usage=state.get("account", "usage"),
+                status=board["status"],
+                transfers=board["transfers"],
+                transfer_limit=board["transfer_limit"],
+                throughput=board["throughput"],
+                sync_errors=0,
+            )
+        )
+        return
+
+    from .daemon import MaestralProxy, CommunicationError
+
     try:
         with MaestralProxy(config_name) as m:
 
-            email = m.get_state("account", "email")
-            account_type = m.get_state("account", "type").capitalize()
-            usage = m.get_state("account", "usage")
-            status_info = m.status
-            n_errors = len(m.sync_errors)
-            color = "red" if n_errors > 0 else "green"
-            n_errors_str = click.style(str(n_errors), fg=color)
-
-            cli.echo("")
-            cli.echo(f"Account:      {email} ({account_type})")
-            cli.echo(f"Usage:        {usage}")
-            cli.echo(f"Status:       {status_info}")
-            cli.echo(f"Sync errors:  {n_errors_str}")
-            cli.echo("")
+            concurrency = m.transfer_concurrency
+            sync_errors = m.sync_errors
 
-            check_for_fatal_errors(m)
+            echo_status(
+                dict(
+                    email=m.get_state("account", "email"),
+                    account_type=m.get_state("account", "type").capitalize(),
+                    usage=m.get_state("account", "usage"),
+                    status=m.status,
+                    transfers=concurrency["in_flight"],
+                    transfer_limit=concurrency["limit"],
+                    throughput=concurrency["throughput"],
+                    sync_errors=len(sync_errors),
+                )
+            )
 
-            sync_errors = m.sync_errors
+            check_for_fatal_errors(m)
 
             if len(sync_errors) > 0:
 
@@ -970,27 +1032,35 @@ def status(config_name: str) -> None:
 @main.command(
     section="Information",
     help="""
-Show the sync status of a local file or folder.
+Show the sync status of local files or folders.
 
 Returned value will be 'uploading', 'downloading', 'up to date', 'error', or 'unwatched'
 (for files outside of the Dropbox directory). This will always be 'unwatched' if syncing
 is paused. This command can be used to for instance to query information for a plugin to
-a file-manager.
+a file-manager. When multiple paths are given, their statuses are printed on separate
+lines in the same order.
 """,
 )
-@click.argument("local_path", type=click.Path(exists=True, resolve_path=True))
+@click.argument(
+    "local_paths",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, resolve_path=True),
+)
 @existing_config_option
-def filestatus(local_path: str, config_name: str) -> None:
+def filestatus(local_paths: List[str], config_name: str) -> None:
 
     from .daemon import MaestralProxy, CommunicationError
 
     try:
         with MaestralProxy(config_name) as m:
-            stat = m.get_file_status(local_path)
-            cli.echo(stat)
+            stats = m.get_file_status_batch(list(local_paths))
 
     except CommunicationError:
-        cli.echo("unwatched")
+        stats = ["unwatched"] * len(local_paths)
+
+    for stat in stats:
+        cli.echo(stat)
 
 
 @main.command(section="Information", help="Live view of all items being synced.")
@@ -1013,22 +1083,44 @@ def activity(config_name: str) -> None:
                 curses.use_default_colors()  # don't change terminal background
                 screen.nodelay(1)  # sets `screen.getch()` to non-blocking
 
+                cursor = ""
+                items: Dict[str, Dict] = {}
+
                 while True:
 
+                    # wait for changes to the activity
+                    changes = m.get_activity_changes(cursor, timeout=1)
+                    cursor = changes["cursor"]
+
+                    if changes["reset"]:
+                        items.clear()
+
+                    for event in changes["changed"]:
+                        items[cast(str, event["local_path"])] = event
+
+                    for local_path in changes["removed"]:
+                        items.pop(local_path, None)
+
                     height, width = screen.getmaxyx()
 
                     # create header
                     lines = [
-                        f"Status: {m.status}, Sync errors: {len(m.sync_errors)}",
+                        f"Status: {changes['status']}, "
+                        f"Sync errors: {changes['sync_errors']}",
                         "",
                     ]
 
-                    # create table
+                    # create table, items being transferred first, positions are only
+                    # updated when an item changes and the order is approximate
+                    activity = sorted(
+                        items.values(), key=lambda e: e.get("queue_position") or 0
+                    )
+
                     filenames = []
                     states = []
                     col_len = 4
 
-                    for event in m.get_activity(limit=height - 3):
+                    for event in activity[: height - 3]:
 
                         dbx_path = cast(str, event["dbx_path"])
                         direction = cast(str, event["direction"])
@@ -1050,6 +1142,8 @@ def activity(config_name: str) -> None:
                                 states.append("uploading")
                             elif state == "syncing" and direction == "down":
                                 states.append("downloading")
+                            elif event.get("queue_position"):
+                                states.append(f"{state} #{event['queue_position']}")
                             else:
                                 states.append(state)
 
@@ -1070,8 +1164,6 @@ def activity(config_name: str) -> None:
                     key = screen.getch()
                     if key == ord("q"):
                         break
-                    elif key < 0:
-                        time.sleep(1)
 
             # enter curses event loop
             curses.wrapper(curses_loop)
@@ -1826,7 +1918,12 @@ Currently available config keys are:
 - keyring: the keyring backend to use (full path of the class)
 - reindex_interval: the interval in seconds for full reindexing
 - max_cpu_percent: maximum CPU usage target per core
+- max_upload_rate: upload limit in bytes / sec, 0 for unlimited
+- max_download_rate: download limit in bytes / sec, 0 for unlimited
+- bandwidth_profiles: time-of-day profiles for upload and download limits
+- priority_folders: list of folders to sync before other items
 - keep_history: the sync history to keep in seconds
+- index_cache_size: number of index entries and file hashes kept in memory
 - upload: if upload sync is enabled
 - download: if download sync is enabled
 """,
@@ -11,6 +11,10 @@ import os.path as osp
 import time
 import logging
 import contextlib
+import json
+import hashlib
+from threading import Event, Lock
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import (
     Callable,
@@ -19,9 +23,11 @@ from typing import (
     Type,
     Tuple,
     List,
+    Dict,
     Iterator,
     TypeVar,
     Optional,
+    BinaryIO,
     TYPE_CHECKING,
 )
 
@@ -66,14 +72,22 @@ from .errors import (
     TokenRevokedError,
     CursorResetError,
     DropboxServerError,
+    RateLimitError,
     NotLinkedError,
     InvalidDbidError,
     SharedLinkError,
     DropboxConnectionError,
+    DataCorruptionError,
 )
-from .config import MaestralState
+from .config import MaestralConfig, MaestralState
 from .constants import DROPBOX_APP_KEY
 from .utils import natural_size, chunks, clamp
+from .utils.throttling import (
+    BandwidthLimiter,
+    BackoffCoordinator,
+    ConcurrencyController,
+)
+from .utils.content_hasher import DropboxContentHasher, StreamHasher
 
 if TYPE_CHECKING:
     from .database import SyncEvent
@@ -100,6 +114,7 @@ WriteErrorType = Type[
         FolderConflictError,
         ConflictError,
         FileReadError,
+        RateLimitError,
     ]
 ]
 LookupErrorType = Type[
@@ -134,6 +149,78 @@ CONNECTION_ERRORS = (
     ConnectionError,
 )
 
+LONGPOLL_ENDPOINT = "files/list_folder/longpoll"
+
+logger = logging.getLogger(__name__)
+
+backoff_coordinator = BackoffCoordinator()
+"""Process-wide coordinator for rate limits and backoff, shared by all clients."""
+
+
+class _CoordinatedDropbox(Dropbox):
+    """Dropbox SDK client which coordinates backoff with all other instances
+
+    Every request waits for any backoff in :data:`backoff_coordinator`. Rate-limit
+    errors are reported to the coordinator, which extends the backoff for all
+    instances, and the request is retried once the backoff has expired. This replaces
+    the SDK's own retry on rate-limit errors which only pauses the failing instance.
+
+    API errors for too many write operations in the user's Dropbox are reported to the
+    coordinator as well but are raised to the caller instead of being retried.
+    """
+
+    def request_json_string(
+        self,
+        host,
+        func_name,
+        route_style,
+        request_json_arg,
+        auth_type,
+        request_binary,
+        timeout=None,
+    ):
+        while True:
+            backoff_coordinator.wait(func_name)
+
+            try:
+                res = super().request_json_string(
+                    host,
+                    func_name,
+                    route_style,
+                    request_json_arg,
+                    auth_type,
+                    request_binary,
+                    timeout=timeout,
+                )
+            except exceptions.RateLimitError as exc:
+                delay = backoff_coordinator.record_rate_limit(func_name, exc.backoff)
+                logger.info("Rate limit on %s: retrying in %.1f sec", func_name, delay)
+            except exceptions.ApiError as exc:
+                if _is_too_many_write_operations(exc.error):
+                    backoff_coordinator.record_rate_limit(func_name)
+                raise
+            else:
+                backoff_coordinator.record_success(func_name)
+                return res
+
+
+def _is_too_many_write_operations(error: Any) -> bool:
+    """
+    Checks if an error returned by the Dropbox API, or any error nested in it, reports
+    too many write operations in the user's Dropbox.
+
+    :param error: Error from :attr:`dropbox.exceptions.ApiError.error`.
+    :returns: Whether the error is caused by write contention.
+    """
+
+    while error is not None:
+        if getattr(error, "_tag", None) == "too_many_write_operations":
+            return True
+        # Unions store nested errors as their value, UploadWriteFailed as its reason.
+        error = getattr(error, "_value", None) or getattr(error, "reason", None)
+
+    return False
+
 
 @contextlib.contextmanager
 def convert_api_errors(
@@ -169,6 +256,159 @@ def convert_api_errors(
             raise os_to_maestral_error(exc, dbx_path, local_path)
 
 
+def _preallocate(fd: int, size: int) -> None:
+    """
+    Reserves disk space for a file of the given size where supported by the platform
+    and file system. This fails early with ENOSPC if there is not enough space left
+    instead of partway through writing.
+
+    :param fd: File descriptor of the file.
+    :param size: Size in bytes to reserve.
+    :raises OSError: if there is not enough space left on the drive.
+    """
+
+    if size <= 0 or not hasattr(os, "posix_fallocate"):
+        return
+
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except OSError as exc:
+        # Ignore file systems which don't support preallocation.
+        if exc.errno not in (errno.EOPNOTSUPP, errno.EINVAL, errno.ENOSYS):
+            raise
+
+
+class _DownloadState:
+    """
+    Progress of a download in segments
+
+    Each segment is stored as a list of [start, end, offset] where offset is the
+    position up to which data has been written. Segments hash the blocks of the Dropbox
+    content hash which they contain as they are written. The state can be saved to a
+    JSON file to resume the download later.
+
+    :param path: Path of the JSON file to save the state to. If None, the state is not
+        persisted.
+    :param rev: Revision of the file which is downloaded.
+    :param size: Size of the file.
+    :param ranges: List of (start, end) tuples for each segment. Segments must start at
+        block boundaries of the content hash.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        rev: str,
+        size: int,
+        ranges: List[Tuple[int, int]],
+    ) -> None:
+        self.path = path
+        self.rev = rev
+        self.size = size
+        self.segments = [[start, end, start] for start, end in ranges]
+        self.block_hashes: Dict[int, bytes] = {}
+        self.last_saved = time.monotonic()
+        self._lock = Lock()
+
+    @property
+    def completed(self) -> int:
+        """The number of bytes which have been written."""
+        return sum(offset - start for start, _, offset in self.segments)
+
+    def content_hash(self) -> Optional[str]:
+        """
+        Computes the Dropbox content hash from the hashes of individual blocks.
+
+        :returns: Content hash or None if not all blocks have been hashed.
+        """
+
+        n_blocks = -(-self.size // DropboxContentHasher.BLOCK_SIZE)
+
+        try:
+            block_hashes = [self.block_hashes[i] for i in range(n_blocks)]
+        except KeyError:
+            return None
+
+        return hashlib.sha256(b"".join(block_hashes)).hexdigest()
+
+    @classmethod
+    def load(cls, path: str, rev: str, size: int) -> Optional["_DownloadState"]:
+        """
+        Loads a saved state.
+
+        :param path: Path of the JSON file.
+        :param rev: Revision of the file to download.
+        :param size: Size of the file to download.
+        :returns: The saved state or None if there is no valid state for the given
+            revision and size.
+        """
+
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data["rev"] != rev or data["size"] != size:
+                return None
+            state = cls(path, rev, size, [])
+            state.segments = [[int(i) for i in seg[:3]] for seg in data["segments"]]
+            state.block_hashes = {
+                int(i): bytes.fromhex(h) for i, h in data["block_hashes"].items()
+            }
+            if not all(0 <= s <= o <= e <= size for s, e, o in state.segments):
+                return None
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+        return state
+
+    def save(self, fd: int) -> None:
+        """
+        Flushes written data to disk and saves the state. Does nothing if the state is
+        not persisted. Offsets of incomplete segments are saved rounded down to the last
+        completed block such that a resumed segment starts with a new block.
+
+        :param fd: File descriptor of the download destination.
+        """
+
+        with self._lock:
+
+            self.last_saved = time.monotonic()
+
+            if not self.path:
+                return
+
+            block_size = DropboxContentHasher.BLOCK_SIZE
+
+            # Only record offsets for data which has reached the disk. Block hashes
+            # are recorded before offsets are advanced and are read afterwards.
+            segments = [
+                [s, e, o if o == e else o // block_size * block_size]
+                for s, e, o in self.segments
+            ]
+            block_hashes = {i: h.hex() for i, h in self.block_hashes.copy().items()}
+            os.fsync(fd)
+
+            tmp_path = self.path + ".tmp"
+            data = {
+                "rev": self.rev,
+                "size": self.size,
+                "segments": segments,
+                "block_hashes": block_hashes,
+            }
+
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+
+            os.replace(tmp_path, self.path)
+
+    def delete(self) -> None:
+        """Deletes the saved state, if any."""
+
+        if self.path:
+            with self._lock:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(self.path)
+
+
 class DropboxClient:
     """Client for the Dropbox SDK
 
@@ -200,6 +440,13 @@ class DropboxClient:
 
     _dbx: Optional[Dropbox]
 
+    _download_min_chunk_size = 2 ** 16
+    _download_max_chunk_size = 2 ** 22
+    _download_parallel_threshold = 2 ** 26
+    _download_segment_count = 4
+    _download_state_interval = 5.0
+    _progress_interval = 0.1
+
     def __init__(
         self,
         config_name: str,
@@ -214,10 +461,22 @@ class DropboxClient:
 
         self._timeout = timeout
         self._session = session or create_session()
-        self._backoff_until = 0
         self._dbx = None
+        self._conf = MaestralConfig(config_name)
         self._state = MaestralState(config_name)
 
+        self._upload_limiter = BandwidthLimiter(
+            self._conf.get("sync", "max_upload_rate"), direction="upload"
+        )
+        self._download_limiter = BandwidthLimiter(
+            self._conf.get("sync", "max_download_rate"), direction="download"
+        )
+        self._load_bandwidth_profiles(self._conf.get("sync", "bandwidth_profiles"))
+
+        # Optional controller for the number of concurrent transfers. If set, the
+        # segments of a parallel download take additional transfer slots from it.
+        self.concurrency: Optional[ConcurrencyController] = None
+
     # ---- linking API -----------------------------------------------------------------
 
     @property
@@ -321,7 +580,7 @@ class DropboxClient:
 
         if refresh_token or access_token:
 
-            self._dbx = Dropbox(
+            self._dbx = _CoordinatedDropbox(
                 oauth2_refresh_token=refresh_token,
                 oauth2_access_token=access_token,
                 oauth2_access_token_expiration=access_token_expiration,
@@ -338,6 +597,75 @@ class DropboxClient:
         """The unique Dropbox ID of the linked account"""
         return self.auth.account_id
 
+    @property
+    def backoff_coordinator(self) -> BackoffCoordinator:
+        """The process-wide coordinator for rate limits and backoff (read only)."""
+        return backoff_coordinator
+
+    # ---- bandwidth limits ------------------------------------------------------------
+
+    @property
+    def max_upload_rate(self) -> float:
+        """Default upload rate limit in bytes per second, shared between all clones of
+        this client. Zero means unlimited. Changes are saved to the config file."""
+        return self._upload_limiter.rate
+
+    @max_upload_rate.setter
+    def max_upload_rate(self, rate: float) -> None:
+        """Setter: max_upload_rate"""
+        self._upload_limiter.rate = rate
+        self._conf.set("sync", "max_upload_rate", float(rate))
+
+    @property
+    def max_download_rate(self) -> float:
+        """Default download rate limit in bytes per second, shared between all clones of
+        this client. Zero means unlimited. Changes are saved to the config file."""
+        return self._download_limiter.rate
+
+    @max_download_rate.setter
+    def max_download_rate(self, rate: float) -> None:
+        """Setter: max_download_rate"""
+        self._download_limiter.rate = rate
+        self._conf.set("sync", "max_download_rate", float(rate))
+
+    @property
+    def bandwidth_profiles(self) -> List[Dict[str, Any]]:
+        """
+        Time-of-day profiles for upload and download rate limits. Each profile is a
+        dict with the keys "start" and "end" in the format "HH:MM" and the keys
+        "upload" and "download" for the respective rate limits in bytes per second.
+        Outside of all profiles, :attr:`max_upload_rate` and :attr:`max_download_rate`
+        apply. They also apply during profiles which omit the respective key. Changes
+        are saved to the config file.
+
+        :raises ValueError: when setting profiles in an invalid format.
+        """
+        return self._upload_limiter.profiles
+
+    @bandwidth_profiles.setter
+    def bandwidth_profiles(self, profiles: List[Dict[str, Any]]) -> None:
+        """Setter: bandwidth_profiles"""
+        try:
+            # Validate for both directions before changing either limiter.
+            for limiter in (self._upload_limiter, self._download_limiter):
+                BandwidthLimiter(profiles=profiles, direction=limiter.direction)
+        except (KeyError, TypeError, AttributeError) as exc:
+            raise ValueError(f"Invalid bandwidth profiles: {exc}")
+
+        self._upload_limiter.profiles = profiles
+        self._download_limiter.profiles = profiles
+
+        self._conf.set("sync", "bandwidth_profiles", profiles)
+
+    def _load_bandwidth_profiles(self, profiles: List[Dict[str, Any]]) -> None:
+        try:
+            self._upload_limiter.profiles = profiles
+            self._download_limiter.profiles = profiles
+        except (KeyError, TypeError, AttributeError, ValueError) as exc:
+            self._logger.error("Ignoring invalid bandwidth profiles: %s", exc)
+            self._upload_limiter.profiles = []
+            self._download_limiter.profiles = []
+
     # ---- session management ----------------------------------------------------------
 
     def close(self) -> None:
@@ -378,6 +706,11 @@ class DropboxClient:
         if self._dbx:
             client._dbx = self._dbx.clone(session=session)
 
+        # Share bandwidth limits between all clones.
+        client._upload_limiter = self._upload_limiter
+        client._download_limiter = self._download_limiter
+        client.concurrency = self.concurrency
+
         return client
 
     def clone_with_new_session(self) -> "DropboxClient":
@@ -508,20 +841,37 @@ class DropboxClient:
         dbx_path: str,
         local_path: str,
         sync_event: Optional["SyncEvent"] = None,
+        resumable: bool = False,
         **kwargs,
     ) -> files.FileMetadata:
         """
         Downloads a file from Dropbox to given local path.
 
+        Files larger than :attr:`_download_parallel_threshold` are downloaded in
+        parallel segments with HTTP range requests. If ``resumable`` is ``True``, the
+        progress of those segments is periodically saved to a sidecar file
+        ``<local_path>.json``. If the download is interrupted, the partial file and its
+        sidecar are kept and a later call with the same arguments will resume where the
+        previous download stopped, provided that the file revision is unchanged.
+
+        The content hash of the data is computed while it is written and compared
+        against the content hash reported by Dropbox. The returned metadata therefore
+        describes the data on disk.
+
         :param dbx_path: Path to file on Dropbox or rev number.
         :param local_path: Path to local download destination.
         :param sync_event: If given, the sync event will be updated with the number of
             downloaded bytes.
+        :param resumable: Whether to keep the progress of interrupted downloads.
         :param kwargs: Keyword arguments for the Dropbox API files_download endpoint.
         :returns: Metadata of downloaded item.
+        :raises DataCorruptionError: if the downloaded data does not match the content
+            hash from Dropbox.
         """
 
-        with convert_api_errors(dbx_path=dbx_path):
+        state: Optional[_DownloadState] = None
+
+        with convert_api_errors(dbx_path=dbx_path, local_path=local_path):
 
             dst_path_directory = osp.dirname(local_path)
             try:
@@ -531,14 +881,71 @@ class DropboxClient:
 
             md, http_resp = self.dbx.files_download(dbx_path, **kwargs)
 
-            chunksize = 2 ** 13
+            if md.size < self._download_parallel_threshold:
+
+                hasher = DropboxContentHasher()
+
+                try:
+                    with open(local_path, "wb") as f:
+                        with contextlib.closing(http_resp):
+                            _preallocate(f.fileno(), md.size)
+                            written = self._write_stream(
+                                http_resp, StreamHasher(f, hasher), md.size, sync_event
+                            )
+
+                        if written != md.size:
+                            # Release any preallocated space which was not used.
+                            f.truncate(written)
+                except BaseException:
+                    # Small downloads cannot be resumed, don't leave partial data.
+                    with contextlib.suppress(FileNotFoundError):
+                        os.unlink(local_path)
+                    raise
+
+                content_hash = hasher.hexdigest()
+
+            else:
+
+                state_path = local_path + ".json" if resumable else None
+
+                if state_path and osp.isfile(local_path):
+                    state = _DownloadState.load(state_path, md.rev, md.size)
+
+                if not state:
+                    state = _DownloadState(
+                        state_path, md.rev, md.size, self._download_ranges(md.size)
+                    )
+
+                    with open(local_path, "wb") as f:
+                        _preallocate(f.fileno(), md.size)
 
-            with open(local_path, "wb") as f:
-                with contextlib.closing(http_resp):
-                    for c in http_resp.iter_content(chunksize):
-                        f.write(c)
-                        if sync_event:
-                            sync_event.completed = f.tell()
+                try:
+                    self._download_segments(
+                        dbx_path, local_path, state, http_resp, sync_event, **kwargs
+                    )
+                except BaseException as exc:
+                    # Discard partial data if the download cannot be resumed or if the
+                    # revision can no longer be downloaded.
+                    if not resumable or isinstance(exc, exceptions.ApiError):
+                        state.delete()
+                        with contextlib.suppress(FileNotFoundError):
+                            os.unlink(local_path)
+                    raise
+                else:
+                    state.delete()
+
+                content_hash = state.content_hash()
+
+            if md.content_hash and content_hash != md.content_hash:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(local_path)
+                raise DataCorruptionError(
+                    "Could not download file",
+                    "The downloaded data does not match the file on Dropbox. Please "
+                    "try again later.",
+                    dbx_path=dbx_path,
+                    local_path=local_path,
+                )
 
         # Dropbox SDK provides naive datetime in UTC.
         client_mod = md.client_modified.replace(tzinfo=timezone.utc)
@@ -551,6 +958,290 @@ class DropboxClient:
 
         return md
 
+    def _download_ranges(self, size: int) -> List[Tuple[int, int]]:
+        """
+        Splits a file into ranges for a parallel download. Range boundaries are aligned
+        to the block size of the Dropbox content hash such that each segment can hash
+        its own blocks.
+
+        :param size: Size of the file.
+        :returns: List of (start, end) tuples, excluding the end.
+        """
+
+        alignment = DropboxContentHasher.BLOCK_SIZE
+        n_blocks = -(-size // alignment)
+        segment_size = -(-n_blocks // self._download_segment_count) * alignment
+
+        return [
+            (start, min(start + segment_size, size))
+            for start in range(0, size, segment_size)
+        ]
+
+    def _download_range(
+        self, dbx_path: str, start: int, end: int, **kwargs
+    ) -> Tuple[files.FileMetadata, requests.Response]:
+        """
+        Requests a byte range of a file from Dropbox.
+
+        :param dbx_path: Path to file on Dropbox or rev number.
+        :param start: Start of the range.
+        :param end: End of the range, excluding the end.
+        :param kwargs: Keyword arguments for the Dropbox API files_download endpoint.
+        :returns: Metadata of the file and the streaming response.
+        :raises DropboxServerError: if the server does not return a partial response.
+        """
+
+        dbx = self.dbx.clone(headers={"Range": f"bytes={start}-{end - 1}"})
+        md, http_resp = dbx.files_download(dbx_path, **kwargs)
+
+        if http_resp.status_code != 206:
+            http_resp.close()
+            raise DropboxServerError(
+                "Could not download file",
+                "Dropbox servers did not accept a range request.",
+                dbx_path=dbx_path,
+            )
+
+        return md, http_resp
+
+    def _download_segments(
+        self,
+        dbx_path: str,
+        local_path: str,
+        state: "_DownloadState",
+        http_resp: requests.Response,
+        sync_event: Optional["SyncEvent"] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Downloads all incomplete segments of a file in parallel threads. If any segment
+        fails, the remaining ones are stopped and the progress is saved before the error
+        is raised.
+
+        If :attr:`concurrency` is set, each segment after the first one only runs in
+        parallel if it can take an additional transfer slot. Slots are not waited for
+        since the download itself may already hold a slot.
+
+        :param dbx_path: Path to file on Dropbox or rev number.
+        :param local_path: Path of the preallocated local file.
+        :param state: Download state with the segments to download.
+        :param http_resp: Response streaming the entire file. It will be used for the
+            first segment if that one has not been started yet and closed otherwise.
+        :param sync_event: If given, the sync event will be updated with the number of
+            downloaded bytes.
+        :param kwargs: Keyword arguments for the Dropbox API files_download endpoint.
+        """
+
+        abort = Event()
+        controller = self.concurrency
+        slots = 0
+
+        if controller:
+            while slots < len(state.segments) - 1 and controller.try_acquire():
+                slots += 1
+        else:
+            slots = len(state.segments) - 1
+
+        try:
+            fd = os.open(local_path, os.O_WRONLY)
+
+            try:
+                with ThreadPoolExecutor(
+                    max_workers=1 + slots,
+                    thread_name_prefix="maestral-download-segment",
+                ) as executor:
+
+                    futures = []
+                    use_resp = state.segments[0][2] == 0
+
+                    if not use_resp:
+                        http_resp.close()
+
+                    for n in range(len(state.segments)):
+                        resp = http_resp if n == 0 and use_resp else None
+                        futures.append(
+                            executor.submit(
+                                self._download_segment,
+                                dbx_path,
+                                fd,
+                                state,
+                                n,
+                                resp,
+                                sync_event,
+                                abort,
+                                **kwargs,
+                            )
+                        )
+
+                    try:
+                        for future in futures:
+                            future.result()
+                    except BaseException:
+                        abort.set()
+                        raise
+            finally:
+                try:
+                    state.save(fd)
+                finally:
+                    os.close(fd)
+        finally:
+            if controller:
+                for _ in range(slots):
+                    controller.release()
+
+    def _download_segment(
+        self,
+        dbx_path: str,
+        fd: int,
+        state: "_DownloadState",
+        n: int,
+        http_resp: Optional[requests.Response],
+        sync_event: Optional["SyncEvent"],
+        abort: Event,
+        **kwargs,
+    ) -> None:
+        """
+        Downloads the remainder of a single segment and writes it at its offset.
+
+        :param dbx_path: Path to file on Dropbox or rev number.
+        :param fd: File descriptor of the local file, opened for writing.
+        :param state: Download state.
+        :param n: Index of the segment in :attr:`_DownloadState.segments`.
+        :param http_resp: Response streaming the file from the segment start. If not
+            given, the remainder of the segment will be requested from Dropbox.
+        :param sync_event: If given, the sync event will be updated with the number of
+            downloaded bytes.
+        :param abort: Event which is set when other segments have failed.
+        """
+
+        start, end, offset = state.segments[n]
+
+        if offset >= end or abort.is_set():
+            return
+
+        if not http_resp:
+            _, http_resp = self._download_range(dbx_path, offset, end, **kwargs)
+
+        last_update = time.monotonic()
+        block_size = DropboxContentHasher.BLOCK_SIZE
+        # Resumed segments always start at a block boundary.
+        block_hasher = hashlib.sha256()
+
+        with contextlib.closing(http_resp):
+            for c in http_resp.iter_content(self._download_chunk_size(end - start)):
+
+                if abort.is_set():
+                    return
+
+                # The response may extend beyond the end of the segment.
+                c = c[: end - offset]
+                self._download_limiter.acquire(len(c))
+
+                view = memoryview(c)
+                pos = 0
+
+                while pos < len(view):
+                    pos += os.pwrite(fd, view[pos:], offset + pos)
+
+                # Hash the chunk block by block and record completed blocks before
+                # advancing the offset.
+                pos = 0
+
+                while pos < len(c):
+                    block_start = (offset + pos) // block_size * block_size
+                    block_end = min(block_start + block_size, end)
+                    n_bytes = min(block_end - offset - pos, len(c) - pos)
+                    block_hasher.update(view[pos : pos + n_bytes])
+                    pos += n_bytes
+
+                    if offset + pos == block_end:
+                        block_index = (block_end - 1) // block_size
+                        state.block_hashes[block_index] = block_hasher.digest()
+                        block_hasher = hashlib.sha256()
+
+                offset += len(c)
+                state.segments[n][2] = offset
+
+                now = time.monotonic()
+
+                if now - last_update >= self._progress_interval:
+                    if sync_event:
+                        sync_event.completed = state.completed
+                    last_update = now
+
+                if now - state.last_saved >= self._download_state_interval:
+                    state.save(fd)
+
+                if offset >= end:
+                    break
+
+        if sync_event:
+            sync_event.completed = state.completed
+
+        if offset < end:
+            raise ConnectionError("Download ended prematurely")
+
+    def _download_chunk_size(self, size: int) -> int:
+        """
+        Returns the chunk size for reading a download stream. The chunk size grows with
+        the file size from 64 KiB to 4 MiB. While a download rate limit is active, it is
+        limited to the data which can be received in about 0.1 sec such that the limiter
+        can pace the stream smoothly. Chunk sizes are always powers of two.
+
+        :param size: Size of the file to download.
+        :returns: Chunk size in bytes.
+        """
+
+        chunk_size = clamp(
+            size // 64, self._download_min_chunk_size, self._download_max_chunk_size
+        )
+
+        download_rate = self._download_limiter.current_rate
+
+        if download_rate > 0:
+            chunk_size = min(chunk_size, max(int(download_rate / 10), 2 ** 13))
+
+        return 1 << (chunk_size.bit_length() - 1)
+
+    def _write_stream(
+        self,
+        http_resp: requests.Response,
+        f: BinaryIO,
+        size: int,
+        sync_event: Optional["SyncEvent"] = None,
+    ) -> int:
+        """
+        Writes the content of a streaming HTTP response to a file. The number of written
+        bytes is counted instead of queried from the file and the progress of the sync
+        event is updated at most every :attr:`_progress_interval` seconds.
+
+        :param http_resp: Streaming response to read from.
+        :param f: File object to write to.
+        :param size: Expected size of the content, used to pick the chunk size.
+        :param sync_event: If given, the sync event will be updated with the number of
+            downloaded bytes.
+        :returns: Number of bytes written.
+        """
+
+        written = 0
+        last_update = time.monotonic()
+
+        for c in http_resp.iter_content(self._download_chunk_size(size)):
+            self._download_limiter.acquire(len(c))
+            f.write(c)
+            written += len(c)
+
+            if sync_event:
+                now = time.monotonic()
+                if now - last_update >= self._progress_interval:
+                    sync_event.completed = written
+                    last_update = now
+
+        if sync_event:
+            sync_event.completed = written
+
+        return written
+
     def upload(
         self,
         local_path: str,
@@ -566,12 +1257,19 @@ class DropboxClient:
         :param dbx_path: Path to save file on Dropbox.
         :param kwargs: Keyword arguments for Dropbox SDK files_upload.
         :param chunk_size: Maximum size for individual uploads. If larger than 150 MB,
-            it will be set to 150 MB.
+            it will be set to 150 MB. When an upload rate limit is active, chunks are
+            limited to the data which can be uploaded in about one second, but no less
+            than 100 kB, to avoid long bursts at full speed.
         :param sync_event: If given, the sync event will be updated with the number of
             downloaded bytes.
         :returns: Metadata of uploaded file.
         """
 
+        upload_rate = self._upload_limiter.current_rate
+
+        if upload_rate > 0:
+            chunk_size = min(chunk_size, int(upload_rate))
+
         chunk_size = clamp(chunk_size, 10 ** 5, 150 * 10 ** 6)
 
         with convert_api_errors(dbx_path=dbx_path, local_path=local_path):
@@ -584,8 +1282,10 @@ class DropboxClient:
 
             if size <= chunk_size:
                 with open(local_path, "rb") as f:
+                    data = f.read()
+                    self._upload_limiter.acquire(len(data))
                     md = self.dbx.files_upload(
-                        f.read(), dbx_path, client_modified=mtime_dt, **kwargs
+                        data, dbx_path, client_modified=mtime_dt, **kwargs
                     )
                     if sync_event:
                         sync_event.completed = f.tell()
@@ -596,6 +1296,7 @@ class DropboxClient:
                 # the future.
                 with open(local_path, "rb") as f:
                     data = f.read(chunk_size)
+                    self._upload_limiter.acquire(len(data))
                     session_start = self.dbx.files_upload_session_start(data)
                     uploaded = f.tell()
 
@@ -615,6 +1316,7 @@ class DropboxClient:
                             if size - f.tell() <= chunk_size:
                                 # Finish upload session and return metadata.
                                 data = f.read(chunk_size)
+                                self._upload_limiter.acquire(len(data))
                                 md = self.dbx.files_upload_session_finish(
                                     data, cursor, commit
                                 )
@@ -624,6 +1326,7 @@ class DropboxClient:
                             else:
                                 # Append to upload session.
                                 data = f.read(chunk_size)
+                                self._upload_limiter.acquire(len(data))
                                 self.dbx.files_upload_session_append_v2(data, cursor)
 
                                 uploaded = f.tell()
@@ -722,12 +1425,15 @@ class DropboxClient:
                 elif res.is_failed():
                     error = res.get_failed()
                     if error.is_too_many_write_operations():
+                        backoff_coordinator.record_rate_limit(
+                            "files/delete_batch/check"
+                        )
                         title = "Could not delete items"
                         text = (
                             "There are too many write operations happening in your "
                             "Dropbox. Please try again later."
                         )
-                        raise SyncError(title, text)
+                        raise RateLimitError(title, text)
 
         for i, entry in enumerate(res_entries):
             if entry.is_success():
@@ -739,6 +1445,8 @@ class DropboxClient:
                     user_message_locale="",
                     request_id="",
                 )
+                if _is_too_many_write_operations(exc.error):
+                    backoff_coordinator.record_rate_limit("files/delete_batch")
                 sync_err = dropbox_to_maestral_error(exc, dbx_path=entries[i][0])
                 result_list.append(sync_err)
 
@@ -764,6 +1472,23 @@ class DropboxClient:
             )
             return res.metadata
 
+    def copy(self, dbx_path: str, new_path: str, **kwargs) -> files.Metadata:
+        """
+        Copies files or folders on Dropbox. The copy is created by Dropbox servers
+        without transferring any file content.
+
+        :param dbx_path: Path to file/folder on Dropbox.
+        :param new_path: Path on Dropbox to copy to.
+        :param kwargs: Keyword arguments for the Dropbox API files_copy_v2 endpoint.
+        :returns: Metadata of the copy.
+        """
+
+        with convert_api_errors(dbx_path=new_path):
+            res = self.dbx.files_copy_v2(
+                dbx_path, new_path, allow_shared_folder=True, **kwargs
+            )
+            return res.metadata
+
     def make_dir(self, dbx_path: str, **kwargs) -> files.FolderMetadata:
         """
         Creates a folder on Dropbox.
@@ -840,6 +1565,8 @@ class DropboxClient:
                     user_message_locale="",
                     request_id="",
                 )
+                if _is_too_many_write_operations(exc.error):
+                    backoff_coordinator.record_rate_limit("files/create_folder_batch")
                 sync_err = dropbox_to_maestral_error(exc, dbx_path=dbx_paths[i])
                 result_list.append(sync_err)
 
@@ -969,19 +1696,15 @@ class DropboxClient:
         if not 30 <= timeout <= 480:
             raise ValueError("Timeout must be in range [30, 480]")
 
-        # Honour last request to back off.
-        time_to_backoff = max(self._backoff_until - time.time(), 0)
-        time.sleep(time_to_backoff)
-
+        # Any backoff requested by a previous longpoll is honoured by the SDK client
+        # before sending the request.
         with convert_api_errors():
             res = self.dbx.files_list_folder_longpoll(last_cursor, timeout=timeout)
 
-        # Keep track of last longpoll, back off if requested by API.
+        # Back off if requested by API.
         if res.backoff:
             self._logger.debug("Backoff requested for %s sec", res.backoff)
-            self._backoff_until = time.time() + res.backoff + 5.0
-        else:
-            self._backoff_until = 0
+            backoff_coordinator.set_backoff(LONGPOLL_ENDPOINT, res.backoff + 5.0)
 
         return res.changes
 
@@ -1320,7 +2043,7 @@ def dropbox_to_maestral_error(
                     "There are too many write operations happening in your "
                     "Dropbox. Please try again later."
                 )
-                err_cls = SyncError
+                err_cls = RateLimitError
 
         elif isinstance(error, files.UploadError):
             title = "Could not upload file"
@@ -1356,7 +2079,7 @@ def dropbox_to_maestral_error(
                     "There are too many write operations happening in your "
                     "Dropbox. Please retry again later."
                 )
-                err_cls = SyncError
+                err_cls = RateLimitError
 
         elif isinstance(error, files.UploadSessionLookupError):
             title = "Could not upload file"
@@ -1577,6 +2300,12 @@ def dropbox_to_maestral_error(
         title = "Bad input to API call"
         text = exc.message
 
+    # ---- Rate limit errors -----------------------------------------------------------
+    elif isinstance(exc, exceptions.RateLimitError):
+        err_cls = RateLimitError
+        title = "Too many requests"
+        text = "Dropbox is limiting the rate of requests. Please try again later."
+
     # ---- Internal Dropbox error ------------------------------------------------------
     elif isinstance(exc, exceptions.InternalServerError):
         err_cls = DropboxServerError
@@ -1645,6 +2374,7 @@ def _get_write_error_msg(write_error: files.WriteError) -> Tuple[str, WriteError
             "There are too many write operations in your Dropbox. Please "
             "try again later."
         )
+        err_cls = RateLimitError
 
     return text, err_cls
 
@@ -38,7 +38,12 @@ DEFAULTS_CONFIG: DefaultsType = {
     "sync": {
         "reindex_interval": 60 * 60 * 24 * 14,  # default: every fortnight
         "max_cpu_percent": 20.0,  # max usage target per cpu core, default: 20%
+        "max_upload_rate": 0.0,  # upload limit in bytes / sec, default: unlimited
+        "max_download_rate": 0.0,  # download limit in bytes / sec, default: unlimited
+        "bandwidth_profiles": [],  # time-of-day profiles for upload / download limits
+        "priority_folders": [],  # folders to sync before other items
         "keep_history": 60 * 60 * 24 * 7,  # default: one week
+        "index_cache_size": 10000,  # index entries and hashes to keep in memory
         "upload": True,  # if download sync is enabled
         "download": True,  # if upload sync is enabled
     },
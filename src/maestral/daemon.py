@@ -464,7 +464,10 @@ def start_maestral_daemon(
         ExposedMaestral.stop_sync = oneway(ExposedMaestral.stop_sync)
         ExposedMaestral.shutdown_daemon = oneway(ExposedMaestral.shutdown_daemon)
 
-        maestral_daemon = ExposedMaestral(config_name, log_to_stderr=log_to_stderr)
+        # Publish the status for clients which do not connect to the daemon.
+        maestral_daemon = ExposedMaestral(
+            config_name, log_to_stderr=log_to_stderr, status_board=True
+        )
 
         if start_sync:
             dlogger.debug("Starting sync")
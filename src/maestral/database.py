@@ -25,7 +25,16 @@ from watchdog.events import (
 
 # local imports
 from .errors import SyncError
-from .utils.orm import Model, Column, SqlEnum, SqlInt, SqlString, SqlFloat, SqlPath
+from .utils.orm import (
+    Model,
+    Column,
+    SqlEnum,
+    SqlInt,
+    SqlString,
+    SqlFloat,
+    SqlPath,
+    SqlHex,
+)
 from .utils.path import normalize
 
 if TYPE_CHECKING:
@@ -99,12 +108,15 @@ class SyncEvent(Model):
         "_sync_time",
         "_dbx_id",
         "_dbx_path",
+        "_dbx_path_lower",
         "_local_path",
         "_dbx_path_from",
+        "_dbx_path_from_lower",
         "_local_path_from",
         "_rev",
         "_content_hash",
         "_change_type",
+        "_change_time",
         "_change_dbid",
         "_change_user_name",
         "_status",
@@ -471,7 +483,7 @@ class IndexEntry(Model):
     Dropbox metadata.
     """
 
-    dbx_id = Column(SqlString(), nullable=False)
+    dbx_id = Column(SqlString(), nullable=False, index=True)
     """The unique dropbox ID for the item."""
 
     item_type = Column(SqlEnum(ItemType), nullable=False)
@@ -482,13 +494,13 @@ class IndexEntry(Model):
     The last time a local change was uploaded. Should be the ctime of the local item.
     """
 
-    rev = Column(SqlString(), nullable=False)
+    rev = Column(SqlHex(), nullable=False)
     """The file revision. Will be ``'folder'`` for folders."""
 
-    content_hash = Column(SqlString())
+    content_hash = Column(SqlHex(), index=True)
     """
     A hash representing the file content. Will be ``'folder'`` for folders. May be
-    ``None`` if not yet calculated.
+    ``None`` if not yet calculated. Stored in binary form to reduce the index size.
     """
 
     @property
@@ -514,11 +526,12 @@ class HashCacheEntry(Model):
     __slots__ = ["_local_path", "_hash_str", "_mtime"]
 
     __tablename__ = "hash_cache"
+    __without_rowid__ = True
 
     local_path = Column(SqlPath(), nullable=False, primary_key=True)
     """The local path of the item."""
 
-    hash_str = Column(SqlString())
+    hash_str = Column(SqlHex())
     """The content hash of the item."""
 
     mtime = Column(SqlFloat())
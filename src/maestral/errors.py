@@ -101,6 +101,11 @@ class DropboxServerError(SyncError):
     """Raised in case of internal Dropbox errors."""
 
 
+class RateLimitError(SyncError):
+    """Raised when Dropbox rejects requests because of too many requests or write
+    operations in a short time."""
+
+
 class RestrictedContentError(SyncError):
     """Raised when trying to sync restricted content, for instance when adding a file
     with a DMCA takedown notice to a public folder."""
@@ -121,6 +126,11 @@ class FileReadError(SyncError):
     """Raised when reading a local file failed."""
 
 
+class DataCorruptionError(SyncError):
+    """Raised when downloaded data does not match the content hash reported by
+    Dropbox."""
+
+
 # ==== errors which are not related to a specific sync event ===========================
 
 
@@ -237,7 +247,9 @@ SYNC_ERRORS = {
     IsAFolderError,
     NotAFolderError,
     DropboxServerError,
+    RateLimitError,
     RestrictedContentError,
     UnsupportedFileError,
     FileSizeError,
+    DataCorruptionError,
 }
@@ -14,6 +14,7 @@ import gc
 import tempfile
 import mimetypes
 import difflib
+from threading import RLock
 from concurrent.futures import ThreadPoolExecutor
 from typing import (
     Union,
@@ -25,6 +26,7 @@ from typing import (
     Awaitable,
     Optional,
     Any,
+    Hashable,
 )
 
 # external imports
@@ -39,6 +41,7 @@ from dropbox.sharing import RequestedVisibility
 from . import __version__
 from .client import CONNECTION_ERRORS, DropboxClient, convert_api_errors
 from .sync import SyncDirection
+from .database import SyncEvent
 from .manager import SyncManager
 from .errors import (
     MaestralApiError,
@@ -67,6 +70,8 @@ from .utils.serializer import (
     ErrorType,
 )
 from .utils.appdirs import get_cache_path
+from .utils.feed import ChangeFeed
+from .statusboard import StatusBoard, status_board_path
 from .utils.integration import get_ac_state, ACState
 from .constants import IDLE, PAUSED, CONNECTING, FileStatus, GITHUB_RELEASES_API
 
@@ -112,10 +117,19 @@ class Maestral:
     :param log_to_stderr: If ``True``, Maestral will print log messages to stderr.
         When started as a systemd services, this can result in duplicate log messages
         in the systemd journal. Defaults to ``False``.
+    :param status_board: If ``True``, Maestral will periodically publish its status
+        to a file in the runtime directory which clients can read without connecting
+        to the daemon, see :mod:`maestral.statusboard`. Defaults to ``False``.
     """
 
+    _activity_interval = 0.5
+    _status_board_interval = 0.5
+
     def __init__(
-        self, config_name: str = "maestral", log_to_stderr: bool = False
+        self,
+        config_name: str = "maestral",
+        log_to_stderr: bool = False,
+        status_board: bool = False,
     ) -> None:
 
         self._config_name = validate_config_name(config_name)
@@ -132,6 +146,15 @@ class Maestral:
         self.manager = SyncManager(self.client)
         self.sync = self.manager.sync
 
+        # changes to the sync activity, sampled at most once per interval
+        self._activity_feed = ChangeFeed()
+        self._activity_lock = RLock()
+        self._activity_sampled = 0.0
+        self._activity_status: Tuple[str, int] = ("", 0)
+
+        # status board, only published if requested
+        self._status_board: Optional[StatusBoard] = None
+
         self._check_and_run_post_update_scripts()
 
         # schedule background tasks
@@ -146,6 +169,9 @@ class Maestral:
         self._schedule_task(self._period_update_check())
         self._schedule_task(self._period_reindexing())
 
+        if status_board:
+            self._start_status_board(status_board_path(self.config_name))
+
         # create a future which will return once `shutdown_daemon` is called
         # can be used by an event loop wait until maestral has been stopped
         self.shutdown_complete = self._loop.create_future()
@@ -468,6 +494,36 @@ class Maestral:
         else:
             return self._log_handler_info_cache.getLastMessage()
 
+    @property
+    def transfer_concurrency(self) -> Dict[str, Union[int, float]]:
+        """
+        The state of the adaptive limit on concurrent uploads and downloads (read
+        only). Contains the keys "limit", "in_flight", "throughput" in bytes / sec,
+        "latency" in sec and "rate_limits", the number of rate-limit errors seen.
+        """
+        return self.sync.concurrency.state
+
+    @property
+    def local_batch_stats(self) -> Dict[str, Union[int, float]]:
+        """
+        Statistics of recently collected batches of local file events (read only).
+        Contains the keys "batches", "last_size", "mean_size", "max_size", "last_wait",
+        "mean_wait" and "max_wait" with wait times in sec, "limited", the number of
+        batches cut by their size or time limit, and "delay_factor", the current factor
+        for the idle delay between batches.
+        """
+        return self.sync.local_batch_stats
+
+    @property
+    def database_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Statistics of the in-memory caches of the sync database (read only). Contains
+        the keys "index", "history" and "hash_cache", each with the number of cached
+        items ("size"), the "capacity" and the total number of "hits", "misses" and
+        "evictions". The capacity is set by the config value "index_cache_size".
+        """
+        return self.sync.database_cache_stats
+
     @property
     def sync_errors(self) -> List[ErrorType]:
         """
@@ -549,23 +605,77 @@ class Maestral:
         except ValueError:
             return FileStatus.Unwatched.value
 
-        sync_event = self.manager.activity.get(local_path)
+        dbx_path_lower = normalize(dbx_path)
+        indexed = dbx_path == "/" or bool(self.sync.get_local_rev(dbx_path_lower))
 
-        if sync_event is None:
-            # check if there is any sync event for a child path
-            # TODO: Improve performance
-            path = next(
-                iter(p for p in self.manager.activity if p.startswith(local_path)), ""
-            )
-            sync_event = self.manager.activity.get(path)
+        return self._get_file_status(local_path, dbx_path_lower, indexed)
+
+    def get_file_status_batch(self, local_paths: List[str]) -> List[str]:
+        """
+        Returns the sync status of multiple files or folders. This gives the same
+        results as :meth:`get_file_status` for every path but requires only a single
+        call and looks up all paths in the index at once. Use this to query many items,
+        for instance all files in a folder shown by a file manager.
+
+        .. versionadded:: 1.4.8
+
+        :param local_paths: Paths to files on the local drive. May be relative to the
+            current working directory.
+        :returns: List of strings indicating the sync status, in the same order as the
+            given paths. See :meth:`get_file_status` for possible values.
+        """
+        if not self.running:
+            return [FileStatus.Unwatched.value] * len(local_paths)
+
+        items = []
+
+        for local_path in local_paths:
+            local_path = osp.realpath(local_path)
+
+            try:
+                dbx_path_lower = normalize(self.sync.to_dbx_path(local_path))
+            except ValueError:
+                dbx_path_lower = None
+
+            items.append((local_path, dbx_path_lower))
+
+        entries = self.sync.get_index_entries(p for _, p in items if p is not None)
+
+        statuses = []
+
+        for local_path, dbx_path_lower in items:
+            if dbx_path_lower is None:
+                statuses.append(FileStatus.Unwatched.value)
+            else:
+                indexed = dbx_path_lower == "/" or dbx_path_lower in entries
+                status = self._get_file_status(local_path, dbx_path_lower, indexed)
+                statuses.append(status)
+
+        return statuses
+
+    def _get_file_status(
+        self, local_path: str, dbx_path_lower: str, indexed: bool
+    ) -> str:
+        """
+        Returns the sync status of an item in the Dropbox folder.
+
+        :param local_path: Resolved local path of the item.
+        :param dbx_path_lower: Normalized lower case Dropbox path of the item.
+        :param indexed: Whether the item has an entry in the index.
+        :returns: String indicating the sync status.
+        """
+
+        # check for a sync event of the item itself or any of its children
+        item = self.manager.activity.subtree_item(local_path)
+        sync_event = item[1] if item else None
 
         if sync_event and sync_event.direction == SyncDirection.Up:
             return FileStatus.Uploading.value
         elif sync_event and sync_event.direction == SyncDirection.Down:
             return FileStatus.Downloading.value
-        elif any(dbx_path == err["dbx_path"] for err in self.sync_errors):
+        elif self.sync.get_sync_error(dbx_path_lower):
             return FileStatus.Error.value
-        elif dbx_path == "/" or self.sync.get_local_rev(normalize(dbx_path)):
+        elif indexed:
             return FileStatus.Synced.value
         else:
             return FileStatus.Unwatched.value
@@ -577,17 +687,126 @@ class Maestral:
         :param limit: Maximum number of items to return. If None, all entries will be
             returned.
         :returns: A lists of all sync events currently queued for or being uploaded or
-            downloaded with the events furthest up in the queue coming first.
+            downloaded with the events furthest up in the queue coming first. Each
+            entry has a key "queue_position" with its position in the upload or
+            download queue, starting at 1, or None if the item is already being
+            transferred.
         :raises NotLinkedError: if no Dropbox account is linked.
         """
 
         self._check_linked()
 
-        activity = list(self.manager.activity.values())[:limit]
-        serialized_activity = [sync_event_to_dict(event) for event in activity]
+        positions = self.sync.queue_positions()
+        # Copied under the lock of the trie, safe against concurrent updates.
+        activity = self.manager.activity.values()
+
+        def sort_key(event: SyncEvent) -> int:
+            return positions.get(event.local_path, 0)
+
+        activity.sort(key=sort_key)
+
+        serialized_activity = []
+
+        for event in activity[:limit]:
+            serialized = sync_event_to_dict(event)
+            serialized["queue_position"] = positions.get(event.local_path)
+            serialized_activity.append(serialized)
 
         return serialized_activity
 
+    def get_activity_changes(
+        self, cursor: str = "", timeout: float = 60
+    ) -> Dict[str, Any]:
+        """
+        Returns changes to the upload / download activity and the status since a
+        previous call. Blocks until there are changes or until the timeout occurs.
+        Changes are collected at most every 0.5 sec and multiple changes to the same
+        item are combined. This can be used by frontends to follow the sync activity
+        without repeatedly requesting the status, sync errors and all items.
+
+        .. versionadded:: 1.4.8
+
+        :param cursor: Cursor returned by a previous call. Use an empty string to get
+            all items.
+        :param timeout: Maximum time to block before returning, even if there are no
+            changes.
+        :returns: A dictionary with the keys "cursor", to be passed to the next call,
+            "reset", "status", "sync_errors", the number of sync errors, "changed" and
+            "removed". "changed" contains the serialized sync events which have been
+            queued or changed their status or progress, with their "queue_position"
+            as in :meth:`get_activity`. Positions are not updated for unchanged items
+            and ordering previously received items by them is therefore approximate.
+            "removed" contains the local paths of items which are no longer queued or
+            syncing. If "reset" is ``True``, "changed" contains all current items and
+            any previously received items should be discarded. This happens for the
+            first call, for an expired cursor and when the daemon has been restarted.
+        :raises NotLinkedError: if no Dropbox account is linked.
+        """
+
+        self._check_linked()
+
+        t_end = time.monotonic() + timeout
+
+        while True:
+            self._sample_activity()
+
+            new_cursor, changed, removed, reset = self._activity_feed.changes(cursor)
+
+            remaining = t_end - time.monotonic()
+
+            if new_cursor != cursor or reset or remaining <= 0:
+                break
+
+            time.sleep(min(self._activity_interval, remaining))
+
+        positions = self.sync.queue_positions()
+        serialized_changes = []
+
+        for local_path in changed:
+            # skips the status key and items which have finished since sampling
+            event = self.manager.activity.get(local_path)
+
+            if not event:
+                continue
+
+            serialized = sync_event_to_dict(event)
+            serialized["queue_position"] = positions.get(event.local_path)
+            serialized_changes.append(serialized)
+
+        status, n_errors = self._activity_status
+
+        return dict(
+            cursor=new_cursor,
+            reset=reset,
+            status=status,
+            sync_errors=n_errors,
+            changed=serialized_changes,
+            removed=removed,
+        )
+
+    def _sample_activity(self) -> None:
+        """
+        Updates the activity feed with the current status and state of all syncing
+        items if the last update is older than the sampling interval.
+        """
+
+        with self._activity_lock:
+
+            if time.monotonic() - self._activity_sampled < self._activity_interval:
+                return
+
+            self._activity_status = (self.status, len(self.sync.sync_errors))
+
+            snapshot: Dict[Hashable, Any] = {
+                path: (event.status, event.completed)
+                for path, event in self.manager.activity.subtree_items("")
+            }
+            # The status is tracked with an empty key which is not a valid local path.
+            snapshot[""] = self._activity_status
+
+            self._activity_feed.update(snapshot)
+            self._activity_sampled = time.monotonic()
+
     def get_history(self, limit: Optional[int] = 100) -> List[StoneType]:
         """
         Returns the historic upload / download activity. Up to 1,000 sync events are
@@ -1391,6 +1610,11 @@ class Maestral:
 
         self._pool.shutdown(wait=False)
 
+        if self._status_board:
+            status_board = self._status_board
+            self._status_board = None
+            status_board.close()
+
         if self._loop.is_running():
             self._loop.call_soon_threadsafe(self.shutdown_complete.set_result, True)
 
@@ -1451,6 +1675,73 @@ class Maestral:
         task = self._loop.create_task(coro)
         self._tasks.add(task)
 
+    def _start_status_board(self, path: str) -> None:
+        """
+        Periodically publishes the status to a status board file which can be read by
+        clients without connecting to the daemon. The file is removed on shutdown.
+        Errors when creating the file are logged, clients then fall back to querying
+        the daemon.
+
+        :param path: Path of the status board file.
+        """
+
+        try:
+            self._status_board = StatusBoard(path)
+        except OSError:
+            self._logger.warning("Could not create status board", exc_info=True)
+            return
+
+        self._publish_status()
+        self._schedule_task(self._periodic_status_board())
+
+    def _publish_status(self) -> None:
+        """Publishes the current status to the status board, if any."""
+
+        status_board = self._status_board
+
+        if not status_board:
+            return
+
+        # Don't trigger keyring access if the credentials have not yet been loaded.
+        # When paused, the status is returned without checking the connection.
+        if self.client.auth.loaded or self.paused:
+            status = self.status
+        else:
+            status = self._log_handler_info_cache.getLastMessage()
+
+        connected = self.client.auth.loaded and self.connected
+        concurrency = self.sync.concurrency.state
+        current_item = self.sync.current_item
+
+        n_fatal_errors = sum(
+            1 for r in self._log_handler_error_cache.cached_records if r.exc_info
+        )
+
+        status_board.publish(
+            status=status,
+            running=self.running,
+            paused=self.paused,
+            connected=connected,
+            syncing=len(self.manager.activity),
+            sync_errors=len(self.sync.sync_errors),
+            fatal_errors=n_fatal_errors,
+            transfers=int(concurrency["in_flight"]),
+            transfer_limit=int(concurrency["limit"]),
+            throughput=concurrency["throughput"],
+            current_item=current_item.dbx_path if current_item else "",
+        )
+
+    async def _periodic_status_board(self) -> None:
+        """Periodically publishes the status to the status board."""
+
+        while True:
+            try:
+                await self._loop.run_in_executor(None, self._publish_status)
+            except Exception:
+                self._logger.debug("Could not publish status", exc_info=True)
+
+            await asyncio.sleep(self._status_board_interval)
+
     async def _periodic_refresh_info(self) -> None:
         """Periodically refresh the account information from Dropbox servers."""
 
@@ -10,7 +10,7 @@ from contextlib import contextmanager
 from functools import wraps
 from queue import Empty, Queue
 from threading import Event, RLock, Thread
-from typing import Iterator, Optional, cast, Dict, List, Type, TypeVar, Callable, Any
+from typing import Iterator, Optional, cast, List, Type, TypeVar, Callable, Any
 
 # local imports
 from . import __url__
@@ -37,6 +37,7 @@ from .fsevents import Observer
 from .logging import scoped_logger
 from .utils import exc_info_tuple
 from .utils.integration import check_connection, get_inotify_limits
+from .utils.trie import PathTrie
 
 
 __all__ = ["SyncManager"]
@@ -126,8 +127,9 @@ class SyncManager:
         self._conf.set("sync", "reindex_interval", interval)
 
     @property
-    def activity(self) -> Dict[str, SyncEvent]:
-        """Returns a list all items queued for or currently syncing."""
+    def activity(self) -> PathTrie:
+        """Returns a mapping of local paths to all items queued for or currently
+        syncing."""
         return self.sync.syncing
 
     @property
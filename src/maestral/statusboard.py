@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+This module publishes a snapshot of the daemon's status to a small memory-mapped file
+in the runtime directory. Clients such as ``maestral status``, shell prompts or panel
+applets can read the status from the file without connecting to the daemon. The module
+only depends on the standard library so that readers start quickly.
+
+The file has a fixed layout: a header with a magic number, the layout version, a
+sequence number and a checksum, followed by the payload. The writer increments the
+sequence number before and after updating the payload such that it is odd during an
+update. Readers retry until they read the same even sequence number before and after
+the payload and the checksum matches. Boards which have not been updated recently are
+ignored.
+"""
+
+# system imports
+import os
+import mmap
+import struct
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+# local imports
+from .utils.appdirs import get_runtime_path
+
+
+__all__ = ["StatusBoard", "read_status_board", "status_board_path"]
+
+
+MAGIC = b"MSTB"
+VERSION = 1
+
+# magic, version, reserved, sequence number, crc32 of payload
+_HEADER = struct.Struct("<4sHHQI4x")
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 8
+
+# pid, update time, running, paused, connected, number of syncing items, sync errors,
+# fatal errors, transfers in flight, transfer limit, throughput, status, current item
+_PAYLOAD = struct.Struct("<IdBBBxIIIIId256s512s")
+
+SIZE = _HEADER.size + _PAYLOAD.size
+
+
+def status_board_path(config_name: str) -> str:
+    """
+    Returns the path of the status board for the config.
+
+    :param config_name: The config name.
+    :returns: Path of the status board file.
+    """
+    return get_runtime_path("maestral", f"{config_name}.status")
+
+
+def _encode(string: str, size: int) -> bytes:
+    # Truncate to the field size without splitting a multi-byte character.
+    encoded = string.encode("utf-8", errors="replace")[:size]
+    return encoded.decode("utf-8", errors="ignore").encode("utf-8")
+
+
+def _decode(data: bytes) -> str:
+    return data.rstrip(b"\0").decode("utf-8", errors="replace")
+
+
+class StatusBoard:
+    """Writer of a status board file
+
+    The file is created with a fixed size on initialization and should be removed with
+    :meth:`close` when the daemon shuts down. Only a single process should write to
+    the file.
+
+    :param path: Path of the status board file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._seq = 0
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+        try:
+            os.ftruncate(fd, SIZE)
+            self._mmap = mmap.mmap(fd, SIZE)
+        finally:
+            os.close(fd)
+
+    def publish(
+        self,
+        status: str,
+        running: bool,
+        paused: bool,
+        connected: bool,
+        syncing: int,
+        sync_errors: int,
+        fatal_errors: int,
+        transfers: int,
+        transfer_limit: int,
+        throughput: float,
+        current_item: str = "",
+    ) -> None:
+        """
+        Writes a new snapshot of the status to the board.
+
+        :param status: Status message.
+        :param running: Whether sync threads are running.
+        :param paused: Whether syncing is paused by the user.
+        :param connected: Whether Dropbox servers can be reached.
+        :param syncing: Number of items queued for or currently syncing.
+        :param sync_errors: Number of sync errors.
+        :param fatal_errors: Number of fatal errors.
+        :param transfers: Number of transfers in flight.
+        :param transfer_limit: Limit on concurrent transfers.
+        :param throughput: Transfer throughput in bytes / sec.
+        :param current_item: Dropbox path of the item being synced, if any.
+        """
+
+        payload = _PAYLOAD.pack(
+            os.getpid(),
+            time.time(),
+            running,
+            paused,
+            connected,
+            syncing,
+            sync_errors,
+            fatal_errors,
+            transfers,
+            transfer_limit,
+            throughput,
+            _encode(status, 256),
+            _encode(current_item, 512),
+        )
+
+        # An odd sequence number marks the update as in progress.
+        self._seq += 1
+        self._mmap[: _HEADER.size] = _HEADER.pack(
+            MAGIC, VERSION, 0, self._seq, zlib.crc32(payload)
+        )
+        self._mmap[_HEADER.size : SIZE] = payload
+
+        self._seq += 1
+        _SEQ.pack_into(self._mmap, _SEQ_OFFSET, self._seq)
+
+    def close(self) -> None:
+        """Closes and removes the status board file."""
+
+        self._mmap.close()
+
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def read_status_board(
+    path: str, retries: int = 100, max_age: float = 3.0
+) -> Optional[Dict[str, Any]]:
+    """
+    Reads the status from a status board file.
+
+    :param path: Path of the status board file.
+    :param retries: Maximum number of attempts if the board is being updated.
+    :param max_age: Maximum time in seconds since the last update. Older boards are
+        ignored since the daemon which wrote them may have stopped publishing or may
+        have crashed and its PID been reused. The daemon publishes every 0.5 sec.
+    :returns: Dictionary with the keys "pid", "updated", "status", "running", "paused",
+        "connected", "syncing", "sync_errors", "fatal_errors", "transfers",
+        "transfer_limit", "throughput" and "current_item", as passed to
+        :meth:`StatusBoard.publish`, or ``None`` if there is no valid and recent
+        board or the daemon which wrote it is no longer running.
+    """
+
+    try:
+        with open(path, "rb") as f:
+            board = mmap.mmap(f.fileno(), SIZE, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # File does not exist or has not been initialised yet.
+        return None
+
+    try:
+        for _ in range(retries):
+            magic, version, _, seq, crc = _HEADER.unpack_from(board, 0)
+
+            if magic != MAGIC or version != VERSION:
+                return None
+
+            payload = board[_HEADER.size : SIZE]
+            seq_after = _SEQ.unpack_from(board, _SEQ_OFFSET)[0]
+
+            if seq % 2 == 0 and seq == seq_after and zlib.crc32(payload) == crc:
+                break
+
+            time.sleep(0.001)
+        else:
+            return None
+    finally:
+        board.close()
+
+    values = _PAYLOAD.unpack(payload)
+    pid = values[0]
+
+    if abs(time.time() - values[1]) > max_age:
+        # The daemon is no longer publishing.
+        return None
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        # Stale board from a daemon which did not shut down cleanly.
+        return None
+    except PermissionError:
+        pass
+
+    return dict(
+        pid=pid,
+        updated=values[1],
+        running=bool(values[2]),
+        paused=bool(values[3]),
+        connected=bool(values[4]),
+        syncing=values[5],
+        sync_errors=values[6],
+        fatal_errors=values[7],
+        transfers=values[8],
+        transfer_limit=values[9],
+        throughput=values[10],
+        status=_decode(values[11]),
+        current_item=_decode(values[12]),
+    )
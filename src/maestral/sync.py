@@ -6,7 +6,6 @@ import sys
 import os
 import os.path as osp
 import time
-import random
 import uuid
 import urllib.parse
 import enum
@@ -15,10 +14,10 @@ import logging
 import gc
 from stat import S_ISDIR
 from pprint import pformat
-from threading import Event, Condition, RLock, current_thread
-from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Condition, RLock
+from concurrent.futures import ThreadPoolExecutor, Future
 from queue import Queue, Empty
-from collections import abc
+from collections import abc, deque
 from contextlib import contextmanager
 from tempfile import NamedTemporaryFile
 from typing import (
@@ -29,6 +28,7 @@ from typing import (
     Dict,
     Tuple,
     Union,
+    Iterable,
     Iterator,
     Callable,
     Hashable,
@@ -69,6 +69,7 @@ from .constants import (
     FILE_CACHE,
 )
 from .errors import (
+    MaestralApiError,
     SyncError,
     CancelledError,
     NoDropboxDirError,
@@ -79,6 +80,7 @@ from .errors import (
     FolderConflictError,
     InvalidDbidError,
     DatabaseError,
+    RateLimitError,
 )
 from .client import (
     DropboxClient,
@@ -97,13 +99,13 @@ from .database import (
 from .logging import scoped_logger
 from .utils import removeprefix, sanitize_string, exc_info_tuple
 from .utils.caches import LRUCache
-from .utils.integration import (
-    cpu_usage_percent,
-    CPU_COUNT,
-)
+from .utils.integration import CPU_COUNT
+from .utils.throttling import CPUGovernor, ConcurrencyController
+from .utils.scheduling import PriorityExecutor
 from .utils.path import (
     generate_cc_name,
     move,
+    copy_file,
     delete,
     is_child,
     is_equal_or_child,
@@ -115,6 +117,7 @@ from .utils.path import (
     equivalent_path_candidates,
 )
 from .utils.orm import Database, Manager
+from .utils.trie import PathTrie
 from .utils.appdirs import get_data_path
 
 
@@ -127,6 +130,9 @@ __all__ = [
 umask = os.umask(0o22)
 os.umask(umask)
 
+# Version of the database schema, stored as user_version in the database file.
+DB_VERSION = 1
+
 
 # ======================================================================================
 # Syncing functionality
@@ -466,11 +472,29 @@ class SyncEngine:
     """
 
     sync_errors: Set[SyncError]
-    syncing: Dict[str, SyncEvent]
+    syncing: PathTrie
     _case_conversion_cache: LRUCache
 
     _max_history = 1000
     _num_threads = min(32, CPU_COUNT * 3)
+    _max_transfer_threads = 64
+
+    # batching of local file events
+    _local_batch_max_size = 10000
+    _local_batch_max_wait = 30.0
+    _local_batch_max_delay_factor = 8
+    _local_batch_history = 100
+
+    # transfer scheduling: each byte of an item delays it as if it was enqueued
+    # 1 / _priority_bytes_per_sec later, priority items skip ahead by _priority_boost
+    _priority_bytes_per_sec = 10 ** 6
+    _priority_boost = 60 * 60 * 24
+
+    # partial downloads are kept in the cache dir to be resumed for up to one week
+    _partial_download_max_age = 60 * 60 * 24 * 7
+
+    # maximum number of parameters per database query, the lowest limit of SQLite
+    _max_query_params = 999
 
     def __init__(self, client: DropboxClient):
 
@@ -511,27 +535,54 @@ class SyncEngine:
         self.sync_errors = set()
         self._cancel_requested = Event()
 
-        # data structures for user information
-        self.syncing = {}
+        # data structures for user information: items which are syncing by local path
+        # and sync errors by normalized Dropbox path, to look up the sync status of
+        # folders without iterating over all items
+        self.syncing = PathTrie()
+        self._sync_errors_by_path = PathTrie()
+        self._last_started: Optional[SyncEvent] = None
+
+        # transfer scheduling
+        self._transfer_executors: Set[PriorityExecutor] = set()
+        self._concurrency = ConcurrencyController(
+            initial=self._num_threads, maximum=self._max_transfer_threads
+        )
+        self.client.backoff_coordinator.add_listener(
+            self._concurrency.record_rate_limit
+        )
+        self.client.concurrency = self._concurrency
+
+        # adaptive batching of local file events
+        self._local_batch_delay_factor = 1.0
+        self._local_batch_stats: deque = deque(maxlen=self._local_batch_history)
 
         # initialize SQLite database
         self._db_path = get_data_path("maestral", f"{self.config_name}.db")
 
-        if not osp.exists(self._db_path):
+        db_exists = osp.exists(self._db_path)
+
+        if not db_exists:
             # reset sync state if DB is missing
             self.remote_cursor = ""
             self.local_cursor = 0.0
 
+        cache_size = self._conf.get("sync", "index_cache_size")
+
         self._db = Database(self._db_path, check_same_thread=False)
-        self._db_manager_index = Manager(self._db, IndexEntry)
+        self._db_manager_index = Manager(self._db, IndexEntry, cache_size)
         self._db_manager_history = Manager(self._db, SyncEvent)
-        self._db_manager_hash_cache = Manager(self._db, HashCacheEntry)
+        self._db_manager_hash_cache = Manager(self._db, HashCacheEntry, cache_size)
+
+        if db_exists:
+            self._migrate_database()
+        else:
+            self._db.user_version = DB_VERSION
 
         # caches
         self._case_conversion_cache = LRUCache(capacity=5000)
 
         # clean our file cache
-        self.clean_cache_dir(raise_error=False)
+        self.clean_cache_dir(raise_error=False, keep_partial_downloads=True)
 
     def _load_cached_config(self) -> None:
 
@@ -540,7 +591,9 @@ class SyncEngine:
         self._file_cache_path = osp.join(self._dropbox_path, FILE_CACHE)
 
         self._excluded_items = self._conf.get("main", "excluded_items")
+        self._priority_folders = self._conf.get("sync", "priority_folders")
         self._max_cpu_percent = self._conf.get("sync", "max_cpu_percent") * CPU_COUNT
+        self._cpu_governor = CPUGovernor(self._max_cpu_percent)
         self._local_cursor = self._state.get("sync", "lastsync")
 
         self.load_mignore_file()
@@ -599,6 +652,19 @@ class SyncEngine:
             self._excluded_items = clean_list
             self._conf.set("main", "excluded_items", clean_list)
 
+    @property
+    def priority_folders(self) -> List[str]:
+        """List of Dropbox folders whose contents are transferred before other items.
+        Changes are saved to the config file."""
+        return self._priority_folders
+
+    @priority_folders.setter
+    def priority_folders(self, folder_list: List[str]) -> None:
+        """Setter: priority_folders"""
+        clean_list = self.clean_excluded_items_list(folder_list)
+        self._priority_folders = clean_list
+        self._conf.set("sync", "priority_folders", clean_list)
+
     @staticmethod
     def clean_excluded_items_list(folder_list: List[str]) -> List[str]:
         """
@@ -632,7 +698,8 @@ class SyncEngine:
     def max_cpu_percent(self, percent: float) -> None:
         """Setter: max_cpu_percent."""
         self._max_cpu_percent = percent
-        self._conf.set("app", "max_cpu_percent", percent // CPU_COUNT)
+        self._cpu_governor.max_cpu_percent = percent
+        self._conf.set("sync", "max_cpu_percent", percent / CPU_COUNT)
 
     # ==== sync state ==================================================================
 
@@ -699,7 +766,7 @@ class SyncEngine:
 
     def clear_sync_history(self) -> None:
         """Clears the sync history."""
-        with self._database_access():
+        with self._database_access(), self._db.transaction():
             self._db.execute("DROP TABLE history")
             self._db_manager_history.create_table()
             self._db_manager_history.clear_cache()
@@ -719,6 +786,19 @@ class SyncEngine:
 
     # ==== index management ============================================================
 
+    @property
+    def database_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Statistics of the in-memory caches of the index, the sync history and content
+        hashes (read only). Can be used to choose the config value "index_cache_size".
+        See :attr:`maestral.utils.orm.Manager.cache_stats` for the reported values.
+        """
+        return dict(
+            index=self._db_manager_index.cache_stats,
+            history=self._db_manager_history.cache_stats,
+            hash_cache=self._db_manager_hash_cache.cache_stats,
+        )
+
     def get_index(self) -> List[IndexEntry]:
         """
         Returns a copy of the local index of synced files and folders.
@@ -794,6 +874,77 @@ class SyncEngine:
             entry = self._db_manager_index.get(dbx_path_lower)
             return cast(Optional[IndexEntry], entry)
 
+    def get_index_entries(
+        self, dbx_paths_lower: Iterable[str]
+    ) -> Dict[str, IndexEntry]:
+        """
+        Gets the index entries for multiple Dropbox paths. Entries are queried in
+        batches which is much faster than querying each path individually.
+
+        :param dbx_paths_lower: Normalized lower case Dropbox paths.
+        :returns: Dictionary of index entries by path. Paths without an entry are
+            omitted.
+        """
+
+        paths = []
+        entries: Dict[str, IndexEntry] = {}
+
+        for path in set(dbx_paths_lower):
+            try:
+                path.encode()
+            except UnicodeEncodeError:
+                # Paths which cannot be encoded as utf-8 cannot have an entry.
+                continue
+            paths.append(path)
+
+        with self._database_access():
+            for i in range(0, len(paths), self._max_query_params):
+                batch = paths[i : i + self._max_query_params]
+                params = ", ".join(["?"] * len(batch))
+
+                res = self._db_manager_index.query_to_objects(
+                    f"SELECT * FROM 'index' WHERE dbx_path_lower IN ({params})", *batch
+                )
+
+                for entry in res:
+                    entry = cast(IndexEntry, entry)
+                    entries[entry.dbx_path_lower] = entry
+
+        return entries
+
+    def get_index_entries_in_subtree(self, dbx_path_lower: str) -> List[IndexEntry]:
+        """
+        Gets the index entries for the given Dropbox path and all its children.
+
+        :param dbx_path_lower: Normalized lower case Dropbox path.
+        :returns: List of index entries.
+        """
+
+        condition, args = subtree_condition(
+            "dbx_path_lower", dbx_path_lower.rstrip("/")
+        )
+
+        with self._database_access():
+            entries = self._db_manager_index.query_to_objects(
+                f"SELECT * FROM 'index' WHERE {condition}", *args
+            )
+            return cast(List[IndexEntry], entries)
+
+    def get_index_entries_with_hash(self, hash_str: str) -> List[IndexEntry]:
+        """
+        Gets all index entries with the given content hash.
+
+        :param hash_str: Dropbox content hash.
+        :returns: List of index entries.
+        """
+
+        with self._database_access():
+            entries = self._db_manager_index.query_to_objects(
+                "SELECT * FROM 'index' WHERE content_hash = ?",
+                IndexEntry.content_hash.py_to_sql(hash_str),
+            )
+            return cast(List[IndexEntry], entries)
+
     def get_local_hash(self, local_path: str) -> Optional[str]:
         """
         Computes content hash of a local file.
@@ -851,31 +1002,21 @@ class SyncEngine:
 
         with self._database_access():
 
-            cache_entry = self._db_manager_hash_cache.get(local_path)
-            cache_entry = cast(Optional[HashCacheEntry], cache_entry)
-
             if hash_str:
-
-                if cache_entry:
-                    cache_entry.hash_str = hash_str
-                    cache_entry.mtime = mtime
-
-                    self._db_manager_hash_cache.update(cache_entry)
-
-                else:
-                    cache_entry = HashCacheEntry(
-                        local_path=local_path, hash_str=hash_str, mtime=mtime
-                    )
-                    self._db_manager_hash_cache.save(cache_entry)
+                cache_entry = HashCacheEntry(
+                    local_path=local_path, hash_str=hash_str, mtime=mtime
+                )
+                self._db_manager_hash_cache.upsert(cache_entry)
             else:
+                cache_entry = self._db_manager_hash_cache.get(local_path)
+                cache_entry = cast(Optional[HashCacheEntry], cache_entry)
+
                 if cache_entry:
                     self._db_manager_hash_cache.delete(cache_entry)
-                else:
-                    pass
 
     def clear_hash_cache(self) -> None:
         """Clears the sync history."""
-        with self._database_access():
+        with self._database_access(), self._db.transaction():
             self._db.execute("DROP TABLE hash_cache")
             self._db_manager_hash_cache.clear_cache()
             self._db_manager_hash_cache.create_table()
@@ -892,14 +1033,16 @@ class SyncEngine:
 
         dbx_path_lower = event.dbx_path_lower
 
-        with self._database_access():
+        with self._database_access(), self._db.transaction():
 
-            # remove any entries for deleted or moved items
+            # remove any entries for deleted items and move those of moved items
 
             if event.change_type is ChangeType.Removed:
                 self.remove_node_from_index(dbx_path_lower)
             elif event.change_type is ChangeType.Moved:
-                self.remove_node_from_index(event.dbx_path_from_lower)
+                self.move_node_in_index(
+                    cast(str, event.dbx_path_from_lower), dbx_path_lower, event.dbx_path
+                )
 
             # add or update entries for created or modified items
 
@@ -951,43 +1094,81 @@ class SyncEngine:
                 self.remove_node_from_index(md.path_lower)
 
             else:
-
-                if isinstance(md, FileMetadata):
-                    rev = md.rev
-                    hash_str = md.content_hash
-                    item_type = ItemType.File
-                else:
-                    rev = "folder"
-                    hash_str = "folder"
-                    item_type = ItemType.Folder
-
-                # construct correct display path from ancestors
-
                 entry = self.get_index_entry(md.path_lower)
-                dbx_path_cased = self.correct_case(md.path_display, client)
+                new_entry = self._index_entry_from_dbx_metadata(md, client)
 
                 if entry:
-                    entry.dbx_id = md.id
-                    entry.dbx_path_cased = dbx_path_cased
-                    entry.item_type = item_type
+                    entry.dbx_id = new_entry.dbx_id
+                    entry.dbx_path_cased = new_entry.dbx_path_cased
+                    entry.item_type = new_entry.item_type
                     entry.last_sync = None
-                    entry.rev = rev
-                    entry.content_hash = hash_str
+                    entry.rev = new_entry.rev
+                    entry.content_hash = new_entry.content_hash
 
                     self._db_manager_index.update(entry)
 
                 else:
-                    entry = IndexEntry(
-                        dbx_path_cased=dbx_path_cased,
-                        dbx_path_lower=md.path_lower,
-                        dbx_id=md.id,
-                        item_type=item_type,
-                        last_sync=None,
-                        rev=rev,
-                        content_hash=hash_str,
-                    )
+                    self._db_manager_index.save(new_entry)
 
-                    self._db_manager_index.save(entry)
+    def update_index_from_dbx_metadata_batch(
+        self, entries: Iterable[Metadata], client: Optional[DropboxClient] = None
+    ) -> None:
+        """
+        Updates the local index from a list of Dropbox metadata, for instance a page
+        of results from :meth:`client.DropboxClient.list_folder_iterator`. All new
+        and modified entries are written with a single statement instead of looking up
+        and saving each entry individually. Entries are processed in the given order,
+        parent folders should therefore come before their children.
+
+        :param entries: Dropbox metadata.
+        :param client: DropboxClient instance to use. If not given, use the global
+            instance.
+        """
+
+        client = client or self.client
+
+        with self._database_access():
+            with self._db.transaction():
+
+                pending: List[IndexEntry] = []
+
+                for md in entries:
+                    if isinstance(md, DeletedMetadata):
+                        # write pending entries first so that the deletion applies
+                        # to any children which were listed before it
+                        self._db_manager_index.upsert_many(pending)
+                        pending.clear()
+                        self.remove_node_from_index(md.path_lower)
+                    else:
+                        pending.append(self._index_entry_from_dbx_metadata(md, client))
+
+                self._db_manager_index.upsert_many(pending)
+
+    def _index_entry_from_dbx_metadata(
+        self, md: Metadata, client: DropboxClient
+    ) -> IndexEntry:
+
+        if isinstance(md, FileMetadata):
+            rev = md.rev
+            hash_str = md.content_hash
+            item_type = ItemType.File
+        else:
+            rev = "folder"
+            hash_str = "folder"
+            item_type = ItemType.Folder
+
+        # construct correct display path from ancestors
+        dbx_path_cased = self.correct_case(md.path_display, client)
+
+        return IndexEntry(
+            dbx_path_cased=dbx_path_cased,
+            dbx_path_lower=md.path_lower,
+            dbx_id=md.id,
+            item_type=item_type,
+            last_sync=None,
+            rev=rev,
+            content_hash=hash_str,
+        )
 
     def remove_node_from_index(self, dbx_path_lower: str) -> None:
         """
@@ -996,26 +1177,89 @@ class SyncEngine:
         :param dbx_path_lower: Normalized lower case Dropbox path.
         """
 
-        with self._database_access():
+        with self._database_access(), self._db.transaction():
 
             dbx_path_lower = dbx_path_lower.rstrip("/")
 
+            condition, args = subtree_condition("dbx_path_lower", dbx_path_lower)
+
             try:
-                self._db.execute(
-                    "DELETE FROM 'index' WHERE dbx_path_lower = ?", dbx_path_lower
+                self._db.execute(f"DELETE FROM 'index' WHERE {condition}", *args)
+            except UnicodeEncodeError:
+                return
+
+            self._db_manager_index.clear_cache(prefix=dbx_path_lower)
+
+    def move_node_in_index(
+        self, dbx_path_from_lower: str, dbx_path_lower: str, dbx_path_cased: str
+    ) -> None:
+        """
+        Moves the local index entries for the given path and all its children to a new
+        path. Cached content hashes are moved along with them. This takes a single
+        update per table instead of listing the new location on Dropbox and updating
+        every entry individually. Any existing entries at the new path are removed.
+
+        :param dbx_path_from_lower: Normalized lower case Dropbox path of the old
+            location.
+        :param dbx_path_lower: Normalized lower case Dropbox path of the new location.
+        :param dbx_path_cased: Correctly cased Dropbox path of the new location.
+        """
+
+        with self._database_access(), self._db.transaction():
+
+            dbx_path_from_lower = dbx_path_from_lower.rstrip("/")
+            dbx_path_lower = dbx_path_lower.rstrip("/")
+
+            entry = self.get_index_entry(dbx_path_from_lower)
+
+            if not entry:
+                return
+
+            if dbx_path_lower != dbx_path_from_lower:
+                self.remove_node_from_index(dbx_path_lower)
+
+            local_path_from = self.to_local_path_from_cased(entry.dbx_path_cased)
+            local_path = self.to_local_path_from_cased(dbx_path_cased)
+
+            try:
+                condition, args = subtree_condition(
+                    "dbx_path_lower", dbx_path_from_lower
                 )
                 self._db.execute(
-                    "DELETE FROM 'index' WHERE dbx_path_lower LIKE ?",
-                    f"{dbx_path_lower}/%",
+                    "UPDATE 'index' SET "
+                    "dbx_path_lower = ? || substr(dbx_path_lower, ?), "
+                    "dbx_path_cased = ? || substr(dbx_path_cased, ?) "
+                    f"WHERE {condition}",
+                    dbx_path_lower,
+                    len(dbx_path_from_lower) + 1,
+                    dbx_path_cased,
+                    len(entry.dbx_path_cased) + 1,
+                    *args,
                 )
+
+                if local_path != local_path_from:
+                    condition, args = subtree_condition("local_path", local_path)
+                    self._db.execute(f"DELETE FROM hash_cache WHERE {condition}", *args)
+
+                    condition, args = subtree_condition("local_path", local_path_from)
+                    self._db.execute(
+                        "UPDATE hash_cache SET local_path = ? || substr(local_path, ?) "
+                        f"WHERE {condition}",
+                        local_path,
+                        len(local_path_from) + 1,
+                        *args,
+                    )
             except UnicodeEncodeError:
-                return
+                self.remove_node_from_index(dbx_path_from_lower)
 
-            self._db_manager_index.clear_cache()
+            self._db_manager_index.clear_cache(prefix=dbx_path_from_lower)
+            self._db_manager_index.clear_cache(prefix=dbx_path_lower)
+            self._db_manager_hash_cache.clear_cache(prefix=local_path_from)
+            self._db_manager_hash_cache.clear_cache(prefix=local_path)
 
     def clear_index(self) -> None:
         """Clears the revision index."""
-        with self._database_access():
+        with self._database_access(), self._db.transaction():
             self._db.execute("DROP TABLE 'index'")
             self._db_manager_index.clear_cache()
             self._db_manager_index.create_table()
@@ -1098,16 +1342,25 @@ class SyncEngine:
 
             retries += 1
 
-    def clean_cache_dir(self, raise_error: bool = True) -> None:
+    def clean_cache_dir(
+        self, raise_error: bool = True, keep_partial_downloads: bool = False
+    ) -> None:
         """
         Removes all items in the cache directory.
 
         :param raise_error: Whether errors should raised or only logged.
+        :param keep_partial_downloads: Whether to keep interrupted downloads which can
+            still be resumed.
         """
 
         with self.sync_lock:
             try:
-                delete(self._file_cache_path, raise_error=True)
+                if keep_partial_downloads and osp.isdir(self._file_cache_path):
+                    for entry in os.scandir(self._file_cache_path):
+                        if not self._is_resumable_download(entry.path):
+                            delete(entry.path, raise_error=True)
+                else:
+                    delete(self._file_cache_path, raise_error=True)
             except (FileNotFoundError, IsADirectoryError):
                 pass
             except OSError as err:
@@ -1123,6 +1376,40 @@ class SyncEngine:
                 self._logger.error(exc.title, exc_info=exc_info_tuple(exc))
                 self.desktop_notifier.notify(exc.title, exc.message, level=notify.ERROR)
 
+    def _is_resumable_download(self, path: str) -> bool:
+        """
+        Checks if a file in the cache directory belongs to an interrupted download which
+        can be resumed. This is the case for partial downloads and their progress files
+        if the download was last active less than :attr:`_partial_download_max_age` ago.
+
+        :param path: Path of the file in the cache directory.
+        :returns: Whether the file should be kept.
+        """
+
+        part_path = path[: -len(".json")] if path.endswith(".part.json") else path
+
+        if not part_path.endswith(".part") or not osp.isfile(part_path):
+            return False
+
+        try:
+            last_active = os.stat(part_path + ".json").st_mtime
+        except OSError:
+            return False
+
+        return time.time() - last_active < self._partial_download_max_age
+
+    def _partial_download_path(self, event: SyncEvent) -> str:
+        """
+        Returns the path of the partial download for the revision of the given event in
+        our cache directory. The path is stable such that interrupted downloads of the
+        same revision can be resumed.
+
+        :param event: SyncEvent for file download.
+        :returns: Path to download to.
+        """
+        self._ensure_cache_dir_present()
+        return osp.join(self.file_cache_path, f"{event.rev}.part")
+
     def _new_tmp_file(self) -> str:
         """Returns a new temporary file name in our cache directory."""
         self._ensure_cache_dir_present()
@@ -1296,6 +1583,15 @@ class SyncEngine:
         """Returns ``True`` in case of sync errors, ``False`` otherwise."""
         return len(self.sync_errors) > 0
 
+    def get_sync_error(self, dbx_path_lower: str) -> Optional[SyncError]:
+        """
+        Returns the sync error for the given path, if any.
+
+        :param dbx_path_lower: Normalized lower case Dropbox path.
+        :returns: Sync error or ``None`` if the item has no sync error.
+        """
+        return self._sync_errors_by_path.get(dbx_path_lower)
+
     def clear_sync_error(
         self, local_path: Optional[str] = None, dbx_path: Optional[str] = None
     ) -> None:
@@ -1314,6 +1610,9 @@ class SyncEngine:
         dbx_path = cast(str, dbx_path)
         dbx_path_lower = normalize(dbx_path)
 
+        for path, _ in self._sync_errors_by_path.subtree_items(dbx_path_lower):
+            self._sync_errors_by_path.pop(path, None)
+
         if self.has_sync_errors():
             for error in self.sync_errors.copy():
                 if error.dbx_path and is_equal_or_child(
@@ -1330,6 +1629,7 @@ class SyncEngine:
     def clear_sync_errors(self) -> None:
         """Clears all sync errors."""
         self.sync_errors.clear()
+        self._sync_errors_by_path.clear()
         self.upload_errors.clear()
         self.download_errors.clear()
 
@@ -1412,25 +1712,109 @@ class SyncEngine:
 
     def _slow_down(self) -> None:
         """
-        Pauses if CPU usage is too high if called from one of our thread pools.
+        Pauses if CPU usage is too high. CPU usage is sampled periodically by a
+        :class:`maestral.utils.throttling.CPUGovernor` in a background thread, this
+        call therefore returns immediately while we are within the CPU budget.
         """
 
-        if self._max_cpu_percent == 100 * CPU_COUNT:
-            return
+        waited = self._cpu_governor.acquire()
+
+        if waited > 0:
+            throttled_log(
+                self._logger,
+                f"{self._cpu_governor.cpu_percent:.0f}% CPU usage - throttling",
+                level=logging.DEBUG,
+            )
 
-        cpu_usage = cpu_usage_percent()
+    def _transfer_priority(self, event: SyncEvent) -> float:
+        """
+        Returns the scheduling priority for an upload or download, lower values are
+        transferred first. Small items are preferred over large items but every item
+        ages: an item of size N bytes is scheduled as if it had been queued
+        ``N / _priority_bytes_per_sec`` seconds later. Items inside
+        :attr:`priority_folders` are moved ahead of all others.
 
-        if cpu_usage > self._max_cpu_percent:
+        :param event: Sync event to schedule.
+        :returns: Priority value.
+        """
 
-            thread_name = current_thread().name
-            self._logger.debug(f"{thread_name}: {cpu_usage}% CPU usage - throttling")
+        priority = time.time() + event.size / self._priority_bytes_per_sec
 
-            while cpu_usage > self._max_cpu_percent:
-                cpu_usage = cpu_usage_percent(0.5 + 2 * random.random())
+        dbx_path_lower = event.dbx_path_lower
 
-            self._logger.debug(
-                f"{thread_name}: {cpu_usage}% CPU usage - end throttling"
-            )
+        for folder in self._priority_folders:
+            if is_equal_or_child(dbx_path_lower, folder):
+                priority -= self._priority_boost
+                break
+
+        return priority
+
+    @contextmanager
+    def _transfer_executor(self, thread_name_prefix: str) -> Iterator[PriorityExecutor]:
+        """
+        Context manager which returns a
+        :class:`maestral.utils.scheduling.PriorityExecutor` for uploads or downloads.
+        The number of concurrent transfers across all such executors is adjusted by
+        :attr:`concurrency`. The queue of the executor is taken into account by
+        :meth:`queue_positions` while it is in use.
+
+        :param thread_name_prefix: Prefix for the names of worker threads.
+        """
+
+        with PriorityExecutor(
+            max_workers=self._max_transfer_threads,
+            thread_name_prefix=thread_name_prefix,
+            controller=self._concurrency,
+        ) as executor:
+            self._transfer_executors.add(executor)
+            try:
+                yield executor
+            finally:
+                self._transfer_executors.discard(executor)
+
+    @property
+    def concurrency(self) -> ConcurrencyController:
+        """Controller for the number of concurrent uploads and downloads (read only).
+        The limit is adjusted automatically based on throughput, latency and rate-limit
+        errors."""
+        return self._concurrency
+
+    def _record_transfer(self, event: SyncEvent, t0: float) -> None:
+        """
+        Reports the outcome of a completed transfer to :attr:`concurrency`.
+
+        :param event: Completed sync event.
+        :param t0: Start time of the transfer from :func:`time.monotonic`.
+        """
+        if event.status == SyncStatus.Done:
+            self._concurrency.record(time.monotonic() - t0, event.size)
+
+    @property
+    def current_item(self) -> Optional[SyncEvent]:
+        """The most recently started upload or download if it is still in progress."""
+        event = self._last_started
+
+        if event and event.status is SyncStatus.Syncing:
+            return event
+        else:
+            return None
+
+    def queue_positions(self) -> Dict[str, int]:
+        """
+        Returns the positions of all queued uploads and downloads in their respective
+        queues, starting at 1 for the item which will be transferred next. Items which
+        are currently being transferred are not included.
+
+        :returns: Mapping of local paths to queue positions.
+        """
+
+        positions: Dict[str, int] = {}
+
+        for executor in self._transfer_executors.copy():
+            for n, key in enumerate(executor.queued_keys()):
+                positions[cast(str, key)] = n + 1
+
+        return positions
 
     def cancel_sync(self) -> None:
         """
@@ -1503,6 +1887,7 @@ class SyncEngine:
                 actions={"Show": callback},
             )
             self.sync_errors.add(err)
+            self._sync_errors_by_path[normalize(err.dbx_path)] = err
 
             # save download errors to retry later
             if direction == SyncDirection.Down:
@@ -1553,6 +1938,37 @@ class SyncEngine:
             self._logger.error(title, exc_info=exc_info_tuple(new_exc))
             self.desktop_notifier.notify(title, msg, level=notify.ERROR)
 
+    def _migrate_database(self) -> None:
+        """
+        Migrates tables of a database created by an older version to the current schema.
+        Version 1 stores content hashes and revisions as binary BLOBs instead of
+        hexadecimal strings.
+
+        :raises DatabaseError: if the database was created by a newer version.
+        """
+
+        with self._database_access():
+
+            if self._db.user_version > DB_VERSION:
+                raise DatabaseError(
+                    "Incompatible index",
+                    f'The index file at "{self._db_path}" was created by a newer '
+                    "version of Maestral. Please update Maestral or delete the index "
+                    "file to rebuild it.",
+                )
+
+            if self._db.user_version < 1:
+
+                self._logger.info("Migrating index, this may take a while...")
+
+                self._db_manager_index.rebuild_table()
+                self._db_manager_hash_cache.rebuild_table()
+
+                # Reclaim the space freed by the smaller rows.
+                self._db.execute("VACUUM")
+
+            self._db.user_version = DB_VERSION
+
     def _clear_caches(self) -> None:
         """
         Frees memory by clearing internal caches.
@@ -1561,6 +1977,8 @@ class SyncEngine:
         self._case_conversion_cache.clear()
         self.fs_events.expire_ignored_events()
 
+        self._logger.debug("Database cache stats: %s", self.database_cache_stats)
+
     # ==== Upload sync =================================================================
 
     def upload_local_changes_while_inactive(self) -> None:
@@ -1582,16 +2000,14 @@ class SyncEngine:
                 raise os_to_maestral_error(err)
 
             events = self._clean_local_events(events)
-            sync_events = [SyncEvent.from_file_system_event(e, self) for e in events]
-            del events
 
-            if len(sync_events) > 0:
-                self.apply_local_changes(sync_events)
+            if len(events) > 0:
+                self.apply_local_events(events)
                 self._logger.debug("Uploaded local changes while inactive")
             else:
                 self._logger.debug("No local changes while inactive")
 
-            del sync_events
+            del events
             gc.collect()
 
             self.local_cursor = local_cursor
@@ -1701,19 +2117,22 @@ class SyncEngine:
 
     def upload_sync_cycle(self):
         """
-        Performs a full upload sync cycle by calling in order:
+        Performs a full upload sync cycle by collecting local file events and applying
+        them with :meth:`apply_local_events`. This is equivalent to calling in order:
 
             1) :meth:`list_local_changes`
             2) :meth:`apply_local_changes`
 
+        but starts uploading individual items as soon as they have been indexed.
+
         Handles updating the local cursor for you. If monitoring for local file events
         was interrupted, call :meth:`upload_local_changes_while_inactive` instead.
         """
 
         with self.sync_lock:
 
-            changes, cursor = self.list_local_changes()
-            self.apply_local_changes(changes)
+            changes, cursor = self._collect_local_events()
+            self.apply_local_events(changes)
 
             self.local_cursor = cursor
 
@@ -1725,37 +2144,159 @@ class SyncEngine:
             if self._cancel_requested.is_set():
                 raise CancelledError("Sync cancelled")
 
-    def list_local_changes(self, delay: float = 1) -> Tuple[List[SyncEvent], float]:
+    def list_local_changes(
+        self,
+        delay: float = 1,
+        max_batch_size: Optional[int] = None,
+        max_wait: Optional[float] = None,
+    ) -> Tuple[List[SyncEvent], float]:
         """
         Waits for local file changes. Returns a list of local changes with at most one
         entry per path.
 
-        :param delay: Delay in sec to wait for subsequent changes before returning.
+        Events are collected until none arrive for an idle delay, until the batch
+        contains ``max_batch_size`` events or until ``max_wait`` seconds have passed,
+        whichever comes first. Events which arrive after a batch has been cut remain in
+        the queue and will be returned by the next call. The idle delay adapts to the
+        observed activity: it grows (up to a multiple of ``delay``) while batches keep
+        hitting their limits, for instance during large imports, and decays back to
+        ``delay`` once activity calms down. Observed batch sizes and wait times are
+        available from :attr:`local_batch_stats`.
+
+        :param delay: Base delay in sec to wait for subsequent changes before returning.
+        :param max_batch_size: Maximum number of file system events to collect before
+            returning. Defaults to :attr:`_local_batch_max_size`.
+        :param max_wait: Maximum time in sec to collect events before returning, even
+            if events are still arriving. Defaults to :attr:`_local_batch_max_wait`.
         :returns: (list of sync times events, time_stamp)
         """
 
+        events, local_cursor = self._collect_local_events(
+            delay, max_batch_size, max_wait
+        )
+
+        sync_events = [SyncEvent.from_file_system_event(e, self) for e in events]
+
+        # Free memory early to prevent fragmentation.
+        del events
+        gc.collect()
+
+        return sync_events, local_cursor
+
+    def _collect_local_events(
+        self,
+        delay: float = 1,
+        max_batch_size: Optional[int] = None,
+        max_wait: Optional[float] = None,
+    ) -> Tuple[List[FileSystemEvent], float]:
+        """
+        Collects a batch of local file system events from the queue and cleans them up
+        so that there is at most one event per path. See :meth:`list_local_changes` for
+        a description of the parameters.
+
+        :returns: (list of file system events, time_stamp)
+        """
+
+        if max_batch_size is None:
+            max_batch_size = self._local_batch_max_size
+
+        if max_wait is None:
+            max_wait = self._local_batch_max_wait
+
+        idle_delay = min(delay * self._local_batch_delay_factor, max_wait)
+
         events = []
+        t0 = time.monotonic()
+        deadline = t0 + max_wait
         local_cursor = time.time()
+        hit_limit = False
 
-        # keep collecting events until idle for `delay`
+        # Keep collecting events until idle for `idle_delay` or until we hit the
+        # maximum batch size or the maximum wait time.
         while True:
+
+            if len(events) >= max_batch_size:
+                hit_limit = True
+                break
+
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0:
+                hit_limit = True
+                break
+
             try:
-                event = self.fs_events.local_file_event_queue.get(timeout=delay)
+                timeout = min(idle_delay, remaining)
+                event = self.fs_events.local_file_event_queue.get(timeout=timeout)
                 events.append(event)
                 local_cursor = time.time()
             except Empty:
+                if timeout < idle_delay:
+                    # We got cut off by the deadline, not by idling.
+                    hit_limit = True
                 break
 
+        wait_time = time.monotonic() - t0
+        self._update_local_batch_stats(len(events), wait_time, idle_delay, hit_limit)
+
+        self._logger.debug(
+            "Retrieved %s local file events in %.1f sec", len(events), wait_time
+        )
         self._logger.debug("Retrieved local file events:\n%s", pf_repr(events))
 
-        events = self._clean_local_events(events)
-        sync_events = [SyncEvent.from_file_system_event(e, self) for e in events]
+        return self._clean_local_events(events), local_cursor
 
-        # Free memory early to prevent fragmentation.
-        del events
-        gc.collect()
+    def _update_local_batch_stats(
+        self, size: int, wait_time: float, idle_delay: float, hit_limit: bool
+    ) -> None:
+        """
+        Records the statistics of a batch of local events and adapts the idle delay
+        for the next batch: it is doubled when the batch hit its size or time limit and
+        halved otherwise, within the bounds of 1 and
+        :attr:`_local_batch_max_delay_factor` times the base delay.
 
-        return sync_events, local_cursor
+        :param size: Number of file system events in the batch.
+        :param wait_time: Time in sec spent collecting the batch.
+        :param idle_delay: Idle delay in sec that was used for the batch.
+        :param hit_limit: Whether the batch was cut by its size or time limit.
+        """
+
+        self._local_batch_stats.append((size, wait_time, idle_delay, hit_limit))
+
+        if hit_limit:
+            factor = self._local_batch_delay_factor * 2
+        else:
+            factor = self._local_batch_delay_factor / 2
+
+        self._local_batch_delay_factor = min(
+            max(factor, 1.0), self._local_batch_max_delay_factor
+        )
+
+    @property
+    def local_batch_stats(self) -> Dict[str, Union[int, float]]:
+        """
+        Statistics of recently collected batches of local file events (read only).
+        Includes the number of batches taken into account, the last, average and
+        maximum batch sizes and wait times in sec, the number of batches which were cut
+        by their size or time limit and the current idle delay factor.
+        """
+
+        stats = list(self._local_batch_stats)
+
+        sizes = [s[0] for s in stats]
+        waits = [s[1] for s in stats]
+
+        return dict(
+            batches=len(stats),
+            last_size=sizes[-1] if sizes else 0,
+            mean_size=sum(sizes) / len(sizes) if sizes else 0.0,
+            max_size=max(sizes, default=0),
+            last_wait=waits[-1] if waits else 0.0,
+            mean_wait=sum(waits) / len(waits) if waits else 0.0,
+            max_wait=max(waits, default=0.0),
+            limited=sum(1 for s in stats if s[3]),
+            delay_factor=self._local_batch_delay_factor,
+        )
 
     def apply_local_changes(self, sync_events: List[SyncEvent]) -> List[SyncEvent]:
         """
@@ -1811,22 +2352,190 @@ class SyncEngine:
             r = self._create_remote_entry(event)
             results.append(r)
 
-        # apply other events in parallel since order does not matter
-        with ThreadPoolExecutor(
-            max_workers=self._num_threads,
-            thread_name_prefix="maestral-upload-pool",
-        ) as executor:
-            res = executor.map(self._create_remote_entry, other)
+        # apply other events in parallel, in order of priority
+        with self._transfer_executor("maestral-upload-pool") as executor:
+            futures = [
+                executor.submit(
+                    self._create_remote_entry,
+                    event,
+                    priority=self._transfer_priority(event),
+                    key=event.local_path,
+                )
+                for event in other
+            ]
 
             n_items = len(other)
-            for n, r in enumerate(res):
+            for n, future in enumerate(futures):
                 throttled_log(self._logger, f"Syncing ↑ {n + 1}/{n_items}")
-                results.append(r)
+                results.append(future.result())
 
         self._clean_history()
 
         return results
 
+    def apply_local_events(self, events: List[FileSystemEvent]) -> List[SyncEvent]:
+        """
+        Applies local file system events to the remote Dropbox in a streaming fashion.
+        Changes which should be ignored (mignore or always ignored files) are skipped.
+
+        Deletions and folder moves are converted and applied first since they do not
+        require hashing or uploading any content. All other events are then converted
+        to :class:`maestral.database.SyncEvent`, which includes hashing file content,
+        one by one in the calling thread. Each event is handed to the upload pool as
+        soon as it has been converted so that hashing and uploads overlap. Events are
+        converted parents first and an item inside a newly created folder is only
+        uploaded once the creation of that folder has completed.
+
+        :param events: List of local file system events, as returned by
+            :meth:`_clean_local_events`.
+        :returns: Processed sync events with updated status.
+        """
+
+        results: List[SyncEvent] = []
+
+        if len(events) == 0:
+            return results
+
+        early_events: List[FileSystemEvent] = []
+        other_events: List[FileSystemEvent] = []
+
+        for event in events:
+            if event.event_type == EVENT_TYPE_DELETED:
+                early_events.append(event)
+            elif event.is_directory and event.event_type == EVENT_TYPE_MOVED:
+                early_events.append(event)
+            else:
+                other_events.append(event)
+
+        # Apply deletions and folder moves first. Neither requires an actual upload.
+        if early_events:
+            early_sync_events = [
+                SyncEvent.from_file_system_event(e, self) for e in early_events
+            ]
+            results += self.apply_local_changes(early_sync_events)
+            del early_sync_events
+
+        # Convert remaining events parents first.
+        other_events.sort(key=lambda e: get_dest_path(e).count("/"))
+
+        # Pending folder creations by dbx_path_lower.
+        pending_folders: Dict[str, Future] = {}
+        futures: List[Future] = []
+
+        with self._transfer_executor("maestral-upload-pool") as executor:
+
+            for event in other_events:
+
+                if self._cancel_requested.is_set():
+                    break
+
+                sync_event = SyncEvent.from_file_system_event(event, self)
+
+                if self.is_excluded(sync_event.dbx_path) or self.is_mignore(
+                    sync_event
+                ):
+                    continue
+
+                # housekeeping
+                self.syncing[sync_event.local_path] = sync_event
+
+                parent_future = self._pending_parent_future(
+                    sync_event.dbx_path_lower, pending_folders
+                )
+                future = self._submit_after(
+                    executor,
+                    parent_future,
+                    self._create_remote_entry,
+                    sync_event,
+                    priority=self._transfer_priority(sync_event),
+                    key=sync_event.local_path,
+                )
+                futures.append(future)
+
+                if sync_event.is_directory and sync_event.is_added:
+                    pending_folders[sync_event.dbx_path_lower] = future
+
+            n_items = len(futures)
+
+            for n, future in enumerate(futures):
+                results.append(future.result())
+                throttled_log(self._logger, f"Syncing ↑ {n + 1}/{n_items}")
+
+        self._clean_history()
+
+        return results
+
+    @staticmethod
+    def _pending_parent_future(
+        dbx_path_lower: str, pending_folders: Dict[str, Future]
+    ) -> Optional[Future]:
+        """
+        Returns the future of the closest parent folder creation which is still in
+        progress.
+
+        :param dbx_path_lower: Normalised Dropbox path of the item.
+        :param pending_folders: Mapping of normalised Dropbox paths to futures of
+            folder creations.
+        :returns: Future of the parent folder creation or ``None`` if there is none
+            in progress.
+        """
+
+        if not pending_folders:
+            return None
+
+        path = dbx_path_lower
+
+        while path != "/":
+            path = osp.dirname(path)
+            future = pending_folders.get(path)
+            if future and not future.done():
+                return future
+
+        return None
+
+    @staticmethod
+    def _submit_after(
+        executor: PriorityExecutor,
+        dependency: Optional[Future],
+        fn: Callable,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Future:
+        """
+        Submits a callable to an executor once a dependency has completed, without
+        blocking the calling thread or any worker while waiting.
+
+        :param executor: Executor to run the callable.
+        :param dependency: Future which must complete first. If ``None`` or already
+            done, the callable is submitted immediately.
+        :param fn: Callable to run.
+        :param args: Arguments to pass to the callable.
+        :param kwargs: Keyword arguments for the executor's ``submit`` method.
+        :returns: Future which resolves with the callable's result.
+        """
+
+        if dependency is None or dependency.done():
+            return executor.submit(fn, *args, **kwargs)
+
+        future: Future = Future()
+
+        def copy_result(inner: Future) -> None:
+            exc = inner.exception()
+            if exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(inner.result())
+
+        def submit(_: Future) -> None:
+            try:
+                executor.submit(fn, *args, **kwargs).add_done_callback(copy_result)
+            except RuntimeError as exc:
+                future.set_exception(exc)
+
+        dependency.add_done_callback(submit)
+
+        return future
+
     def _filter_excluded_changes_local(
         self, sync_events: List[SyncEvent]
     ) -> Tuple[List[SyncEvent], List[SyncEvent]]:
@@ -1985,6 +2694,10 @@ class SyncEngine:
                     cleaned_events.difference_update(split_events)
                     cleaned_events.add(new_event)
 
+        # pair remaining deletions and creations which are actually moves
+
+        self._reconcile_local_moves(cleaned_events)
+
         # COMBINE MOVED AND DELETED EVENTS OF FOLDERS AND THEIR CHILDREN INTO ONE EVENT
 
         # Avoid nested iterations over all events here, they are on the order of O(n^2)
@@ -2047,6 +2760,186 @@ class SyncEngine:
 
         return list(cleaned_events)
 
+    def _reconcile_local_moves(self, events: Set[FileSystemEvent]) -> None:
+        """
+        Replaces pairs of deleted and created events which actually belong to a move
+        with a single moved event. Such pairs are reported when items were moved while
+        sync was not running or when the file system watcher could not pair the move,
+        for instance when moving across watch boundaries or after an event overflow.
+        Uploading them as moves saves deleting and re-uploading the items.
+
+        Our index does not store inodes. Deleted files are therefore paired with
+        created files by comparing the content hash in our index with the local
+        content hash, which is cached and needed for the upload anyway. Folders are
+        paired when the files which they contain are paired at the same relative
+        paths. Moved events of children are collapsed into those of their parent folder
+        by :meth:`_clean_local_events`.
+
+        :param events: Set of local file system events with a single event per path.
+            Will be modified in place.
+        """
+
+        deleted = {e.src_path: e for e in events if e.event_type == EVENT_TYPE_DELETED}
+        created = {e.src_path: e for e in events if e.event_type == EVENT_TYPE_CREATED}
+
+        # Paths with both events are type changes.
+        for path in deleted.keys() & created.keys():
+            del deleted[path]
+            del created[path]
+
+        if len(deleted) == 0 or len(created) == 0:
+            return
+
+        # Collect deleted files by content hash and all deleted folders. Include the
+        # children of deleted folders from our index since the file system watcher
+        # may only report the deletion of the folder itself.
+
+        deleted_files: Dict[str, List[str]] = {}
+        deleted_dirs: Set[str] = set()
+
+        with self._database_access():
+            for path, event in deleted.items():
+
+                if osp.lexists(path):
+                    continue
+
+                dbx_path_lower = self.to_dbx_path_lower(path)
+
+                if event.is_directory:
+                    entries = self.get_index_entries_in_subtree(dbx_path_lower)
+                else:
+                    entries = [self._db_manager_index.get(dbx_path_lower)]
+
+                for entry in entries:
+                    entry = cast(Optional[IndexEntry], entry)
+
+                    if not entry:
+                        continue
+
+                    local_path = self.to_local_path_from_cased(entry.dbx_path_cased)
+
+                    if entry.is_directory:
+                        deleted_dirs.add(local_path)
+                    elif entry.content_hash:
+                        add_to_bin(deleted_files, entry.content_hash, local_path)
+
+        if len(deleted_files) == 0:
+            return
+
+        # Pair created files with deleted files of the same content, preferring those
+        # with the same name. Only hash created files which keep the name or the
+        # parent folder of a deleted file, this covers moves and renames and avoids
+        # hashing every new file on the sync thread.
+
+        deleted_names = set()
+        deleted_parents = set()
+
+        for paths in deleted_files.values():
+            for p in paths:
+                deleted_names.add(osp.basename(p))
+                deleted_parents.add(osp.dirname(p))
+
+        created_dirs = {p for p, e in created.items() if e.is_directory}
+        file_pairs: Dict[str, str] = {}
+
+        for path, event in created.items():
+
+            if event.is_directory:
+                continue
+
+            if (
+                osp.basename(path) not in deleted_names
+                and osp.dirname(path) not in deleted_parents
+            ):
+                continue
+
+            try:
+                local_hash = self.get_local_hash(path)
+            except MaestralApiError:
+                continue
+
+            candidates = deleted_files.get(local_hash) if local_hash else None
+
+            if candidates:
+                basename = osp.basename(path)
+                old_path = next(
+                    (p for p in candidates if osp.basename(p) == basename),
+                    candidates[0],
+                )
+                candidates.remove(old_path)
+                file_pairs[path] = old_path
+
+        # Every file pair votes for the pairs of parent folders which it implies.
+
+        votes: Dict[Tuple[str, str], int] = {}
+
+        for new_path, old_path in file_pairs.items():
+            while True:
+                old_parent = osp.dirname(old_path)
+                new_parent = osp.dirname(new_path)
+
+                if old_parent not in deleted_dirs or new_parent not in created_dirs:
+                    break
+
+                key = (old_parent, new_parent)
+                votes[key] = votes.get(key, 0) + 1
+
+                if osp.basename(old_parent) != osp.basename(new_parent):
+                    # The folder was renamed, its parents were not moved with it.
+                    break
+
+                old_path, new_path = old_parent, new_parent
+
+        dir_pairs: Dict[str, str] = {}
+
+        for (old_path, new_path), _ in sorted(votes.items(), key=lambda v: -v[1]):
+            if old_path not in dir_pairs and new_path not in dir_pairs.values():
+                dir_pairs[old_path] = new_path
+
+        # Only emit moves which can be applied as such: Deletions and folder moves are
+        # uploaded before creations and other moves. An item must therefore not be
+        # moved out of a deleted folder or into a created folder unless it is moved
+        # together with that folder.
+
+        moved_dirs: Dict[str, str] = {}
+
+        def can_move(old: str, new: str) -> bool:
+            old_parent = osp.dirname(old)
+            new_parent = osp.dirname(new)
+
+            if moved_dirs.get(old_parent) == new_parent:
+                return True
+
+            return old_parent not in deleted_dirs and new_parent not in created_dirs
+
+        for old_path in sorted(dir_pairs, key=lambda p: p.count("/")):
+            new_path = dir_pairs[old_path]
+            dir_moved_event = DirMovedEvent(old_path, new_path)
+
+            if not osp.isdir(new_path) or not can_move(old_path, new_path):
+                continue
+
+            if self._should_split_excluded(dir_moved_event):
+                continue
+
+            moved_dirs[old_path] = new_path
+            events.discard(DirDeletedEvent(old_path))
+            events.discard(DirCreatedEvent(new_path))
+            events.add(dir_moved_event)
+
+        for new_path, old_path in file_pairs.items():
+            file_moved_event = FileMovedEvent(old_path, new_path)
+
+            if not can_move(old_path, new_path):
+                continue
+
+            if self._should_split_excluded(file_moved_event):
+                continue
+
+            events.discard(FileDeletedEvent(old_path))
+            events.discard(FileCreatedEvent(new_path))
+            events.add(file_moved_event)
+
     def _should_split_excluded(self, event: Union[FileMovedEvent, DirMovedEvent]):
 
         if event.event_type != EVENT_TYPE_MOVED:
@@ -2178,6 +3071,9 @@ class SyncEngine:
         self.clear_sync_error(local_path=event.local_path)
         self.clear_sync_error(local_path=event.local_path_from)
         event.status = SyncStatus.Syncing
+        self._last_started = event
+
+        t0 = time.monotonic()
 
         try:
 
@@ -2199,11 +3095,15 @@ class SyncEngine:
                 event.status = SyncStatus.Skipped
 
         except SyncError as err:
+            if isinstance(err, RateLimitError):
+                self._concurrency.record_rate_limit()
             self._handle_sync_error(err, direction=SyncDirection.Up)
             event.status = SyncStatus.Failed
         finally:
             self.syncing.pop(event.local_path, None)
 
+        self._record_transfer(event, t0)
+
         # add to history database
         if event.status == SyncStatus.Done:
             with self._database_access():
@@ -2278,8 +3178,6 @@ class SyncEngine:
 
         md_to_new = client.move(dbx_path_from, event.dbx_path, autorename=True)
 
-        self.remove_node_from_index(event.dbx_path_from_lower)
-
         if md_to_new.name != osp.basename(event.local_path):
             # TODO: test this
             # conflicting copy created during upload, mirror remote changes locally
@@ -2302,18 +3200,59 @@ class SyncEngine:
                 'Moved "%s" to "%s" on Dropbox', dbx_path_from, event.dbx_path
             )
 
-        self._update_index_recursive(md_to_new, client)
+        self._update_index_after_move(
+            cast(str, event.dbx_path_from_lower), md_to_new, client
+        )
 
         return md_to_new
 
+    def _update_index_after_move(
+        self, dbx_path_from_lower: str, md: Metadata, client: DropboxClient
+    ) -> None:
+        """
+        Updates the index after an item was moved on Dropbox. Existing entries are moved
+        to the new location if they belong to the moved item. Otherwise, the index is
+        rebuilt from a listing of the new location.
+
+        :param dbx_path_from_lower: Normalized lower case Dropbox path of the old
+            location.
+        :param md: Metadata of the item at its new location, as returned by the move.
+        :param client: Client instance to use.
+        """
+
+        with self._database_access():
+
+            entry = self.get_index_entry(dbx_path_from_lower)
+
+            is_same_item = (
+                entry is not None
+                and entry.dbx_id == md.id
+                and entry.is_directory == isinstance(md, FolderMetadata)
+            )
+
+            if is_same_item:
+                dbx_path_cased = self.correct_case(md.path_display, client)
+
+                with self._db.transaction():
+                    self.move_node_in_index(
+                        dbx_path_from_lower, md.path_lower, dbx_path_cased
+                    )
+                    self.update_index_from_dbx_metadata(md, client)
+
+                return
+
+            self.remove_node_from_index(dbx_path_from_lower)
+
+        self._update_index_recursive(md, client)
+
     def _update_index_recursive(self, md: Metadata, client: DropboxClient) -> None:
 
         self.update_index_from_dbx_metadata(md, client)
 
         if isinstance(md, FolderMetadata):
-            result = client.list_folder(md.path_lower, recursive=True)
-            for md in result.entries:
-                self.update_index_from_dbx_metadata(md, client)
+            list_iter = client.list_folder_iterator(md.path_lower, recursive=True)
+            for res in list_iter:
+                self.update_index_from_dbx_metadata_batch(res.entries, client)
 
     def _on_local_created(
         self, event: SyncEvent, client: Optional[DropboxClient] = None
@@ -2368,10 +3307,13 @@ class SyncEngine:
                     return None
 
             local_entry = self.get_index_entry(event.dbx_path_lower)
+            md_new = None
 
             if not local_entry:
                 # file is new to us, let Dropbox rename it if something is in the way
                 mode = WriteMode.add
+                # try to copy identical content on Dropbox instead of uploading
+                md_new = self._copy_from_remote_duplicate(event, client)
             elif local_entry.is_directory:
                 # try to overwrite the destination, this will fail...
                 mode = WriteMode.overwrite
@@ -2384,19 +3326,22 @@ class SyncEngine:
                     event.dbx_path,
                 )
                 mode = WriteMode.update(local_entry.rev)
-            try:
-                md_new = client.upload(
-                    event.local_path,
-                    event.dbx_path,
-                    autorename=True,
-                    mode=mode,
-                    sync_event=event,
-                )
-            except NotFoundError:
-                self._logger.debug(
-                    'Could not upload "%s": the item does not exist', event.local_path
-                )
-                return None
+
+            if not md_new:
+                try:
+                    md_new = client.upload(
+                        event.local_path,
+                        event.dbx_path,
+                        autorename=True,
+                        mode=mode,
+                        sync_event=event,
+                    )
+                except NotFoundError:
+                    self._logger.debug(
+                        'Could not upload "%s": the item does not exist',
+                        event.local_path,
+                    )
+                    return None
 
         if md_new.name != osp.basename(event.local_path):
             # conflicting copy created during upload, mirror remote changes locally
@@ -2420,6 +3365,94 @@ class SyncEngine:
 
         return md_new
 
+    def _copy_from_remote_duplicate(
+        self, event: SyncEvent, client: DropboxClient
+    ) -> Optional[FileMetadata]:
+        """
+        Tries to create a new file on Dropbox with a server-side copy of a synced file
+        with the same content hash. If the source has changed on Dropbox since it was
+        last synced, the copy is overwritten by uploading the local file. Any errors
+        are logged and None is returned such that the caller falls back to a regular
+        upload.
+
+        :param event: SyncEvent for the created file.
+        :param client: Client instance to use.
+        :returns: Metadata of the created file or None if there is no source to copy or
+            the copy failed.
+        """
+
+        if not event.content_hash:
+            return None
+
+        entries = self.get_index_entries_with_hash(event.content_hash)
+
+        for entry in entries:
+
+            if entry.dbx_path_lower == event.dbx_path_lower or entry.is_directory:
+                continue
+
+            try:
+                md = client.copy(entry.dbx_path_lower, event.dbx_path, autorename=True)
+            except (NotFoundError, PathError):
+                continue
+            except MaestralApiError as exc:
+                self._logger.debug(
+                    'Could not copy "%s" to "%s": %s',
+                    entry.dbx_path_cased,
+                    event.dbx_path,
+                    exc,
+                )
+                return None
+
+            if not isinstance(md, FileMetadata):
+                # The source has been replaced by a folder, undo the copy.
+                self._remove_remote_copy(md, client)
+                continue
+
+            self._logger.debug(
+                'Created "%s" on Dropbox as a copy of "%s"',
+                event.dbx_path,
+                entry.dbx_path_cased,
+            )
+
+            if md.content_hash == event.content_hash:
+                event.completed = event.size
+                return md
+
+            # The source has changed since it was last synced.
+            try:
+                return client.upload(
+                    event.local_path,
+                    md.path_display,
+                    autorename=True,
+                    mode=WriteMode.update(md.rev),
+                    sync_event=event,
+                )
+            except MaestralApiError as exc:
+                self._logger.debug(
+                    'Could not update copy "%s": %s', md.path_display, exc
+                )
+                # Don't leave an outdated copy behind, the caller uploads instead.
+                self._remove_remote_copy(md, client)
+                event.completed = 0
+                return None
+
+        return None
+
+    def _remove_remote_copy(self, md: Metadata, client: DropboxClient) -> None:
+        """
+        Removes a copy created by :meth:`_copy_from_remote_duplicate`. Errors are
+        logged and ignored.
+
+        :param md: Metadata of the copy.
+        :param client: Client instance to use.
+        """
+
+        try:
+            client.remove(md.path_lower, parent_rev=getattr(md, "rev", None))
+        except MaestralApiError as exc:
+            self._logger.debug('Could not remove copy "%s": %s', md.path_display, exc)
+
     def _on_local_modified(
         self, event: SyncEvent, client: Optional[DropboxClient] = None
     ) -> Optional[Metadata]:
@@ -2835,6 +3868,7 @@ class SyncEngine:
             sync_events = [
                 SyncEvent.from_dbx_metadata(md, self) for md in changes.entries
             ]
+            sync_events = self._reconcile_remote_moves(sync_events)
 
             self._logger.debug("Converted remote changes to SyncEvents")
 
@@ -2882,6 +3916,9 @@ class SyncEngine:
 
             if event.is_deleted:
                 add_to_bin(deleted, level, event)
+            elif event.is_moved:
+                # moves are applied together with folders of the same level
+                add_to_bin(folders, level, event)
             elif event.is_file:
                 files.append(event)
             elif event.is_directory:
@@ -2908,7 +3945,8 @@ class SyncEngine:
                     throttled_log(self._logger, f"Deleting {n + 1}/{n_items}...")
                     results.append(r)
 
-        # create local folders, start with top-level and work your way down
+        # create local folders and apply moves, start with top-level and work your
+        # way down
         if folders:
             self._logger.info("Creating folders...")
         for level in sorted(folders):
@@ -2924,16 +3962,22 @@ class SyncEngine:
                     throttled_log(self._logger, f"Creating folder {n + 1}/{n_items}...")
                     results.append(r)
 
-        # apply created files
-        with ThreadPoolExecutor(
-            max_workers=self._num_threads, thread_name_prefix="maestral-download-pool"
-        ) as executor:
-            res = executor.map(self._create_local_entry, files)
+        # apply created files in order of priority
+        with self._transfer_executor("maestral-download-pool") as executor:
+            futures = [
+                executor.submit(
+                    self._create_local_entry,
+                    event,
+                    priority=self._transfer_priority(event),
+                    key=event.local_path,
+                )
+                for event in files
+            ]
 
             n_items = len(files)
-            for n, r in enumerate(res):
+            for n, future in enumerate(futures):
                 throttled_log(self._logger, f"Syncing ↓ {n + 1}/{n_items}")
-                results.append(r)
+                results.append(future.result())
 
         self._clean_history()
 
@@ -3251,6 +4295,80 @@ class SyncEngine:
 
         return changes
 
+    def _reconcile_remote_moves(self, sync_events: List[SyncEvent]) -> List[SyncEvent]:
+        """
+        Dropbox reports moves as a deletion of the old path and an addition of the new
+        path. This pairs deletions with additions of the same item, identified by its
+        Dropbox ID in our index, and replaces them by a single move event.
+
+        Moves are only paired if the old path itself is deleted but none of its parents,
+        such that the item is still present locally when the move is applied. Children
+        of a moved folder are reported as additions and will be found identical to the
+        local items once the folder has been moved.
+
+        :param sync_events: Remote changes.
+        :returns: Remote changes with paired moves.
+        """
+
+        deleted = {e.dbx_path_lower for e in sync_events if e.is_deleted}
+
+        if not deleted:
+            return sync_events
+
+        paired: Set[str] = set()
+
+        for event in sync_events:
+
+            if event.is_deleted or not event.dbx_id:
+                continue
+
+            if self.is_excluded_by_user(event.dbx_path_lower) or self.is_excluded(
+                event.dbx_path
+            ):
+                continue
+
+            with self._database_access():
+                entries = self._db_manager_index.query_to_objects(
+                    "SELECT * FROM 'index' WHERE dbx_id = ?", event.dbx_id
+                )
+
+            for entry in entries:
+
+                entry = cast(IndexEntry, entry)
+                path_from = entry.dbx_path_lower
+
+                if (
+                    path_from not in deleted
+                    or path_from in paired
+                    or entry.item_type is not event.item_type
+                ):
+                    continue
+
+                parent = osp.dirname(path_from)
+                parent_deleted = False
+
+                while parent != "/":
+                    if parent in deleted:
+                        parent_deleted = True
+                        break
+                    parent = osp.dirname(parent)
+
+                if parent_deleted:
+                    continue
+
+                event.change_type = ChangeType.Moved
+                event.dbx_path_from = entry.dbx_path_cased
+                event.dbx_path_from_lower = path_from
+                event.local_path_from = self.to_local_path_from_cased(
+                    entry.dbx_path_cased
+                )
+                paired.add(path_from)
+                break
+
+        return [
+            e for e in sync_events if not (e.is_deleted and e.dbx_path_lower in paired)
+        ]
+
     def _create_local_entry(self, event: SyncEvent) -> SyncEvent:
         """
         Applies a file / folder change from Dropbox servers to the local Dropbox folder.
@@ -3270,10 +4388,16 @@ class SyncEngine:
 
         self.clear_sync_error(dbx_path=event.dbx_path)
         event.status = SyncStatus.Syncing
+        self._last_started = event
+
+        t0 = time.monotonic()
 
         try:
             if event.is_deleted:
                 res = self._on_remote_deleted(event)
+            elif event.is_moved:
+                with self.client.clone_with_new_session() as client:
+                    res = self._on_remote_moved(event, client)
             elif event.is_file:
                 with self.client.clone_with_new_session() as client:
                     res = self._on_remote_file(event, client)
@@ -3288,11 +4412,15 @@ class SyncEngine:
                 event.status = SyncStatus.Skipped
 
         except SyncError as e:
+            if isinstance(e, RateLimitError):
+                self._concurrency.record_rate_limit()
             self._handle_sync_error(e, direction=SyncDirection.Down)
             event.status = SyncStatus.Failed
         finally:
             self.syncing.pop(event.local_path, None)
 
+        self._record_transfer(event, t0)
+
         # add to history database
         if event.status == SyncStatus.Done:
             with self._database_access():
@@ -3332,15 +4460,18 @@ class SyncEngine:
         local_path = event.local_path
 
         # we download to a temporary file first (this may take some time)
-        tmp_fname = self._new_tmp_file()
+        tmp_fname = self._partial_download_path(event)
 
-        try:
-            md = client.download(f"rev:{event.rev}", tmp_fname, sync_event=event)
-            event = SyncEvent.from_dbx_metadata(md, self)
-        except SyncError as err:
-            # replace rev number with path
-            err.dbx_path = event.dbx_path
-            raise err
+        if not self._copy_from_local_duplicate(event, tmp_fname):
+            try:
+                md = client.download(
+                    f"rev:{event.rev}", tmp_fname, sync_event=event, resumable=True
+                )
+                event = SyncEvent.from_dbx_metadata(md, self)
+            except SyncError as err:
+                # replace rev number with path
+                err.dbx_path = event.dbx_path
+                raise err
 
         # re-check for conflict and move the conflict
         # out of the way if anything has changed
@@ -3378,8 +4509,6 @@ class SyncEngine:
         # move the downloaded file to its destination
         with self.fs_events.ignore(*ignore_events):
 
-            mtime = os.stat(tmp_fname).st_mtime
-
             with convert_api_errors(dbx_path=event.dbx_path, local_path=local_path):
                 move(
                     tmp_fname,
@@ -3387,14 +4516,72 @@ class SyncEngine:
                     preserve_dest_permissions=preserve_permissions,
                     raise_error=True,
                 )
+                mtime = os.stat(local_path).st_mtime
 
-        self.update_index_from_sync_event(event)
-        self._save_local_hash(event.local_path, event.content_hash, mtime)
+        # The content hash has been verified against the downloaded data. Save it
+        # together with the index entry to spare rehashing the file later.
+        with self._database_access():
+            self.update_index_from_sync_event(event)
+            self._save_local_hash(event.local_path, event.content_hash, mtime)
 
         self._logger.debug('Created local file "%s"', event.dbx_path)
 
         return event
 
+    def _copy_from_local_duplicate(self, event: SyncEvent, dest_path: str) -> bool:
+        """
+        Tries to satisfy a file download by copying a local file with the same content
+        hash. Candidates are found through the index and their content is verified
+        against the hash cache or by rehashing before copying. A candidate is only used
+        if it remains unchanged while it is copied.
+
+        :param event: SyncEvent for file download.
+        :param dest_path: Path to copy to.
+        :returns: Whether a local file was copied.
+        """
+
+        if not event.content_hash:
+            return False
+
+        entries = self.get_index_entries_with_hash(event.content_hash)
+
+        for entry in entries:
+
+            if entry.dbx_path_lower == event.dbx_path_lower or entry.is_directory:
+                continue
+
+            src_path = self.to_local_path_from_cased(entry.dbx_path_cased)
+
+            try:
+                stat_before = os.stat(src_path)
+
+                if self.get_local_hash(src_path) != event.content_hash:
+                    continue
+
+                copy_file(src_path, dest_path)
+                stat_after = os.stat(src_path)
+            except (OSError, MaestralApiError):
+                continue
+
+            if (
+                stat_before.st_mtime != stat_after.st_mtime
+                or stat_after.st_size != event.size
+            ):
+                continue
+
+            # Set the mtime as for downloaded files.
+            now = time.time()
+            os.utime(dest_path, (now, min(event.change_time or now, now)))
+            event.completed = event.size
+
+            self._logger.debug(
+                'Copied "%s" from identical local file "%s"', event.dbx_path, src_path
+            )
+
+            return True
+
+        return False
+
     def _on_remote_folder(self, event: SyncEvent) -> Optional[SyncEvent]:
         """
         Applies a remote folder creation locally.
@@ -3492,6 +4679,103 @@ class SyncEngine:
         else:
             raise os_to_maestral_error(exc, dbx_path=event.dbx_path)
 
+    def _on_remote_moved(
+        self, event: SyncEvent, client: Optional[DropboxClient] = None
+    ) -> Optional[SyncEvent]:
+        """
+        Applies a remote move locally by renaming the local item. If the move cannot be
+        applied, for instance because the local item has unsynced changes or the file
+        content has changed on Dropbox as well, the old item is deleted and the new item
+        is downloaded instead.
+
+        :param event: SyncEvent for the move.
+        :param client: Client instance to use. If not given, use the instance provided
+            in the constructor.
+        :returns: SyncEvent corresponding to local item or None if no local changes
+            are made.
+        """
+
+        local_path_from = cast(str, event.local_path_from)
+        dbx_path_from = cast(str, event.dbx_path_from)
+
+        if self._can_apply_remote_move(event):
+
+            event_cls = DirMovedEvent if event.is_directory else FileMovedEvent
+            with self.fs_events.ignore(event_cls(local_path_from, event.local_path)):
+                exc = move(local_path_from, event.local_path)
+
+            if not exc and osp.lexists(event.local_path):
+                self.update_index_from_sync_event(event)
+                self._logger.debug(
+                    'Moved local item "%s" to "%s"', dbx_path_from, event.dbx_path
+                )
+                return event
+
+        self._logger.debug(
+            'Cannot move "%s" to "%s" locally, downloading instead',
+            dbx_path_from,
+            event.dbx_path,
+        )
+
+        md_deleted = DeletedMetadata(
+            name=osp.basename(dbx_path_from),
+            path_lower=event.dbx_path_from_lower,
+            path_display=dbx_path_from,
+        )
+        self._on_remote_deleted(SyncEvent.from_dbx_metadata(md_deleted, self))
+
+        if self.get_local_rev(event.dbx_path_lower):
+            event.change_type = ChangeType.Modified
+        else:
+            event.change_type = ChangeType.Added
+
+        event.dbx_path_from = None
+        event.dbx_path_from_lower = None
+        event.local_path_from = None
+
+        if event.is_directory:
+            return self._on_remote_folder(event)
+        else:
+            return self._on_remote_file(event, client)
+
+    def _can_apply_remote_move(self, event: SyncEvent) -> bool:
+        """
+        Checks if a remote move can be applied by renaming the local item: the local item
+        must exist and be of the same type, a file must be unchanged locally and on
+        Dropbox since it was last synced and the destination must be free.
+
+        :param event: SyncEvent for the move.
+        :returns: Whether the local item can be moved.
+        """
+
+        local_path_from = cast(str, event.local_path_from)
+
+        if not osp.isdir(osp.dirname(event.local_path)) or osp.lexists(
+            event.local_path
+        ):
+            return False
+
+        try:
+            stat = os.lstat(local_path_from)
+        except OSError:
+            return False
+
+        if event.is_directory:
+            return S_ISDIR(stat.st_mode)
+
+        if S_ISDIR(stat.st_mode):
+            return False
+
+        entry = self.get_index_entry(cast(str, event.dbx_path_from_lower))
+
+        if not entry or entry.content_hash != event.content_hash:
+            return False
+
+        try:
+            return self.get_local_hash(local_path_from) == entry.content_hash
+        except MaestralApiError:
+            return False
+
     def _apply_case_change(self, event: SyncEvent) -> None:
         """
         Applies any changes in casing of the remote item locally. This should be called
@@ -3547,17 +4831,9 @@ class SyncEngine:
 
             # add deleted events
 
-            local_path_lower = normalize(local_path)
-
-            with self._database_access():
-
-                entries = self._db_manager_index.query_to_objects(
-                    "SELECT * FROM 'index' WHERE dbx_path_lower LIKE ?",
-                    f"{local_path_lower}%",
-                )
+            dbx_path_lower = self.to_dbx_path_lower(local_path)
 
-            for entry in entries:
-                entry = cast(IndexEntry, entry)
+            for entry in self.get_index_entries_in_subtree(dbx_path_lower):
                 child_path = self.to_local_path_from_cased(entry.dbx_path_cased)
                 if not osp.exists(child_path):
                     if entry.is_directory:
@@ -3658,6 +4934,23 @@ def split_moved_event(
     return deleted_event, created_event
 
 
+def subtree_condition(column: str, path: str) -> Tuple[str, List[str]]:
+    """
+    Returns an SQL condition which selects the given path and all its children in a
+    column of normalized paths, together with the parameters to substitute. Children
+    are selected by a range of paths instead of a ``LIKE`` pattern so that SQLite can
+    use an index of the column: since ``"0"`` directly follows ``"/"``, all children of
+    ``path`` sort between ``path + "/"`` and ``path + "0"``.
+
+    :param column: Name of the column.
+    :param path: Path to select. Must not have a trailing slash. An empty string
+        selects all paths.
+    :returns: Tuple of the SQL condition and its parameters.
+    """
+    condition = f"({column} = ? OR ({column} > ? AND {column} < ?))"
+    return condition, [path, f"{path}/", f"{path}0"]
+
+
 class pf_repr:
     """
     Class that wraps an object and creates a pretty formatted representation for it.
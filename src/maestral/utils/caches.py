@@ -3,12 +3,14 @@
 
 from collections import OrderedDict
 from threading import RLock
-from typing import Any
+from typing import Any, Dict
 
 
 class LRUCache:
     """A simple LRU cache implementation
 
+    Counts cache hits, misses and evictions to help with choosing the capacity.
+
     :param capacity: Maximum number of of entries to keep.
     """
 
@@ -18,6 +20,9 @@ class LRUCache:
         self._lock = RLock()
         self._cache = OrderedDict()
         self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
 
     def get(self, key: Any) -> Any:
         """
@@ -29,10 +34,24 @@ class LRUCache:
         with self._lock:
             try:
                 self._cache.move_to_end(key)
-                return self._cache[key]
             except KeyError:
+                self.misses += 1
                 return None
 
+            self.hits += 1
+            return self._cache[key]
+
+    def peek(self, key: Any) -> Any:
+        """
+        Get the cached value for a key without marking it as recently used or counting
+        the lookup as a hit or miss.
+
+        :param key: Key to query.
+        :returns: Cached value or None.
+        """
+        with self._lock:
+            return self._cache.get(key)
+
     def put(self, key: Any, value: Any) -> None:
         """
         Set the cached value for a key. Mark as most recently used.
@@ -43,8 +62,35 @@ class LRUCache:
         with self._lock:
             self._cache[key] = value
             self._cache.move_to_end(key)
-            if len(self._cache) > self.capacity:
+            while len(self._cache) > self.capacity:
                 self._cache.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Any) -> Any:
+        """
+        Removes the cached value for a key.
+
+        :param key: Key to remove.
+        :returns: Removed value or None.
+        """
+        with self._lock:
+            return self._cache.pop(key, None)
+
+    def pop_prefix(self, prefix: str) -> int:
+        """
+        Removes the cached values for all string keys which start with the given prefix.
+
+        :param prefix: Prefix of keys to remove.
+        :returns: Number of removed values.
+        """
+        with self._lock:
+            keys = [
+                k for k in self._cache if isinstance(k, str) and k.startswith(prefix)
+            ]
+            for key in keys:
+                del self._cache[key]
+
+            return len(keys)
 
     def clear(self) -> None:
         """
@@ -53,3 +99,21 @@ class LRUCache:
 
         with self._lock:
             self._cache.clear()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        The current number of entries, the capacity and the total number of hits, misses
+        and evictions.
+        """
+        with self._lock:
+            return dict(
+                size=len(self._cache),
+                capacity=self.capacity,
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+            )
+
+    def __len__(self) -> int:
+        return len(self._cache)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Module containing a feed of changes which clients can follow with a cursor."""
+
+import uuid
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Dict, Hashable, List, Tuple
+
+
+__all__ = ["ChangeFeed"]
+
+
+_marker = object()
+
+
+class ChangeFeed:
+    """A feed of changes to a collection of keyed values
+
+    The feed is updated with successive snapshots of the collection and records which
+    keys have changed or have been removed between them. Every update which contains
+    changes advances the cursor of the feed. Clients can keep the cursor of the last
+    changes which they have seen and request all changes since then. Multiple changes
+    to the same key are coalesced.
+
+    Cursors are opaque strings which contain a random id of the feed instance. Removed
+    keys are remembered up to a maximum number. If a client requests changes since a
+    cursor for which removals have already been forgotten or which was returned by a
+    different feed instance, for instance before a restart, all current keys are
+    returned instead and the client should discard its state.
+
+    :param max_removed: Maximum number of removed keys to remember.
+    """
+
+    def __init__(self, max_removed: int = 10000) -> None:
+        self._lock = RLock()
+        self._epoch = uuid.uuid4().hex[:16]
+        self._cursor = 0
+        self._horizon = 0
+        self._max_removed = max_removed
+
+        self._values: Dict[Hashable, Any] = {}
+        self._changed: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._removed: "OrderedDict[Hashable, int]" = OrderedDict()
+
+    @property
+    def cursor(self) -> str:
+        """The cursor of the last change."""
+        return self._format_cursor(self._cursor)
+
+    def _format_cursor(self, cursor: int) -> str:
+        return f"{self._epoch}:{cursor}"
+
+    def _parse_cursor(self, cursor: str) -> int:
+        # Returns zero for invalid cursors or cursors from a different feed instance.
+        epoch, _, count = cursor.partition(":")
+
+        if epoch != self._epoch:
+            return 0
+
+        try:
+            return int(count)
+        except ValueError:
+            return 0
+
+    def update(self, snapshot: Dict[Hashable, Any]) -> bool:
+        """
+        Updates the feed with the current values. Values are compared by equality with
+        those from the previous snapshot.
+
+        :param snapshot: Dictionary of all current values by key.
+        :returns: Whether there were any changes.
+        """
+        with self._lock:
+            changed = [
+                key
+                for key, value in snapshot.items()
+                if self._values.get(key, _marker) != value
+            ]
+            removed = [key for key in self._values if key not in snapshot]
+
+            if len(changed) == 0 and len(removed) == 0:
+                return False
+
+            self._cursor += 1
+
+            for key in changed:
+                self._changed[key] = self._cursor
+                self._changed.move_to_end(key)
+                self._removed.pop(key, None)
+
+            for key in removed:
+                del self._changed[key]
+                self._removed[key] = self._cursor
+
+            while len(self._removed) > self._max_removed:
+                _, self._horizon = self._removed.popitem(last=False)
+
+            self._values = dict(snapshot)
+
+            return True
+
+    def changes(self, cursor: str) -> Tuple[str, List[Hashable], List[Hashable], bool]:
+        """
+        Returns all changes since the given cursor.
+
+        :param cursor: Cursor returned by a previous call or an empty string to get all
+            current keys.
+        :returns: Tuple of the new cursor, the keys which have been added or changed,
+            the keys which have been removed and whether the changes are a reset. In
+            case of a reset, the changed keys are all current keys and no removed keys
+            are returned.
+        """
+        with self._lock:
+
+            count = self._parse_cursor(cursor)
+            new_cursor = self._format_cursor(self._cursor)
+
+            if count <= 0 or count < self._horizon or count > self._cursor:
+                return new_cursor, list(self._changed), [], True
+
+            changed = self._since(self._changed, count)
+            removed = self._since(self._removed, count)
+
+            return new_cursor, changed, removed, False
+
+    @staticmethod
+    def _since(keys: "OrderedDict[Hashable, int]", cursor: int) -> List[Hashable]:
+        # Keys are ordered by the cursor of their last change, collect from the end.
+        result = []
+
+        for key in reversed(keys):
+            if keys[key] <= cursor:
+                break
+            result.append(key)
+
+        result.reverse()
+
+        return result
@@ -9,8 +9,26 @@ memory is constrained.
 """
 import sqlite3
 from enum import Enum
-from weakref import WeakValueDictionary
-from typing import Union, Type, Any, Dict, Generator, List, Optional, TypeVar, Iterable
+from threading import RLock
+from contextlib import contextmanager
+from types import MemberDescriptorType
+from typing import (
+    Union,
+    Type,
+    Any,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    TypeVar,
+    Iterable,
+    Sequence,
+    Tuple,
+    Callable,
+    Iterator,
+)
+
+from .caches import LRUCache
 
 
 ColumnValueType = Union[str, int, float, Enum, None]
@@ -18,6 +36,9 @@ DefaultColumnValueType = Union[ColumnValueType, Type["NoDefault"]]
 SQLSafeType = Union[str, int, float, None]
 T = TypeVar("T")
 
+# ``INSERT ... ON CONFLICT DO UPDATE`` is only supported from SQLite 3.24 onwards.
+HAS_UPSERT = sqlite3.sqlite_version_info >= (3, 24, 0)
+
 
 __all__ = [
     "SqlType",
@@ -25,6 +46,7 @@ __all__ = [
     "SqlInt",
     "SqlFloat",
     "SqlPath",
+    "SqlHex",
     "SqlEnum",
     "Column",
     "NoDefault",
@@ -93,6 +115,38 @@ class SqlPath(SqlType):
     py_type = str
 
 
+class SqlHex(SqlType):
+    """
+    Class to represent hexadecimal strings such as hashes in SQLite table
+
+    Lower case hexadecimal strings are stored as BLOBs of half the size. Any other
+    strings, for instance placeholder values, are stored unchanged as TEXT.
+    """
+
+    sql_type = "BLOB"
+    py_type = str
+
+    @staticmethod
+    def sql_to_py(value: Union[bytes, str, None]) -> Optional[str]:  # type: ignore
+        if isinstance(value, bytes):
+            return value.hex()
+        else:
+            return value
+
+    @staticmethod
+    def py_to_sql(value: Optional[str]) -> Union[bytes, str, None]:  # type: ignore
+        if isinstance(value, str):
+            try:
+                blob = bytes.fromhex(value)
+            except ValueError:
+                return value
+
+            if blob and blob.hex() == value:
+                return blob
+
+        return value
+
+
 class SqlEnum(SqlType):
     """Class to represent Python enums in SQLite table"""
 
@@ -127,6 +181,8 @@ class Column(property):
     :param unique: If ``True``, sets a unique constraint on the column.
     :param primary_key: If ``True``, marks this column as a primary key column.
         Currently, only a single primary key column is supported.
+    :param index: If ``True``, creates an index for the column to speed up queries
+        which filter by its value.
     :param default: Default value for the column. Set to :class:`NoDefault` if no
         default value should be used. Note than None / NULL is a valid default for an
         SQLite column.
@@ -138,6 +194,7 @@ class Column(property):
         nullable: bool = True,
         unique: bool = False,
         primary_key: bool = False,
+        index: bool = False,
         default: DefaultColumnValueType = None,
     ):
         super().__init__(fget=self._fget, fset=self._fset)
@@ -146,6 +203,7 @@ class Column(property):
         self.nullable = nullable
         self.unique = unique
         self.primary_key = primary_key
+        self.index = index
 
         self.default: DefaultColumnValueType
 
@@ -246,12 +304,20 @@ def column_value_dict(obj: "Model") -> Dict[str, Any]:
 
 
 class Database:
-    """Proxy class to access sqlite3.connect method."""
+    """
+    Proxy class to access sqlite3.connect method.
+
+    Every statement is committed immediately unless it is executed within a
+    :meth:`transaction`.
+    """
 
     def __init__(self, *args, **kwargs) -> None:
         self.args = args
         self.kwargs = kwargs
         self._connection: Optional[sqlite3.Connection] = None
+        self._lock = RLock()
+        self._transaction_depth = 0
+        self._rollback_callbacks: List[Callable[[], Any]] = []
         self.Model = type(f"Model{self}", (Model,), {"_db": self})
 
     @property
@@ -276,6 +342,78 @@ class Database:
         """Commits SQL changes."""
         self.connection.commit()
 
+    @property
+    def user_version(self) -> int:
+        """
+        The user version of the database. This is not used by SQLite and can be used
+        to track the version of the schema, for example to decide on migrations.
+        """
+        return self.execute("PRAGMA user_version").fetchone()[0]
+
+    @user_version.setter
+    def user_version(self, version: int) -> None:
+        """Setter: user_version"""
+        self.execute(f"PRAGMA user_version = {int(version)}")
+
+    @property
+    def in_transaction(self) -> bool:
+        """Whether a :meth:`transaction` is currently active."""
+        return self._transaction_depth > 0
+
+    def add_rollback_callback(self, callback: Callable[[], Any]) -> None:
+        """
+        Registers a function which is called after a :meth:`transaction` has been
+        rolled back, for instance to invalidate cached objects which no longer match
+        the database.
+
+        :param callback: Function to call without arguments.
+        """
+        with self._lock:
+            self._rollback_callbacks.append(callback)
+
+    def _rolled_back(self) -> None:
+        for callback in self._rollback_callbacks:
+            callback()
+
+    @contextmanager
+    def transaction(self) -> Iterator["Database"]:
+        """
+        A context manager which groups all statements executed within its context into
+        a single transaction. The transaction is committed when the context exits and
+        rolled back if it exits with an exception. Other threads are blocked from
+        accessing the database until then.
+
+        Transactions may be nested. Nested transactions are implemented as savepoints:
+        an exception rolls back the statements of the innermost transaction only and is
+        then propagated to the outer transactions.
+
+        :returns: This database.
+        """
+
+        with self._lock:
+
+            savepoint = f"sp_{self._transaction_depth}"
+            self.connection.execute(f"SAVEPOINT {savepoint}")
+            self._transaction_depth += 1
+
+            try:
+                yield self
+            except BaseException:
+                self.connection.execute(f"ROLLBACK TO {savepoint}")
+                self.connection.execute(f"RELEASE {savepoint}")
+                self._rolled_back()
+                raise
+            else:
+                try:
+                    self.connection.execute(f"RELEASE {savepoint}")
+                except sqlite3.Error:
+                    if self._transaction_depth == 1:
+                        self.connection.rollback()
+                        self._rolled_back()
+                    raise
+            finally:
+                self._transaction_depth -= 1
+
     def execute(self, sql: str, *args) -> sqlite3.Cursor:
         """
         Creates a cursor and executes the given SQL statement.
@@ -284,40 +422,80 @@ class Database:
         :param args: Parameters to substitute for placeholders in SQL statement.
         :returns: The created cursor.
         """
-        with self.connection:
-            return self.connection.execute(sql, args)
+        with self._lock:
+            if self._transaction_depth > 0:
+                return self.connection.execute(sql, args)
+
+            with self.connection:
+                return self.connection.execute(sql, args)
+
+    def executemany(self, sql: str, args: Iterable[Sequence]) -> sqlite3.Cursor:
+        """
+        Creates a cursor and executes the given SQL statement once for every set of
+        parameters. All executions are committed in a single transaction and rolled
+        back together if any of them fails.
+
+        :param sql: SQL statement to execute.
+        :param args: Iterable of parameter sequences to substitute for placeholders in
+            the SQL statement.
+        :returns: The created cursor.
+        """
+        with self._lock:
+            if self._transaction_depth > 0:
+                return self.connection.executemany(sql, args)
+
+            with self.connection:
+                return self.connection.executemany(sql, args)
 
     def executescript(self, script: str) -> None:
         """
-        Creates a cursor and executes the given SQL script.
+        Creates a cursor and executes the given SQL script. Note that any pending
+        transaction is committed before executing the script. This must therefore not
+        be used within a :meth:`transaction`.
 
         :param script: SQL script to execute.
         :returns: The created cursor.
+        :raises RuntimeError: if called within a transaction.
         """
-        with self.connection:
-            self.connection.cursor().executescript(script)
+        with self._lock:
+            if self._transaction_depth > 0:
+                raise RuntimeError("Cannot execute a script within a transaction")
+
+            with self.connection:
+                self.connection.cursor().executescript(script)
 
 
 class Manager:
     """
     A data mapper interface for a table model.
 
-    Creates the table as defined in the model if it doesn't already exist. Keeps a cache
-    of weak references to all retrieved and created rows to speed up queries. The cache
-    should be cleared manually changes where made to the table from outside this
-    manager.
+    Creates the table as defined in the model if it doesn't already exist. Keeps an LRU
+    cache of model objects by primary key which acts as an identity map: rows retrieved
+    with :meth:`get` and objects saved or updated through this manager are cached and
+    queries return the cached objects for rows which are in the cache. Rows returned
+    by other queries are not added to the cache to avoid evicting frequently accessed
+    rows. The cache is cleared when a :meth:`Database.transaction` is rolled back and
+    should be cleared manually if changes where made to the table from outside this
+    manager, see :meth:`clear_cache`.
 
     :param db: Database to use.
     :param model: Model for database table.
+    :param cache_size: Maximum number of model objects to keep in the cache.
     """
 
-    def __init__(self, db: Database, model: Type["Model"]) -> None:
+    def __init__(
+        self, db: Database, model: Type["Model"], cache_size: int = 1000
+    ) -> None:
         self.db = db
         self.model = model
         self.table_name = model.__tablename__
         self.pk_column = self._find_primary_key(model)
 
-        self._cache: "WeakValueDictionary[SQLSafeType, Model]" = WeakValueDictionary()
+        self._cache = LRUCache(capacity=cache_size)
+        self._loaders: Dict[Tuple[Tuple[str, ...], bool], Callable] = {}
+
+        # Cached objects may have been saved by statements which were rolled back.
+        db.add_rollback_callback(self.clear_cache)
 
         # Precompute expensive SQL query strings.
         self._columns = columns(model)
@@ -338,9 +516,31 @@ class Manager:
             self.pk_column.name,
         )
 
+        self._sql_delete_template = "DELETE FROM {} WHERE {} = ?".format(
+            self.table_name, self.pk_column.name
+        )
+
+        if HAS_UPSERT:
+            update_expressions = [
+                f"{name} = excluded.{name}"
+                for name in column_names
+                if name != self.pk_column.name
+            ]
+            self._sql_upsert_template = "{} ON CONFLICT({}) DO UPDATE SET {}".format(
+                self._sql_insert_template,
+                self.pk_column.name,
+                ", ".join(update_expressions),
+            )
+        else:
+            self._sql_upsert_template = self._sql_insert_template.replace(
+                "INSERT", "INSERT OR REPLACE", 1
+            )
+
         # Create table if required.
         if not self._has_table():
             self.create_table()
+        else:
+            self.create_indices()
 
     @staticmethod
     def _find_primary_key(model: Type["Model"]) -> Column:
@@ -355,13 +555,99 @@ class Manager:
 
         column_defs = [col.render_column() for col in columns(self.model)]
         column_defs_str = ", ".join(column_defs)
-        sql = f"CREATE TABLE {self.model.__tablename__} ({column_defs_str});"
+        sql = f"CREATE TABLE {self.model.__tablename__} ({column_defs_str})"
+
+        if self.model.__without_rowid__:
+            sql += " WITHOUT ROWID"
+
+        with self.db.transaction():
+            self.db.execute(sql)
+            self.create_indices()
+
+    def rebuild_table(self, batch_size: int = 10000) -> None:
+        """
+        Recreates the table as defined by the model and copies all rows from the
+        existing table, converting their values to the current column types. This can
+        be used to migrate a table after changing the model, for example the column
+        types. Columns which no longer exist in the model are dropped. All changes are
+        applied in a single transaction.
+
+        :param batch_size: Number of rows to copy at once.
+        """
+
+        table_name = self.table_name.strip("'\"")
+        old_table_name = f"'{table_name}_old'"
+
+        with self.db.transaction():
+
+            self.db.execute(f"ALTER TABLE {self.table_name} RENAME TO {old_table_name}")
+
+            # Indices are moved with the table, drop them to free their names.
+            for col in self._columns:
+                if col.index:
+                    self.db.execute(f"DROP INDEX IF EXISTS idx_{table_name}_{col.name}")
+
+            self.create_table()
+
+            result = self._execute(f"SELECT * FROM {old_table_name}")
 
-        self.db.executescript(sql)
+            names = [desc[0] for desc in result.description]
+            cols = [getattr(self.model, name, None) for name in names]
+            copied = [(i, col) for i, col in enumerate(cols) if isinstance(col, Column)]
 
-    def clear_cache(self) -> None:
-        """Clears our cache."""
-        self._cache.clear()
+            column_names_str = ", ".join(col.name for _, col in copied)
+            column_refs = ", ".join(["?"] * len(copied))
+            sql = (
+                f"INSERT INTO {self.table_name} ({column_names_str}) "
+                f"VALUES ({column_refs})"
+            )
+
+            rows = result.fetchmany(batch_size)
+
+            while len(rows) > 0:
+                args = [
+                    [col.py_to_sql(col.sql_to_py(row[i])) for i, col in copied]
+                    for row in rows
+                ]
+                self.db.executemany(sql, args)
+                rows = result.fetchmany(batch_size)
+
+            self.db.execute(f"DROP TABLE {old_table_name}")
+
+        self.clear_cache()
+
+    def create_indices(self) -> None:
+        """Creates indices for all columns which request one, if not yet present."""
+
+        table_name = self.table_name.strip("'\"")
+
+        for col in self._columns:
+            if col.index:
+                self.db.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{col.name} "
+                    f"ON {self.table_name} ({col.name})"
+                )
+
+    def clear_cache(self, prefix: Optional[str] = None) -> None:
+        """
+        Clears our cache.
+
+        :param prefix: If given, only clear cached objects with a string primary key
+            which starts with the prefix. This is useful to invalidate objects after
+            changing rows which share a key prefix, such as paths in the same subtree.
+        """
+        if prefix is None:
+            self._cache.clear()
+        else:
+            self._cache.pop_prefix(prefix)
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Statistics of our cache: the current number of cached objects, the capacity and
+        the total number of hits, misses and evictions.
+        """
+        return self._cache.stats
 
     def get_primary_key(self, obj: "Model") -> SQLSafeType:
         """
@@ -373,14 +659,19 @@ class Manager:
         pk_py = getattr(obj, self.pk_column.name)
         return self.pk_column.py_to_sql(pk_py)
 
+    def _sql_values(self, obj: "Model") -> List[SQLSafeType]:
+        """Returns the SQL values of all columns for a model object."""
+        return [col.py_to_sql(getattr(obj, col.name)) for col in self._columns]
+
     def all(self) -> List["Model"]:
         """
         Get all model objects / rows from database in a single query.
 
         :returns: List of model objects.
         """
-        result = self.db.execute(f"SELECT * FROM {self.table_name}")
-        return [self.create(**row) for row in result.fetchall()]
+        result = self._execute(f"SELECT * FROM {self.table_name}")
+        load = self._loader(result)
+        return [load(row) for row in result.fetchall()]
 
     def iter_all(self, size: int = 1000) -> Generator[List["Model"], Any, None]:
         """
@@ -389,13 +680,114 @@ class Manager:
         :param size: Number of rows to fetch in each query.
         :returns: Iterator over lists of model objects.
         """
-        result = self.db.execute(f"SELECT * FROM {self.table_name}")
+        result = self._execute(f"SELECT * FROM {self.table_name}")
+        load = self._loader(result)
         rows = result.fetchmany(size)
 
         while len(rows) > 0:
-            yield [self.create(**row) for row in rows]
+            yield [load(row) for row in rows]
             rows = result.fetchmany(size)
 
+    def _execute(self, sql: str, *args) -> sqlite3.Cursor:
+        """
+        Executes the given SQL statement and returns a cursor which returns rows as
+        plain tuples. This is faster than creating :class:`sqlite3.Row` instances.
+
+        :param sql: SQL statement to execute.
+        :param args: Parameters to substitute for placeholders in SQL statement.
+        :returns: The created cursor.
+        """
+        cursor = self.db.execute(sql, *args)
+        cursor.row_factory = None
+        return cursor
+
+    def _loader(
+        self, cursor: sqlite3.Cursor, cache_rows: bool = False
+    ) -> Callable[[tuple], "Model"]:
+        """
+        Returns a function which creates model objects from the tuple rows of the given
+        cursor. Functions are compiled once for every combination of returned columns.
+
+        :param cursor: Cursor returned by :meth:`_execute`.
+        :param cache_rows: Whether to add created objects to our cache.
+        :returns: Function which takes a row and returns a model object.
+        """
+
+        names = tuple(desc[0] for desc in cursor.description)
+
+        try:
+            return self._loaders[(names, cache_rows)]
+        except KeyError:
+            loader = self._compile_loader(names, cache_rows)
+            self._loaders[(names, cache_rows)] = loader
+            return loader
+
+    def _compile_loader(
+        self, names: Tuple[str, ...], cache_rows: bool
+    ) -> Callable[[tuple], "Model"]:
+        """
+        Compiles a function which creates model objects from rows with the given column
+        names. Converters are resolved ahead of time and skipped for column types which
+        are stored as is. Objects are created without calling ``__init__`` and values
+        are assigned to slots directly instead of through the column properties.
+
+        Rows which are already cached are returned from the cache instead.
+
+        :param names: Column names in the order in which they appear in a row.
+        :param cache_rows: Whether to add created objects to our cache.
+        :returns: Function which takes a row and returns a model object.
+        """
+
+        model = self.model
+        new = model.__new__
+        cache = self._cache
+
+        steps = []
+        pk_index = None
+
+        for index, name in enumerate(names):
+            col = getattr(model, name, None)
+
+            if not isinstance(col, Column):
+                continue
+
+            if col is self.pk_column:
+                pk_index = index
+
+            if type(col.type).sql_to_py is SqlType.sql_to_py:
+                convert = None
+            else:
+                convert = col.type.sql_to_py
+
+            member = getattr(model, col.private_name, None)
+
+            if isinstance(member, MemberDescriptorType):
+                setter = member.__set__
+            else:
+                setter = col.fset
+
+            steps.append((index, setter, convert))
+
+        def load(row: tuple) -> "Model":
+
+            if pk_index is not None:
+                cached = cache.peek(row[pk_index])
+                if cached is not None:
+                    return cached
+
+            obj = new(model)
+
+            for index, setter, convert in steps:
+                value = row[index]
+                setter(obj, value if convert is None else convert(value))
+
+            if cache_rows and pk_index is not None:
+                cache.put(row[pk_index], obj)
+
+            return obj
+
+        return load
+
     def create(self, **kwargs) -> "Model":
         """
         Create a model object from SQL column values
@@ -412,7 +804,7 @@ class Manager:
         obj = self.model(**kwargs)
 
         pk_sql = self.get_primary_key(obj)
-        self._cache[pk_sql] = obj
+        self._cache.put(pk_sql, obj)
 
         return obj
 
@@ -423,18 +815,31 @@ class Manager:
         :param obj: Object / row to delete.
         """
         pk_sql = self.get_primary_key(obj)
-        sql = f"DELETE from {self.table_name} WHERE {self.pk_column.name} = ?"
 
         try:
-            self.db.execute(sql, pk_sql)
+            self.db.execute(self._sql_delete_template, pk_sql)
         except UnicodeEncodeError:
             # Item was not in the database in the first place.
             pass
 
-        try:
-            del self._cache[pk_sql]
-        except KeyError:
-            pass
+        self._cache.pop(pk_sql)
+
+    def delete_many(self, objs: Iterable["Model"]) -> None:
+        """
+        Deletes multiple model objects / rows from the database in a single transaction.
+
+        :param objs: Objects / rows to delete.
+        """
+
+        pks_sql = [self.get_primary_key(obj) for obj in objs]
+
+        # Keys which cannot be encoded cannot be in the database in the first place.
+        args = [(pk,) for pk in pks_sql if _is_encodable(pk)]
+
+        self.db.executemany(self._sql_delete_template, args)
+
+        for pk_sql in pks_sql:
+            self._cache.pop(pk_sql)
 
     def get(self, primary_key: ColumnValueType) -> Optional["Model"]:
         """
@@ -447,15 +852,15 @@ class Manager:
 
         pk_sql = self.pk_column.py_to_sql(primary_key)
 
-        try:
-            return self._cache[pk_sql]
-        except KeyError:
-            pass
+        obj = self._cache.get(pk_sql)
+
+        if obj is not None:
+            return obj
 
         sql = f"SELECT * FROM {self.table_name} WHERE {self.pk_column.name} = ?"
 
         try:
-            result = self.db.execute(sql, pk_sql)
+            result = self._execute(sql, pk_sql)
         except UnicodeEncodeError:
             return None
 
@@ -464,7 +869,7 @@ class Manager:
         if not row:
             return None
 
-        return self.create(**row)
+        return self._loader(result, cache_rows=True)(row)
 
     def has(self, primary_key: ColumnValueType) -> bool:
         """
@@ -490,39 +895,126 @@ class Manager:
 
         :param obj: Model object to save.
         :returns: Saved model object.
+        :raises ValueError: if a row with the same primary key already exists.
         """
         pk_sql = self.get_primary_key(obj)
 
-        if self.has(pk_sql):
-            msg = f"Object with primary key {pk_sql} is already registered"
-            raise ValueError(msg)
-
-        py_values = column_value_dict(obj).values()
-        sql_values = (col.py_to_sql(val) for col, val in zip(self._columns, py_values))
-
-        self.db.execute(self._sql_insert_template, *sql_values)
+        try:
+            cursor = self.db.execute(self._sql_insert_template, *self._sql_values(obj))
+        except sqlite3.IntegrityError:
+            if pk_sql is not None and self.has(pk_sql):
+                msg = f"Object with primary key {pk_sql} is already registered"
+                raise ValueError(msg)
+            raise
 
         if pk_sql is None:
-            # Round trip to fetch created primary key.
-            res = self.db.execute("SELECT last_insert_rowid()").fetchone()
-            pk_sql = res["last_insert_rowid()"]
+            # Fetch the created primary key from the cursor.
+            pk_sql = cursor.lastrowid
             pk_py = self.pk_column.sql_to_py(pk_sql)
             setattr(obj, self.pk_column.name, pk_py)
 
-        self._cache[pk_sql] = obj
+        self._cache.put(pk_sql, obj)
 
         return obj
 
+    def save_many(self, objs: Iterable["Model"]) -> List["Model"]:
+        """
+        Saves multiple model objects to the database table in a single transaction.
+        Objects without a primary key are saved individually with :meth:`save` to
+        retrieve the primary key generated by SQLite.
+
+        :param objs: Model objects to save.
+        :returns: Saved model objects.
+        :raises ValueError: if a row with the same primary key as one of the objects
+            already exists. No objects are saved in this case.
+        """
+
+        objs = list(objs)
+
+        with_pk = [obj for obj in objs if self.get_primary_key(obj) is not None]
+        without_pk = [obj for obj in objs if self.get_primary_key(obj) is None]
+
+        with self.db.transaction():
+            try:
+                self.db.executemany(
+                    self._sql_insert_template,
+                    [self._sql_values(obj) for obj in with_pk],
+                )
+            except sqlite3.IntegrityError as exc:
+                raise ValueError(f"Objects could not be saved: {exc}")
+
+            for obj in without_pk:
+                self.save(obj)
+
+        for obj in with_pk:
+            self._cache.put(self.get_primary_key(obj), obj)
+
+        return objs
+
     def update(self, obj: "Model") -> None:
         """
         Updates the database table from a model object.
 
         :param obj: The object to update.
         """
-        py_values = column_value_dict(obj).values()
-        sql_values = (col.py_to_sql(val) for col, val in zip(self._columns, py_values))
         pk_sql = self.get_primary_key(obj)
-        self.db.execute(self._sql_update_template, *(list(sql_values) + [pk_sql]))
+        self.db.execute(self._sql_update_template, *self._sql_values(obj), pk_sql)
+        self._cache.put(pk_sql, obj)
+
+    def update_many(self, objs: Iterable["Model"]) -> None:
+        """
+        Updates the database table from multiple model objects in a single transaction.
+
+        :param objs: The objects to update.
+        """
+        objs = list(objs)
+        args = [self._sql_values(obj) + [self.get_primary_key(obj)] for obj in objs]
+        self.db.executemany(self._sql_update_template, args)
+
+        for obj, arg in zip(objs, args):
+            self._cache.put(arg[-1], obj)
+
+    def upsert(self, obj: "Model") -> "Model":
+        """
+        Saves a model object to the database table or updates the existing row with the
+        same primary key. This requires a single statement instead of checking for an
+        existing row first. Objects without a primary key are saved with :meth:`save`.
+
+        :param obj: Model object to save.
+        :returns: Saved model object.
+        """
+        return self.upsert_many([obj])[0]
+
+    def upsert_many(self, objs: Iterable["Model"]) -> List["Model"]:
+        """
+        Saves multiple model objects to the database table or updates existing rows
+        with the same primary keys in a single transaction. Objects without a primary
+        key are saved individually with :meth:`save`.
+
+        On SQLite versions older than 3.24, which do not support ``ON CONFLICT`` clauses
+        for inserts, existing rows are replaced instead.
+
+        :param objs: Model objects to save.
+        :returns: Saved model objects.
+        """
+
+        objs = list(objs)
+
+        with_pk = [obj for obj in objs if self.get_primary_key(obj) is not None]
+        without_pk = [obj for obj in objs if self.get_primary_key(obj) is None]
+
+        with self.db.transaction():
+            self.db.executemany(
+                self._sql_upsert_template, [self._sql_values(obj) for obj in with_pk]
+            )
+
+            for obj in without_pk:
+                self.save(obj)
+
+        for obj in with_pk:
+            self._cache.put(self.get_primary_key(obj), obj)
+
+        return objs
 
     def query_to_objects(self, sql: str, *args) -> List["Model"]:
         """
@@ -532,8 +1024,9 @@ class Manager:
         :param args: Parameters to substitute for placeholders in SQL statement.
         :returns: List of model objects from the query.
         """
-        result = self.db.execute(sql, *args)
-        return [self.create(**row) for row in result.fetchall()]
+        result = self._execute(sql, *args)
+        load = self._loader(result)
+        return [load(row) for row in result.fetchall()]
 
     def count(self) -> int:
         """Returns the number of rows in the table."""
@@ -548,6 +1041,19 @@ class Manager:
         return bool(result.fetchall())
 
 
+def _is_encodable(value: SQLSafeType) -> bool:
+    """
+    Checks if a value can be passed to sqlite3. Strings with surrogate escape
+    characters, which can appear in badly encoded file names, cannot.
+    """
+    if isinstance(value, str):
+        try:
+            value.encode()
+        except UnicodeEncodeError:
+            return False
+    return True
+
+
 class Model:
     """
     Abstract object model to represent an SQL table.
@@ -557,9 +1063,16 @@ class Model:
 
     To define a table, subclass this Model and define :class:`Column`s as class
     properties. Override the ``__tablename__`` attribute with the actual table name.
+    Set ``__without_rowid__`` to create the table as a ``WITHOUT ROWID`` table which
+    is stored in the order of its primary key. This saves storing the primary key a
+    second time in a separate index but also stores the primary key instead of the
+    rowid in every other index of the table.
     """
 
+    __slots__ = ()
+
     __tablename__ = ""
+    __without_rowid__ = False
 
     def __init__(self, **kwargs) -> None:
         """
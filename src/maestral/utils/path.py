@@ -6,6 +6,7 @@ This module contains functions for common path operations.
 # system imports
 import os
 import os.path as osp
+import sys
 import errno
 import shutil
 import itertools
@@ -360,6 +361,84 @@ def move(
         return err
 
 
+# Request code of the ioctl to clone a file on Linux, see ioctl_ficlone(2).
+_FICLONE = 0x40049409
+
+
+def _clone_file(src_fd: int, dst_fd: int) -> bool:
+    """
+    Creates a copy-on-write clone of a file where supported by the platform and file
+    system (e.g., Btrfs and XFS on Linux).
+
+    :returns: Whether the file was cloned.
+    """
+
+    if not sys.platform.startswith("linux"):
+        return False
+
+    import fcntl
+
+    try:
+        fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+    except OSError:
+        return False
+
+    return True
+
+
+def _copy_file_range(src_fd: int, dst_fd: int) -> bool:
+    """
+    Copies the content of a file within the kernel where supported by the platform.
+
+    :returns: Whether the file was copied.
+    :raises OSError: if copying fails after data has been copied.
+    """
+
+    if not hasattr(os, "copy_file_range"):
+        return False
+
+    copied = 0
+
+    while True:
+        try:
+            n_copied = os.copy_file_range(src_fd, dst_fd, 2 ** 30)  # type: ignore
+        except OSError as exc:
+            if copied == 0 and exc.errno in (
+                errno.EXDEV,
+                errno.ENOSYS,
+                errno.EOPNOTSUPP,
+                errno.EINVAL,
+            ):
+                return False
+            raise
+
+        if n_copied == 0:
+            return True
+
+        copied += n_copied
+
+
+def copy_file(src_path: str, dest_path: str) -> None:
+    """
+    Copies the content of a file to ``dest_path``, replacing any existing file. This
+    uses the most efficient mechanism available: a copy-on-write clone where the file
+    system supports it, an in-kernel copy with :func:`os.copy_file_range` or a regular
+    copy otherwise. File metadata is not copied.
+
+    :param src_path: Path of file to copy.
+    :param dest_path: Destination path.
+    :raises OSError: if copying fails.
+    """
+
+    with open(src_path, "rb") as src, open(dest_path, "wb") as dst:
+        if _clone_file(src.fileno(), dst.fileno()):
+            return
+        if _copy_file_range(src.fileno(), dst.fileno()):
+            return
+
+    shutil.copyfile(src_path, dest_path)
+
+
 def walk(
     root: Union[str, os.PathLike],
     listdir: Callable[[Union[str, os.PathLike]], Iterable[os.DirEntry]] = os.scandir,
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Module containing task scheduling utilities."""
+
+import heapq
+import itertools
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+from .throttling import ConcurrencyController
+
+
+__all__ = ["PriorityExecutor"]
+
+
+class PriorityExecutor:
+    """A thread pool which runs queued tasks in order of priority
+
+    Tasks are kept in a heap. Every call to :meth:`submit` schedules a job on the
+    underlying :class:`concurrent.futures.ThreadPoolExecutor` which, once a worker
+    becomes available, runs the task with the *lowest* priority value queued at that
+    moment. Tasks with equal priority run in the order of submission.
+
+    If a :class:`maestral.utils.throttling.ConcurrencyController` is given, workers
+    take a slot from it before picking a task such that the number of tasks running
+    concurrently follows the controller's limit rather than ``max_workers``. A
+    controller may be shared between several executors.
+
+    :param max_workers: Maximum number of worker threads.
+    :param thread_name_prefix: Prefix for the names of worker threads.
+    :param controller: Optional controller to limit the number of concurrent tasks.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        thread_name_prefix: str = "",
+        controller: Optional[ConcurrencyController] = None,
+    ) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=thread_name_prefix
+        )
+        self._controller = controller
+        self._lock = Lock()
+        self._counter = itertools.count()
+        self._heap: List[Tuple[float, int, Callable, tuple, Future, Hashable]] = []
+
+    def submit(
+        self,
+        fn: Callable,
+        *args: Any,
+        priority: float = 0.0,
+        key: Optional[Hashable] = None,
+    ) -> Future:
+        """
+        Queues a callable to be run with the given arguments.
+
+        :param fn: Callable to run.
+        :param args: Positional arguments to pass to the callable.
+        :param priority: Priority of the task. Tasks with lower values run first.
+        :param key: Optional key to identify the task in :meth:`queued_keys`.
+        :returns: Future which resolves with the callable's result.
+        """
+
+        future: Future = Future()
+
+        with self._lock:
+            count = next(self._counter)
+            heapq.heappush(self._heap, (priority, count, fn, args, future, key))
+
+        try:
+            self._executor.submit(self._run_next)
+        except RuntimeError:
+            with self._lock:
+                self._heap.remove((priority, count, fn, args, future, key))
+                heapq.heapify(self._heap)
+            raise
+
+        return future
+
+    def _run_next(self) -> None:
+
+        if self._controller:
+            self._controller.acquire()
+
+        try:
+            with self._lock:
+                _, _, fn, args, future, _ = heapq.heappop(self._heap)
+
+            if not future.set_running_or_notify_cancel():
+                return
+
+            try:
+                result = fn(*args)
+            except BaseException as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+        finally:
+            if self._controller:
+                self._controller.release()
+
+    def queued_keys(self) -> List[Hashable]:
+        """
+        Returns the keys of all tasks which are still waiting to be run, in the order
+        in which they will run.
+        """
+
+        with self._lock:
+            return [item[5] for item in sorted(self._heap, key=lambda i: i[:2])]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shuts down the underlying thread pool.
+
+        :param wait: Whether to block until all queued tasks have completed.
+        """
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "PriorityExecutor":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.shutdown(wait=True)
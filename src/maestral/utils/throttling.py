@@ -0,0 +1,734 @@
+# -*- coding: utf-8 -*-
+"""Module containing rate limiting and throttling utilities."""
+
+import time
+import random
+import resource
+import inspect
+import weakref
+from datetime import datetime
+from threading import Lock, Event, Thread, Condition
+from typing import Optional, List, Dict, Tuple, Union, Callable, Any
+
+from .integration import CPU_COUNT
+
+
+__all__ = [
+    "TokenBucket",
+    "CPUGovernor",
+    "BandwidthLimiter",
+    "ConcurrencyController",
+    "BackoffCoordinator",
+]
+
+
+class TokenBucket:
+    """A thread-safe token bucket
+
+    Tokens are refilled continuously at a given rate up to the capacity of the bucket.
+    :meth:`acquire` may take more tokens than currently available, leaving the bucket
+    in debt, and sleeps until the debt has been repaid. This keeps the average rate at
+    the target even when individual requests are larger than the capacity.
+
+    :param rate: Refill rate in tokens per second. A rate of zero or ``None`` disables
+        rate limiting.
+    :param capacity: Maximum number of tokens to accumulate. Defaults to the number of
+        tokens refilled in one second.
+    """
+
+    def __init__(self, rate: Optional[float], capacity: Optional[float] = None) -> None:
+        self._lock = Lock()
+        self._rate = rate or 0.0
+        self._capacity = capacity or self._rate
+        self._tokens = self._capacity
+        self._last_refill = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        """Refill rate in tokens per second. Zero if rate limiting is disabled."""
+        return self._rate
+
+    @rate.setter
+    def rate(self, rate: Optional[float]) -> None:
+        """Setter: rate"""
+        with self._lock:
+            self._refill()
+            self._rate = rate or 0.0
+            self._capacity = self._rate if self._rate > 0 else 0.0
+            self._tokens = min(self._tokens, self._capacity)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether rate limiting is enabled."""
+        return self._rate > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._last_refill) * self._rate
+        )
+        self._last_refill = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        Takes tokens from the bucket if enough are available. Never blocks.
+
+        :param tokens: Number of tokens to take.
+        :returns: Whether the tokens were taken.
+        """
+
+        if self._rate <= 0:
+            return True
+
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Takes tokens from the bucket, blocking until any resulting debt has been
+        repaid.
+
+        :param tokens: Number of tokens to take.
+        :returns: Time in seconds spent waiting.
+        """
+
+        if self._rate <= 0:
+            return 0.0
+
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+
+class CPUGovernor:
+    """Limits the rate at which work is started when CPU usage is too high
+
+    A background thread samples the CPU usage of the current process periodically.
+    Workers call :meth:`acquire` before starting a unit of work. As long as the CPU
+    usage is below the budget, this only counts the permit and returns immediately.
+    When the budget is exceeded, permits are handed out by a :class:`TokenBucket` whose
+    rate is scaled down in proportion to the overshoot until the usage drops again.
+
+    The sampling thread is started lazily on the first call to :meth:`acquire` and
+    only if a budget below 100% per core is set.
+
+    :param max_cpu_percent: CPU budget in percent of a single core. A value of
+        ``100 * CPU_COUNT`` disables throttling.
+    :param interval: Sampling interval in seconds.
+    :param min_rate: Minimum number of permits per second to hand out while over
+        budget.
+    """
+
+    def __init__(
+        self, max_cpu_percent: float, interval: float = 0.5, min_rate: float = 1.0
+    ) -> None:
+        self.max_cpu_percent = max_cpu_percent
+        self.interval = interval
+        self.min_rate = min_rate
+
+        self._cpu_percent = 0.0
+        self._over_budget = False
+        self._permits = 0
+        self._permits_lock = Lock()
+        self._bucket = TokenBucket(rate=None)
+
+        self._thread: Optional[Thread] = None
+        self._thread_lock = Lock()
+        self._stop_event = Event()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a CPU budget below 100% per core is set."""
+        return self.max_cpu_percent < 100 * CPU_COUNT
+
+    @property
+    def cpu_percent(self) -> float:
+        """CPU usage of the current process in percent of a single core as of the last
+        sample."""
+        return self._cpu_percent
+
+    @property
+    def throttling(self) -> bool:
+        """Whether the CPU usage exceeded the budget at the last sample."""
+        return self._over_budget
+
+    def acquire(self) -> float:
+        """
+        Acquires a permit to start a unit of work. Returns immediately while CPU usage
+        is below the budget and blocks according to the reduced permit rate otherwise.
+
+        :returns: Time in seconds spent waiting.
+        """
+
+        if not self.enabled:
+            return 0.0
+
+        if not self._thread:
+            self.start()
+
+        with self._permits_lock:
+            self._permits += 1
+
+        if self._over_budget:
+            return self._bucket.acquire()
+
+        return 0.0
+
+    def start(self) -> None:
+        """Starts the sampling thread if it is not already running."""
+
+        with self._thread_lock:
+            if self._thread and self._thread.is_alive():
+                return
+
+            self._stop_event.clear()
+            self._thread = Thread(
+                target=self._sample_loop,
+                name="maestral-cpu-governor",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the sampling thread."""
+
+        with self._thread_lock:
+            self._stop_event.set()
+            if self._thread:
+                self._thread.join()
+            self._thread = None
+            self._over_budget = False
+
+    def _sample_loop(self) -> None:
+
+        t1 = time.monotonic()
+        r1 = resource.getrusage(resource.RUSAGE_SELF)
+
+        while not self._stop_event.wait(self.interval):
+
+            t2 = time.monotonic()
+            r2 = resource.getrusage(resource.RUSAGE_SELF)
+
+            delta_proc = (r2.ru_utime - r1.ru_utime) + (r2.ru_stime - r1.ru_stime)
+            delta_time = t2 - t1
+
+            t1, r1 = t2, r2
+
+            if delta_time <= 0:
+                continue
+
+            with self._permits_lock:
+                permits, self._permits = self._permits, 0
+
+            self._update(delta_proc / delta_time * 100, permits / delta_time)
+
+    def _update(self, cpu_percent: float, permit_rate: float) -> None:
+        """
+        Updates the throttling state from a new sample.
+
+        :param cpu_percent: CPU usage in percent of a single core.
+        :param permit_rate: Number of permits per second handed out since the last
+            sample.
+        """
+
+        self._cpu_percent = cpu_percent
+
+        if cpu_percent > self.max_cpu_percent:
+            # Scale down the permit rate in proportion to the overshoot. Start from the
+            # currently enforced rate if we are already throttling.
+            if self._over_budget:
+                permit_rate = min(permit_rate, self._bucket.rate)
+            scale = self.max_cpu_percent / cpu_percent
+            self._bucket.rate = max(permit_rate * scale, self.min_rate)
+            self._over_budget = True
+        else:
+            self._over_budget = False
+
+
+def _parse_time_of_day(value: str) -> int:
+    """
+    Converts a time of day in the format "HH:MM" to minutes since midnight.
+
+    :param value: Time of day.
+    :returns: Minutes since midnight.
+    :raises ValueError: if the format is invalid.
+    """
+    hours, minutes = value.split(":")
+    res = int(hours) * 60 + int(minutes)
+
+    if not 0 <= res <= 24 * 60:
+        raise ValueError(f"Invalid time of day: {value!r}")
+
+    return res
+
+
+class BandwidthLimiter:
+    """Limits the data rate of transfers in one direction
+
+    A single instance is meant to be shared between all threads which transfer data in
+    the same direction. Callers report each chunk of data with :meth:`acquire` before
+    or after transferring it and are put to sleep as required to keep the average rate
+    at the limit.
+
+    The limit can depend on the time of day. Profiles are given as a list of dicts
+    with the keys "start" and "end" in the format "HH:MM" and the rate limit in bytes
+    per second for the direction of this limiter, for example::
+
+        [{"start": "09:00", "end": "17:30", "upload": 250000, "download": 1000000}]
+
+    Profiles may wrap around midnight. The first profile which matches the current
+    time of day is used and the default rate applies outside of all profiles. The
+    default rate also applies during profiles which do not set a rate for the direction
+    of this limiter.
+
+    :param rate: Default rate limit in bytes per second. Zero disables rate limiting.
+    :param profiles: Time-of-day profiles.
+    :param direction: Key to read the rate limit from profiles, "upload" or
+        "download".
+    """
+
+    _refresh_interval = 30
+
+    def __init__(
+        self,
+        rate: float = 0,
+        profiles: Optional[List[Dict[str, Any]]] = None,
+        direction: str = "upload",
+    ) -> None:
+        self.direction = direction
+        self._rate = rate
+        self._profiles: List[Tuple[int, int, Optional[float]]] = []
+        self._bucket = TokenBucket(rate=None)
+        self._last_refresh = 0.0
+        self.profiles = profiles or []
+
+    @property
+    def rate(self) -> float:
+        """Default rate limit in bytes per second. Zero if unlimited."""
+        return self._rate
+
+    @rate.setter
+    def rate(self, rate: float) -> None:
+        """Setter: rate"""
+        self._rate = rate
+        self._refresh()
+
+    @property
+    def profiles(self) -> List[Dict[str, Any]]:
+        """Time-of-day profiles."""
+        return self._profile_dicts
+
+    @profiles.setter
+    def profiles(self, profiles: List[Dict[str, Any]]) -> None:
+        """Setter: profiles"""
+
+        parsed = []
+
+        for profile in profiles:
+            start = _parse_time_of_day(profile["start"])
+            end = _parse_time_of_day(profile["end"])
+            rate = profile.get(self.direction)
+            parsed.append((start, end, None if rate is None else float(rate)))
+
+        self._profile_dicts = list(profiles)
+        self._profiles = parsed
+        self._refresh()
+
+    @property
+    def current_rate(self) -> float:
+        """Currently enforced rate limit in bytes per second. Zero if unlimited."""
+        return self._bucket.rate
+
+    def rate_at(self, when: datetime) -> float:
+        """
+        Returns the rate limit which applies at a given time.
+
+        :param when: Time to check.
+        :returns: Rate limit in bytes per second. Zero if unlimited.
+        """
+
+        minute = when.hour * 60 + when.minute
+
+        for start, end, rate in self._profiles:
+            if start <= end:
+                match = start <= minute < end
+            else:
+                match = minute >= start or minute < end
+
+            if match:
+                return self._rate if rate is None else rate
+
+        return self._rate
+
+    def _refresh(self) -> None:
+        self._last_refresh = time.monotonic()
+        rate = self.rate_at(datetime.now())
+
+        if rate != self._bucket.rate:
+            self._bucket.rate = rate
+
+    def acquire(self, nbytes: int) -> float:
+        """
+        Accounts for a chunk of transferred data and sleeps if required to stay
+        within the rate limit.
+
+        :param nbytes: Size of the chunk in bytes.
+        :returns: Time in seconds spent waiting.
+        """
+
+        if self._profiles:
+            if time.monotonic() - self._last_refresh > self._refresh_interval:
+                self._refresh()
+
+        return self._bucket.acquire(nbytes)
+
+
+class ConcurrencyController:
+    """Adapts the number of concurrent transfers with an AIMD policy
+
+    Callers obtain a slot with :meth:`acquire` before starting a transfer, report its
+    outcome with :meth:`record` and free the slot with :meth:`release`. The controller
+    evaluates the reported samples in windows of ``window`` seconds and adjusts the
+    limit on concurrent transfers:
+
+    * Rate-limit errors halve the limit (multiplicative decrease).
+    * A latency of small transfers above ``latency_tolerance`` times the lowest
+      latency seen so far reduces the limit by a quarter.
+    * Otherwise, the limit is increased by one (additive increase) if the throughput
+      did not drop compared to the previous window. A drop in throughput after an
+      increase reverts that increase.
+
+    Only windows in which the limit was actually saturated are used to increase the
+    limit, such that it does not grow without bounds while there is little to do.
+
+    :param initial: Initial limit.
+    :param minimum: Lower bound for the limit.
+    :param maximum: Upper bound for the limit.
+    :param window: Length of evaluation windows in seconds.
+    :param latency_tolerance: Factor by which the latency may exceed its baseline
+        before the limit is reduced.
+    :param small_transfer_size: Only transfers up to this size in bytes are taken into
+        account for latency measurements.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 64,
+        window: float = 5.0,
+        latency_tolerance: float = 3.0,
+        small_transfer_size: int = 2 ** 20,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.window = window
+        self.latency_tolerance = latency_tolerance
+        self.small_transfer_size = small_transfer_size
+
+        self._limit = min(max(initial, minimum), maximum)
+        self._in_flight = 0
+        self._cond = Condition()
+
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._window_latencies: List[float] = []
+        self._window_rate_limits = 0
+        self._window_saturated = False
+
+        self._last_throughput = 0.0
+        self._last_latency = 0.0
+        self._base_latency = 0.0
+        self._last_increase = False
+        self._total_rate_limits = 0
+
+    @property
+    def limit(self) -> int:
+        """Current limit on concurrent transfers."""
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        """Number of transfers currently in progress."""
+        return self._in_flight
+
+    def acquire(self) -> None:
+        """Blocks until a slot for a transfer is available and takes it."""
+        with self._cond:
+            while self._in_flight >= self._limit:
+                self._cond.wait()
+            self._in_flight += 1
+            if self._in_flight >= self._limit:
+                self._window_saturated = True
+
+    def try_acquire(self) -> bool:
+        """
+        Takes a slot for a transfer if one is available without blocking.
+
+        :returns: Whether a slot was taken. If ``True``, it must be freed with
+            :meth:`release`.
+        """
+        with self._cond:
+            if self._in_flight >= self._limit:
+                self._window_saturated = True
+                return False
+            self._in_flight += 1
+            if self._in_flight >= self._limit:
+                self._window_saturated = True
+            return True
+
+    def release(self) -> None:
+        """Frees a slot taken with :meth:`acquire` or :meth:`try_acquire`."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    def record(
+        self, duration: float, nbytes: int = 0, rate_limited: bool = False
+    ) -> None:
+        """
+        Records the outcome of a transfer.
+
+        :param duration: Duration of the transfer in seconds.
+        :param nbytes: Number of bytes transferred.
+        :param rate_limited: Whether the transfer was rejected or delayed by a rate
+            limit.
+        """
+
+        with self._cond:
+            self._window_bytes += nbytes
+
+            if rate_limited:
+                self._window_rate_limits += 1
+                self._total_rate_limits += 1
+            elif nbytes <= self.small_transfer_size:
+                self._window_latencies.append(duration)
+
+            if time.monotonic() - self._window_start >= self.window:
+                self._evaluate()
+
+    def record_rate_limit(self, endpoint: Optional[str] = None) -> None:
+        """
+        Records a rate-limit response which is not tied to a specific transfer. This
+        can be registered as a listener with :meth:`BackoffCoordinator.add_listener`.
+
+        :param endpoint: Name of the API endpoint which was rate limited. Unused.
+        """
+        self.record(0.0, rate_limited=True)
+
+    def _evaluate(self) -> None:
+
+        now = time.monotonic()
+        throughput = self._window_bytes / (now - self._window_start)
+
+        if self._window_latencies:
+            latency = sorted(self._window_latencies)[len(self._window_latencies) // 2]
+            if self._base_latency == 0 or latency < self._base_latency:
+                self._base_latency = latency
+            else:
+                # Let the baseline drift up slowly to adapt to changing networks.
+                self._base_latency = min(latency, self._base_latency * 1.1)
+        else:
+            latency = 0.0
+
+        limit = self._limit
+        increased = False
+
+        if self._window_rate_limits > 0:
+            limit = limit // 2
+        elif latency > self._base_latency * self.latency_tolerance:
+            limit = limit - max(limit // 4, 1)
+        elif self._last_increase and throughput < self._last_throughput * 0.9:
+            limit = limit - 1
+        elif self._window_saturated:
+            limit = limit + 1
+            increased = True
+
+        self._limit = min(max(limit, self.minimum), self.maximum)
+        self._last_increase = increased and self._limit > self.minimum
+        self._last_throughput = throughput
+        self._last_latency = latency
+
+        self._window_start = now
+        self._window_bytes = 0
+        self._window_latencies = []
+        self._window_rate_limits = 0
+        self._window_saturated = self._in_flight >= self._limit
+
+        self._cond.notify_all()
+
+    @property
+    def state(self) -> Dict[str, Union[int, float]]:
+        """
+        The current state of the controller: the limit on and number of concurrent
+        transfers, the throughput in bytes per second and the median latency of small
+        transfers in seconds during the last evaluation window, and the total number
+        of rate-limit errors.
+        """
+        return dict(
+            limit=self._limit,
+            in_flight=self._in_flight,
+            throughput=self._last_throughput,
+            latency=self._last_latency,
+            rate_limits=self._total_rate_limits,
+        )
+
+
+class BackoffCoordinator:
+    """Coordinates backoff after rate limiting between threads
+
+    Rate-limit responses reported by any thread with :meth:`record_rate_limit` make
+    all threads wait in :meth:`wait` before their next request. The backoff grows
+    exponentially with the number of consecutive rate-limit responses for the same
+    endpoint, is randomised with jitter and honours any ``Retry-After`` hint from the
+    server. Waiting threads are released with additional jitter so that they do not
+    all retry at the same moment. Endpoints may additionally be asked to back off
+    individually with :meth:`set_backoff`.
+
+    :param base_delay: Backoff in seconds after the first rate-limit response.
+    :param max_delay: Maximum backoff in seconds.
+    :param jitter: Maximum additional random delay for waiting threads, as a fraction
+        of the remaining backoff.
+    """
+
+    def __init__(
+        self, base_delay: float = 1.0, max_delay: float = 300.0, jitter: float = 0.1
+    ) -> None:
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+        self._lock = Lock()
+        self._backoff_until = 0.0
+        self._endpoint_backoff_until: Dict[str, float] = {}
+        self._consecutive: Dict[str, int] = {}
+        self._rate_limits: Dict[str, int] = {}
+        self._listeners: List[weakref.ref] = []
+
+    def add_listener(self, callback: Callable[[str], Any]) -> None:
+        """
+        Registers a callback which is called with the endpoint name whenever a
+        rate-limit response is recorded. Only a weak reference to the callback is
+        kept.
+
+        :param callback: Function or bound method to call.
+        """
+        if inspect.ismethod(callback):
+            ref: weakref.ref = weakref.WeakMethod(callback)
+        else:
+            ref = weakref.ref(callback)
+
+        with self._lock:
+            self._listeners.append(ref)
+
+    def record_rate_limit(
+        self, endpoint: str, retry_after: Optional[float] = None
+    ) -> float:
+        """
+        Records a rate-limit response and extends the backoff for all threads.
+
+        :param endpoint: Name of the API endpoint which was rate limited.
+        :param retry_after: Backoff in seconds requested by the server, if any.
+        :returns: The new backoff in seconds.
+        """
+
+        with self._lock:
+            consecutive = self._consecutive.get(endpoint, 0) + 1
+            self._consecutive[endpoint] = consecutive
+            self._rate_limits[endpoint] = self._rate_limits.get(endpoint, 0) + 1
+
+            exp_delay = min(self.base_delay * 2 ** (consecutive - 1), self.max_delay)
+            delay = max(retry_after or 0.0, exp_delay * random.uniform(0.5, 1.0))
+
+            self._backoff_until = max(self._backoff_until, time.monotonic() + delay)
+
+            listeners = self._listeners.copy()
+
+        for ref in listeners:
+            callback = ref()
+            if callback:
+                callback(endpoint)
+            else:
+                with self._lock:
+                    self._listeners.remove(ref)
+
+        return delay
+
+    def record_success(self, endpoint: str) -> None:
+        """
+        Records a successful request, resetting the exponential backoff for the
+        endpoint.
+
+        :param endpoint: Name of the API endpoint.
+        """
+        if endpoint in self._consecutive:
+            with self._lock:
+                self._consecutive.pop(endpoint, None)
+
+    def set_backoff(self, endpoint: str, delay: float) -> None:
+        """
+        Asks a single endpoint to back off, for example when requested by the server
+        in a response body.
+
+        :param endpoint: Name of the API endpoint.
+        :param delay: Backoff in seconds.
+        """
+        with self._lock:
+            self._endpoint_backoff_until[endpoint] = time.monotonic() + delay
+
+    def backoff_remaining(self, endpoint: Optional[str] = None) -> float:
+        """
+        Returns the remaining backoff.
+
+        :param endpoint: If given, also take the backoff for this endpoint into
+            account.
+        :returns: Remaining backoff in seconds.
+        """
+        until = self._backoff_until
+
+        if endpoint:
+            until = max(until, self._endpoint_backoff_until.get(endpoint, 0.0))
+
+        return max(until - time.monotonic(), 0.0)
+
+    def wait(self, endpoint: Optional[str] = None) -> float:
+        """
+        Blocks until any backoff has expired.
+
+        :param endpoint: If given, also wait for the backoff for this endpoint.
+        :returns: Time in seconds spent waiting.
+        """
+
+        waited = 0.0
+        remaining = self.backoff_remaining(endpoint)
+
+        # Re-check after sleeping since the backoff may have been extended.
+        while remaining > 0:
+            delay = remaining * (1 + random.uniform(0, self.jitter))
+            time.sleep(delay)
+            waited += delay
+            remaining = self.backoff_remaining(endpoint)
+
+        return waited
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Number of rate-limit responses and current number of consecutive rate-limit
+        responses per endpoint."""
+        with self._lock:
+            return {
+                endpoint: dict(
+                    rate_limits=count, consecutive=self._consecutive.get(endpoint, 0)
+                )
+                for endpoint, count in self._rate_limits.items()
+            }
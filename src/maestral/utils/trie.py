@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""Module containing a mapping of paths which is stored as a trie."""
+
+from collections import abc
+from threading import RLock
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+__all__ = ["PathTrie"]
+
+
+_marker = object()
+
+
+class _Node:
+    """A node of a PathTrie"""
+
+    __slots__ = ("children", "count", "key", "value")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Node"] = {}
+        self.count = 0
+        self.key: Optional[str] = None
+        self.value: Any = _marker
+
+
+class PathTrie(abc.MutableMapping):
+    """A thread-safe mapping of paths to values
+
+    Paths are stored as a trie of their components and every node counts the number of
+    values at or below its path. This allows finding values for a path and all its
+    children in time proportional to the depth of the path instead of the number of
+    items in the mapping.
+
+    Unlike for a dict, :meth:`keys`, :meth:`values` and :meth:`items` return lists
+    which are copied while holding the lock. They can therefore be used while other
+    threads modify the mapping.
+
+    Paths are split at ``sep`` and empty components, for instance from trailing
+    separators, are ignored. Paths are not normalized otherwise.
+
+    :param sep: Path separator.
+    """
+
+    def __init__(self, sep: str = "/") -> None:
+        self._sep = sep
+        self._lock = RLock()
+        self._root = _Node()
+
+    def _components(self, path: str) -> List[str]:
+        return [c for c in path.split(self._sep) if c]
+
+    def _find(self, path: str) -> Optional[_Node]:
+        node = self._root
+
+        for name in self._components(path):
+            try:
+                node = node.children[name]
+            except KeyError:
+                return None
+
+        return node
+
+    def __getitem__(self, path: str) -> Any:
+        with self._lock:
+            node = self._find(path)
+
+            if node is None or node.value is _marker:
+                raise KeyError(path)
+
+            return node.value
+
+    def __setitem__(self, path: str, value: Any) -> None:
+        with self._lock:
+            nodes = [self._root]
+
+            for name in self._components(path):
+                try:
+                    node = nodes[-1].children[name]
+                except KeyError:
+                    node = _Node()
+                    nodes[-1].children[name] = node
+                nodes.append(node)
+
+            node = nodes[-1]
+
+            if node.value is _marker:
+                for n in nodes:
+                    n.count += 1
+
+            node.key = path
+            node.value = value
+
+    def __delitem__(self, path: str) -> None:
+        self.pop(path)
+
+    def pop(self, path: str, default: Any = _marker) -> Any:
+        """
+        Removes the value for a path and returns it.
+
+        :param path: Path to remove.
+        :param default: Value to return if there is no value for the path.
+        :returns: Removed value or ``default``.
+        :raises KeyError: if there is no value for the path and no default is given.
+        """
+        with self._lock:
+            nodes = [self._root]
+            names = self._components(path)
+
+            for name in names:
+                try:
+                    nodes.append(nodes[-1].children[name])
+                except KeyError:
+                    break
+
+            node = nodes[-1]
+
+            if len(nodes) <= len(names) or node.value is _marker:
+                if default is _marker:
+                    raise KeyError(path)
+                return default
+
+            value = node.value
+            node.key = None
+            node.value = _marker
+
+            for n in nodes:
+                n.count -= 1
+
+            # Prune nodes without any values below them.
+            for parent, name, child in zip(nodes, names, nodes[1:]):
+                if child.count == 0:
+                    del parent.children[name]
+                    break
+
+            return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def keys(self) -> List[str]:  # type: ignore
+        """Returns a list of all paths, taken atomically."""
+        return [key for key, _ in self.subtree_items("")]
+
+    def values(self) -> List[Any]:  # type: ignore
+        """Returns a list of all values, taken atomically."""
+        return [value for _, value in self.subtree_items("")]
+
+    def items(self) -> List[Tuple[str, Any]]:  # type: ignore
+        """Returns a list of all items, taken atomically."""
+        return self.subtree_items("")
+
+    def __len__(self) -> int:
+        return self._root.count
+
+    def clear(self) -> None:
+        """Removes all values."""
+        with self._lock:
+            self._root = _Node()
+
+    def subtree_count(self, path: str) -> int:
+        """
+        Returns the number of values for the given path and all its children.
+
+        :param path: Path to query.
+        :returns: Number of values.
+        """
+        with self._lock:
+            node = self._find(path)
+            return node.count if node else 0
+
+    def subtree_item(self, path: str) -> Optional[Tuple[str, Any]]:
+        """
+        Returns an item for the given path or any of its children. The item of the path
+        itself is preferred if present.
+
+        :param path: Path to query.
+        :returns: Tuple of path and value or ``None`` if there are no values for the
+            path or its children.
+        """
+        with self._lock:
+            node = self._find(path)
+
+            if node is None or node.count == 0:
+                return None
+
+            # Every node with a count > 0 has a value or a child with a count > 0.
+            while node.value is _marker:
+                node = next(iter(node.children.values()))
+
+            return node.key, node.value
+
+    def subtree_items(self, path: str) -> List[Tuple[str, Any]]:
+        """
+        Returns all items for the given path and its children.
+
+        :param path: Path to query.
+        :returns: List of tuples of path and value.
+        """
+        with self._lock:
+            node = self._find(path)
+            items = []
+            nodes = [node] if node else []
+
+            while nodes:
+                node = nodes.pop()
+
+                if node.value is not _marker:
+                    items.append((node.key, node.value))
+
+                nodes.extend(node.children.values())
+
+            return items
@@ -9,6 +9,7 @@ from maestral.autostart import AutoStart
 from maestral.notify import level_number_to_name, level_name_to_number
 from maestral.daemon import MaestralProxy, start_maestral_daemon_process, Start
 from maestral.logging import scoped_logger
+from maestral.statusboard import StatusBoard, status_board_path
 
 from .conftest import print_logs
 
@@ -59,6 +60,22 @@ def test_stop(config_name):
     assert result.exit_code == 0, result.output
 
 
+def test_status_from_board(m):
+
+    board = StatusBoard(status_board_path(m.config_name))
+    board.publish("Up to date", True, False, True, 0, 0, 0, 2, 4, 1000.0)
+
+    try:
+        runner = CliRunner()
+        result = runner.invoke(main, ["status", "-c", m.config_name])
+    finally:
+        board.close()
+
+    assert result.exit_code == 0, result.output
+    assert "Status:       Up to date" in result.output
+    assert "Transfers:    2 active, limit 4" in result.output
+
+
 def test_filestatus(m):
     runner = CliRunner()
     result = runner.invoke(main, ["filestatus", "/usr", "-c", m.config_name])
@@ -66,6 +83,11 @@ def test_filestatus(m):
     assert result.exit_code == 0, result.output
     assert result.output == "unwatched\n"
 
+    result = runner.invoke(main, ["filestatus", "/usr", "/", "-c", m.config_name])
+
+    assert result.exit_code == 0, result.output
+    assert result.output == "unwatched\nunwatched\n"
+
     result = runner.invoke(main, ["filestatus", "/invalid-dir", "-c", m.config_name])
 
     # the exception will be already raised by click's argument check
@@ -3,10 +3,13 @@
 # flake8: noqa
 
 import errno
+import json
+import os.path as osp
+from datetime import datetime
 
 import pytest
 import requests
-from dropbox import exceptions
+from dropbox import Dropbox, exceptions
 from dropbox import oauth
 from dropbox.files import *
 from dropbox.async_ import *
@@ -15,12 +18,17 @@ from dropbox.sharing import *
 from dropbox.auth import *
 
 from maestral.errors import *
+from maestral.utils.content_hasher import DropboxContentHasher
+from maestral import client as client_module
+from maestral.utils.throttling import BackoffCoordinator, ConcurrencyController
 from maestral.client import (
+    DropboxClient,
     os_to_maestral_error,
     dropbox_to_maestral_error,
     _get_lookup_error_msg,
     _get_write_error_msg,
     _get_session_lookup_error_msg,
+    _CoordinatedDropbox,
 )
 
 
@@ -74,7 +82,7 @@ def test_get_lookup_error_msg(error, maestral_exc):
         (WriteError.malformed_path(None), PathError),
         (WriteError.no_write_permission, InsufficientPermissionsError),
         (WriteError.team_folder, SyncError),
-        (WriteError.too_many_write_operations, SyncError),
+        (WriteError.too_many_write_operations, RateLimitError),
     ],
 )
 def test_get_write_error_msg(error, maestral_exc):
@@ -120,7 +128,7 @@ def test_get_write_error_msg(error, maestral_exc):
         (DeleteError.path_lookup(LookupError.not_found), NotFoundError),
         (DeleteError.path_write(WriteError.team_folder), SyncError),
         (DeleteError.too_many_files, SyncError),
-        (DeleteError.too_many_write_operations, SyncError),
+        (DeleteError.too_many_write_operations, RateLimitError),
         (DeleteError.other, MaestralApiError),
         (
             UploadError.path(
@@ -142,7 +150,7 @@ def test_get_write_error_msg(error, maestral_exc):
         ),
         (UploadSessionFinishError.path(WriteError.team_folder), SyncError),
         (UploadSessionFinishError.properties_error, MaestralApiError),
-        (UploadSessionFinishError.too_many_write_operations, SyncError),
+        (UploadSessionFinishError.too_many_write_operations, RateLimitError),
         (UploadSessionFinishError.other, MaestralApiError),
         (UploadSessionLookupError.too_large, FileSizeError),
         (UploadSessionLookupError.other, MaestralApiError),
@@ -212,8 +220,326 @@ def test_dropbox_api_to_maestral_error(error, maestral_exc):
         (oauth.NotApprovedException(), DropboxAuthError),
         (exceptions.BadInputError("", ""), BadInputError),
         (exceptions.InternalServerError("", "", ""), DropboxServerError),
+        (
+            exceptions.RateLimitError("", RateLimitReason.too_many_requests),
+            RateLimitError,
+        ),
     ],
 )
 def test_dropbox_to_maestral_error(exception, maestral_exc):
     converted = dropbox_to_maestral_error(exception)
     assert isinstance(converted, maestral_exc)
+
+
+def test_bandwidth_limits_shared_between_clones(client):
+
+    client.max_upload_rate = 1000
+    clone = client.clone_with_new_session()
+
+    assert clone.max_upload_rate == 1000
+    assert clone._upload_limiter is client._upload_limiter
+
+    client.max_download_rate = 2000
+    assert clone.max_download_rate == 2000
+    assert client._conf.get("sync", "max_download_rate") == 2000
+
+
+def test_invalid_bandwidth_profiles(client):
+
+    profiles = [{"start": "09:00", "end": "17:00", "upload": 1000, "download": 2000}]
+    client.bandwidth_profiles = profiles
+
+    with pytest.raises(ValueError):
+        client.bandwidth_profiles = [
+            {"start": "09:00", "end": "17:00", "upload": 1000, "download": "fast"}
+        ]
+
+    # neither limiter is changed
+    assert client._upload_limiter.profiles == profiles
+    assert client._download_limiter.profiles == profiles
+
+
+def test_rate_limit_retry(monkeypatch):
+
+    coordinator = BackoffCoordinator(base_delay=0.01)
+    monkeypatch.setattr(client_module, "backoff_coordinator", coordinator)
+
+    calls = []
+
+    def request_json_string(self, host, func_name, *args, **kwargs):
+        calls.append(func_name)
+        if len(calls) == 1:
+            raise exceptions.RateLimitError("", RateLimitReason.too_many_requests, 0.1)
+        return "result"
+
+    monkeypatch.setattr(Dropbox, "request_json_string", request_json_string)
+
+    dbx = _CoordinatedDropbox(oauth2_access_token="token")
+    res = dbx.request_json_string("api", "files/upload", "upload", "", "user", b"")
+
+    assert res == "result"
+    assert calls == ["files/upload", "files/upload"]
+    assert coordinator.stats["files/upload"]["consecutive"] == 0
+
+
+def test_write_contention_backoff(monkeypatch):
+
+    coordinator = BackoffCoordinator(base_delay=0.01)
+    monkeypatch.setattr(client_module, "backoff_coordinator", coordinator)
+
+    error = UploadError.path(
+        UploadWriteFailed(WriteError.too_many_write_operations, "session_id")
+    )
+
+    def request_json_string(self, host, func_name, *args, **kwargs):
+        raise exceptions.ApiError("", error, None, "")
+
+    monkeypatch.setattr(Dropbox, "request_json_string", request_json_string)
+
+    dbx = _CoordinatedDropbox(oauth2_access_token="token")
+
+    with pytest.raises(exceptions.ApiError):
+        dbx.request_json_string("api", "files/upload", "upload", "", "user", b"")
+
+    # the error is raised but other clients back off as well
+    assert coordinator.stats["files/upload"]["rate_limits"] == 1
+    assert coordinator.backoff_remaining() > 0
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200, fail_after=None):
+        self.content = content
+        self.status_code = status_code
+        self.fail_after = fail_after
+        self.chunk_sizes = []
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        self.chunk_sizes.append(chunk_size)
+        for i in range(0, len(self.content), chunk_size):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise requests.exceptions.ChunkedEncodingError()
+            yield self.content[i : i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize("reported_size", [3 * 10 ** 5, 10 ** 6])
+def test_download(client, monkeypatch, tmp_path, reported_size):
+
+    content = b"a" * 3 * 10 ** 5
+    resp = FakeResponse(content)
+    md = FileMetadata(
+        name="file.txt",
+        path_lower="/file.txt",
+        size=reported_size,
+        client_modified=datetime(2021, 1, 1),
+        server_modified=datetime(2021, 1, 2),
+    )
+
+    class FakeDropbox:
+        def files_download(self, dbx_path, **kwargs):
+            return md, resp
+
+    monkeypatch.setattr(DropboxClient, "dbx", property(lambda self: FakeDropbox()))
+
+    local_path = str(tmp_path / "file.txt")
+    client.download("/file.txt", local_path)
+
+    with open(local_path, "rb") as f:
+        assert f.read() == content
+
+    # Any preallocated space beyond the received content is released.
+    assert osp.getsize(local_path) == len(content)
+    assert resp.closed
+
+    chunk_size = resp.chunk_sizes[0]
+    assert chunk_size & (chunk_size - 1) == 0
+    assert 2 ** 16 <= chunk_size <= 2 ** 22
+
+
+def test_download_chunk_size(client):
+
+    assert client._download_chunk_size(0) == 2 ** 16
+    assert client._download_chunk_size(10 ** 10) == 2 ** 22
+    assert client._download_chunk_size(100 * 2 ** 20) == 2 ** 20
+
+    client.max_download_rate = 10 ** 5
+    assert client._download_chunk_size(10 ** 10) == 2 ** 13
+
+
+class FakeRangeDropbox:
+    """
+    Serves a file and supports range requests through clone(headers=...). If given,
+    fail_after only applies to requests for the entire file.
+    """
+
+    def __init__(self, content, headers=None, fail_after=None):
+        self.content = content
+        self.headers = headers or {}
+        self.fail_after = fail_after
+        self.requested_ranges = []
+
+        hasher = DropboxContentHasher()
+        hasher.update(content)
+
+        self.md = FileMetadata(
+            name="file.txt",
+            path_lower="/file.txt",
+            rev="0123456789",
+            size=len(content),
+            content_hash=hasher.hexdigest(),
+            client_modified=datetime(2021, 1, 1),
+            server_modified=datetime(2021, 1, 2),
+        )
+
+    def clone(self, headers=None):
+        clone = FakeRangeDropbox(self.content, headers, self.fail_after)
+        clone.requested_ranges = self.requested_ranges
+        return clone
+
+    def files_download(self, dbx_path, **kwargs):
+        if "Range" in self.headers:
+            start, end = self.headers["Range"][len("bytes=") :].split("-")
+            self.requested_ranges.append((int(start), int(end) + 1))
+            content = self.content[int(start) : int(end) + 1]
+            return self.md, FakeResponse(content, 206)
+        return self.md, FakeResponse(self.content, 200, self.fail_after)
+
+
+@pytest.fixture
+def segmented_client(client, monkeypatch):
+    monkeypatch.setattr(DropboxContentHasher, "BLOCK_SIZE", 16)
+    client._download_parallel_threshold = 100
+    client._download_min_chunk_size = 8
+    client._download_max_chunk_size = 8
+    yield client
+
+
+def test_download_ranges(segmented_client):
+
+    client = segmented_client
+
+    assert client._download_ranges(100) == [(0, 32), (32, 64), (64, 96), (96, 100)]
+    assert client._download_ranges(20) == [(0, 16), (16, 20)]
+
+
+def test_download_segments(segmented_client, monkeypatch, tmp_path):
+
+    content = bytes(range(200))
+    dbx = FakeRangeDropbox(content)
+    monkeypatch.setattr(DropboxClient, "dbx", property(lambda self: dbx))
+
+    local_path = str(tmp_path / "file.part")
+    segmented_client.download("/file.txt", local_path, resumable=True)
+
+    with open(local_path, "rb") as f:
+        assert f.read() == content
+
+    # The first segment is read from the initial response.
+    assert sorted(dbx.requested_ranges) == [(64, 128), (128, 192), (192, 200)]
+    assert not osp.exists(local_path + ".json")
+
+
+def test_download_segments_concurrency(segmented_client, monkeypatch, tmp_path):
+
+    content = bytes(range(200))
+    dbx = FakeRangeDropbox(content)
+    monkeypatch.setattr(DropboxClient, "dbx", property(lambda self: dbx))
+
+    # The download holds the only slot and must not wait for additional ones.
+    segmented_client.concurrency = ConcurrencyController(initial=1)
+    segmented_client.concurrency.acquire()
+
+    local_path = str(tmp_path / "file.part")
+    segmented_client.download("/file.txt", local_path, resumable=True)
+
+    with open(local_path, "rb") as f:
+        assert f.read() == content
+
+    # Additional slots are released again.
+    segmented_client.concurrency = ConcurrencyController(initial=3)
+    segmented_client.concurrency.acquire()
+    segmented_client.download("/file.txt", local_path, resumable=True)
+
+    assert segmented_client.concurrency.in_flight == 1
+
+
+def test_download_failure_cleanup(segmented_client, monkeypatch, tmp_path):
+
+    content = bytes(range(200))
+    dbx = FakeRangeDropbox(content, fail_after=16)
+    monkeypatch.setattr(DropboxClient, "dbx", property(lambda self: dbx))
+
+    local_path = str(tmp_path / "file.part")
+
+    # Sequential downloads cannot be resumed.
+    segmented_client._download_parallel_threshold = 1000
+
+    with pytest.raises(DropboxConnectionError):
+        segmented_client.download("/file.txt", local_path, resumable=True)
+
+    assert not osp.exists(local_path)
+
+    # Neither can segmented downloads which are not resumable.
+    segmented_client._download_parallel_threshold = 100
+
+    with pytest.raises(DropboxConnectionError):
+        segmented_client.download("/file.txt", local_path)
+
+    assert not osp.exists(local_path)
+
+
+def test_download_resume(segmented_client, monkeypatch, tmp_path):
+
+    content = bytes(range(200))
+    dbx = FakeRangeDropbox(content, fail_after=16)
+    monkeypatch.setattr(DropboxClient, "dbx", property(lambda self: dbx))
+
+    local_path = str(tmp_path / "file.part")
+
+    with pytest.raises(DropboxConnectionError):
+        segmented_client.download("/file.txt", local_path, resumable=True)
+
+    with open(local_path + ".json") as f:
+        state = json.load(f)
+
+    completed = sum(offset - start for start, _, offset in state["segments"])
+    assert completed > 0
+
+    dbx = FakeRangeDropbox(content)
+    segmented_client.download("/file.txt", local_path, resumable=True)
+
+    with open(local_path, "rb") as f:
+        assert f.read() == content
+
+    # Only the data which was not written before the failure is requested again.
+    requested = sum(end - start for start, end in dbx.requested_ranges)
+    assert requested == len(content) - completed
+    assert not osp.exists(local_path + ".json")
+
+
+def test_download_verification(segmented_client, monkeypatch, tmp_path):
+
+    content = bytes(range(200))
+    dbx = FakeRangeDropbox(content)
+    dbx.md.content_hash = "0" * 64
+    monkeypatch.setattr(DropboxClient, "dbx", property(lambda self: dbx))
+
+    # Sequential download.
+    local_path = str(tmp_path / "file.txt")
+    segmented_client._download_parallel_threshold = 1000
+
+    with pytest.raises(DataCorruptionError):
+        segmented_client.download("/file.txt", local_path)
+
+    assert not osp.exists(local_path)
+
+    # Download in segments.
+    segmented_client._download_parallel_threshold = 100
+
+    with pytest.raises(DataCorruptionError):
+        segmented_client.download("/file.txt", local_path)
+
+    assert not osp.exists(local_path)
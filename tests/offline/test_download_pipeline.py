@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+import os.path as osp
+import time
+from pathlib import Path
+
+from maestral.database import (
+    IndexEntry,
+    SyncEvent,
+    SyncDirection,
+    SyncStatus,
+    ItemType,
+    ChangeType,
+)
+from maestral.utils.path import content_hash
+
+
+def download_event(
+    sync,
+    dbx_path,
+    hash_str,
+    size,
+    dbx_id="id:new",
+    item_type=ItemType.File,
+    change_type=ChangeType.Added,
+):
+    return SyncEvent(
+        direction=SyncDirection.Down,
+        item_type=item_type,
+        sync_time=time.time(),
+        dbx_id=dbx_id,
+        dbx_path=dbx_path,
+        dbx_path_lower=dbx_path.lower(),
+        local_path=sync.to_local_path_from_cased(dbx_path),
+        rev="0123456789" if item_type is ItemType.File else "folder",
+        content_hash=hash_str,
+        change_type=change_type,
+        change_time=time.time() - 60,
+        status=SyncStatus.Queued,
+        size=size,
+    )
+
+
+def index_item(sync, dbx_path, dbx_id, item_type, hash_str):
+    sync._db_manager_index.save(
+        IndexEntry(
+            dbx_path_cased=dbx_path,
+            dbx_path_lower=dbx_path.lower(),
+            dbx_id=dbx_id,
+            item_type=item_type,
+            last_sync=time.time(),
+            rev="abcdef" if item_type is ItemType.File else "folder",
+            content_hash=hash_str,
+        )
+    )
+
+
+def test_download_from_local_duplicate(sync, monkeypatch):
+
+    def download(*args, **kwargs):
+        raise AssertionError("Download should be satisfied locally")
+
+    monkeypatch.setattr(sync.client, "download", download)
+
+    src = Path(sync.dropbox_path) / "original.txt"
+    src.write_bytes(b"content" * 1000)
+    hash_str, mtime = content_hash(str(src))
+
+    sync._db_manager_index.save(
+        IndexEntry(
+            dbx_path_cased="/original.txt",
+            dbx_path_lower="/original.txt",
+            dbx_id="id:original",
+            item_type=ItemType.File,
+            last_sync=mtime,
+            rev="abcdef",
+            content_hash=hash_str,
+        )
+    )
+
+    event = download_event(sync, "/copy.txt", hash_str, src.stat().st_size)
+    res = sync._on_remote_file(event, None)
+
+    assert res is event
+    assert Path(event.local_path).read_bytes() == src.read_bytes()
+    assert sync.get_index_entry("/copy.txt").content_hash == hash_str
+
+
+def test_download_without_local_duplicate(sync, monkeypatch):
+
+    downloads = []
+
+    def download(dbx_path, local_path, **kwargs):
+        downloads.append(dbx_path)
+        raise AssertionError("Download started")
+
+    monkeypatch.setattr(sync.client, "download", download)
+
+    src = Path(sync.dropbox_path) / "original.txt"
+    src.write_bytes(b"content" * 1000)
+    hash_str, mtime = content_hash(str(src))
+
+    # The index claims the same content but the local file has been modified since.
+    sync._db_manager_index.save(
+        IndexEntry(
+            dbx_path_cased="/original.txt",
+            dbx_path_lower="/original.txt",
+            dbx_id="id:original",
+            item_type=ItemType.File,
+            last_sync=mtime,
+            rev="abcdef",
+            content_hash="0" * 64,
+        )
+    )
+
+    event = download_event(sync, "/copy.txt", "0" * 64, src.stat().st_size)
+
+    try:
+        sync._on_remote_file(event, None)
+    except AssertionError:
+        pass
+
+    assert downloads == ["rev:0123456789"]
+    assert not osp.exists(event.local_path)
+
+
+def test_remote_folder_move(sync, monkeypatch):
+
+    def download(*args, **kwargs):
+        raise AssertionError("Moved items should not be downloaded")
+
+    monkeypatch.setattr(sync.client, "download", download)
+
+    folder = Path(sync.dropbox_path) / "folder"
+    folder.mkdir()
+    file = folder / "file.txt"
+    file.write_bytes(b"content" * 1000)
+    hash_str, _ = content_hash(str(file))
+    size = file.stat().st_size
+
+    index_item(sync, "/folder", "id:folder", ItemType.Folder, "folder")
+    index_item(sync, "/folder/file.txt", "id:file", ItemType.File, hash_str)
+
+    # Dropbox reports a folder move as deletion of the old path and additions of the
+    # new path and all its children.
+    events = [
+        download_event(
+            sync,
+            "/folder",
+            None,
+            0,
+            dbx_id=None,
+            item_type=ItemType.Folder,
+            change_type=ChangeType.Removed,
+        ),
+        download_event(
+            sync, "/renamed", "folder", 0, dbx_id="id:folder", item_type=ItemType.Folder
+        ),
+        download_event(sync, "/renamed/file.txt", hash_str, size, dbx_id="id:file"),
+    ]
+
+    events = sync._reconcile_remote_moves(events)
+
+    assert len(events) == 2
+    assert events[0].is_moved
+    assert events[0].dbx_path_from == "/folder"
+    assert events[1].is_added
+
+    sync.apply_remote_changes(events)
+
+    assert not folder.exists()
+    assert (Path(sync.dropbox_path) / "renamed" / "file.txt").is_file()
+    assert not sync.get_index_entry("/folder")
+    assert sync.get_index_entry("/renamed").dbx_id == "id:folder"
+    assert sync.get_index_entry("/renamed/file.txt").content_hash == hash_str
@@ -3,7 +3,7 @@
 import os
 from pathlib import Path
 
-from watchdog.events import DirCreatedEvent, DirMovedEvent
+from watchdog.events import DirCreatedEvent, DirMovedEvent, FileDeletedEvent
 
 from maestral.sync import SyncDirection, ItemType, ChangeType
 from maestral.utils.path import move
@@ -88,3 +88,40 @@ def test_catching_non_ignored_events(sync):
     sync.wait_for_local_changes()
     sync_events, _ = sync.list_local_changes()
     assert all(not si.is_directory for si in sync_events)
+
+
+def test_batch_size_limit(sync):
+
+    for i in range(10):
+        sync.fs_events.queue_event(FileDeletedEvent(sync.dropbox_path + ipath(i)))
+
+    sync_events, _ = sync.list_local_changes(max_batch_size=4)
+    assert len(sync_events) == 4
+
+    # remaining events stay in the queue for the next batch
+    sync_events, _ = sync.list_local_changes(max_batch_size=100)
+    assert len(sync_events) == 6
+
+    stats = sync.local_batch_stats
+    assert stats["batches"] == 2
+    assert stats["last_size"] == 6
+    assert stats["max_size"] == 6
+    assert stats["limited"] == 1
+
+
+def test_batch_wait_limit(sync):
+
+    # a continuous stream of events must not block indefinitely
+    for i in range(10):
+        sync.fs_events.queue_event(FileDeletedEvent(sync.dropbox_path + ipath(i)))
+
+    sync_events, _ = sync.list_local_changes(delay=1, max_wait=0)
+    assert len(sync_events) == 0
+    assert sync.local_batch_stats["limited"] == 1
+
+    # idle delay grows after hitting a limit and decays afterwards
+    assert sync._local_batch_delay_factor == 2
+
+    sync_events, _ = sync.list_local_changes(delay=0.1)
+    assert len(sync_events) == 10
+    assert sync._local_batch_delay_factor == 1
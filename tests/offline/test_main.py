@@ -1,8 +1,23 @@
 # -*- coding: utf-8 -*-
 
+import os
+import time
+
 import requests
 import maestral.main
 from maestral.constants import GITHUB_RELEASES_API
+from maestral.database import (
+    IndexEntry,
+    ItemType,
+    SyncEvent,
+    SyncDirection,
+    SyncStatus,
+    ChangeType,
+)
+from maestral.errors import SyncError
+from maestral.main import Maestral
+from maestral.utils.appdirs import get_home_dir
+from maestral.utils.path import delete
 
 
 def test_check_for_updates(m):
@@ -43,3 +58,96 @@ def test_check_for_updates(m):
     assert update_res["update_available"]
     assert update_res["release_notes"] != ""
     assert update_res["error"] is None
+
+
+def test_file_status_batch(m, monkeypatch):
+
+    monkeypatch.setattr(Maestral, "running", property(lambda self: True))
+
+    dropbox_path = os.path.join(get_home_dir(), "dummy_dir")
+    m.sync.dropbox_path = dropbox_path
+
+    for path in ("/synced", "/folder", "/folder/uploading", "/error"):
+        m.sync._db_manager_index.save(
+            IndexEntry(
+                dbx_path_cased=path,
+                dbx_path_lower=path,
+                dbx_id=f"id:{path}",
+                item_type=ItemType.File,
+                last_sync=time.time(),
+                rev="abcdef",
+                content_hash="0" * 64,
+            )
+        )
+
+    event = SyncEvent.__new__(SyncEvent)
+    event.direction = SyncDirection.Up
+    m.sync.syncing[f"{dropbox_path}/folder/uploading"] = event
+
+    m.sync._handle_sync_error(
+        SyncError("Error", "Message", dbx_path="/error"), SyncDirection.Up
+    )
+
+    paths = ["/synced", "/folder", "/error", "/unknown", "/folder2", "/"]
+    local_paths = [dropbox_path + path for path in paths] + ["/usr"]
+
+    try:
+        assert m.get_file_status_batch(local_paths) == [
+            "up to date",
+            "uploading",
+            "error",
+            "unwatched",
+            "unwatched",
+            "uploading",
+            "unwatched",
+        ]
+        assert m.get_file_status_batch(local_paths) == [
+            m.get_file_status(path) for path in local_paths
+        ]
+    finally:
+        delete(dropbox_path)
+
+
+def test_activity_changes(m, monkeypatch):
+
+    monkeypatch.setattr(Maestral, "_check_linked", lambda self: None)
+
+    event = SyncEvent(
+        direction=SyncDirection.Up,
+        item_type=ItemType.File,
+        sync_time=time.time(),
+        dbx_path="/file.txt",
+        dbx_path_lower="/file.txt",
+        local_path="/dropbox/file.txt",
+        status=SyncStatus.Queued,
+        change_type=ChangeType.Added,
+        size=100,
+    )
+    m.sync.syncing[event.local_path] = event
+
+    res = m.get_activity_changes("", timeout=0)
+
+    assert res["reset"]
+    assert [e["dbx_path"] for e in res["changed"]] == ["/file.txt"]
+
+    # no changes until the timeout
+    t0 = time.monotonic()
+    res = m.get_activity_changes(res["cursor"], timeout=0.6)
+
+    assert time.monotonic() - t0 >= 0.6
+    assert res["changed"] == [] and res["removed"] == []
+
+    event.status = SyncStatus.Syncing
+    event.completed = 50
+
+    res = m.get_activity_changes(res["cursor"], timeout=5)
+
+    assert not res["reset"]
+    assert [e["completed"] for e in res["changed"]] == [50]
+
+    del m.sync.syncing[event.local_path]
+
+    res = m.get_activity_changes(res["cursor"], timeout=5)
+
+    assert res["changed"] == []
+    assert res["removed"] == ["/dropbox/file.txt"]
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+
+from maestral.statusboard import (
+    StatusBoard,
+    read_status_board,
+    status_board_path,
+    SIZE,
+)
+
+
+def publish(board, **kwargs):
+
+    values = dict(
+        status="Up to date",
+        running=True,
+        paused=False,
+        connected=True,
+        syncing=0,
+        sync_errors=0,
+        fatal_errors=0,
+        transfers=0,
+        transfer_limit=8,
+        throughput=0.0,
+    )
+    values.update(kwargs)
+    board.publish(**values)
+
+
+def test_publish_and_read(tmp_path):
+
+    path = str(tmp_path / "test.status")
+    board = StatusBoard(path)
+
+    assert os.path.getsize(path) == SIZE
+    assert read_status_board(path) is None
+
+    publish(board, status="Syncing...", syncing=3, throughput=1.5e6)
+    publish(board, status="Uploading 2/3...", current_item="/folder/file.txt")
+
+    res = read_status_board(path)
+
+    assert res["pid"] == os.getpid()
+    assert res["status"] == "Uploading 2/3..."
+    assert res["current_item"] == "/folder/file.txt"
+    assert res["syncing"] == 0
+    assert res["running"] and res["connected"] and not res["paused"]
+
+    board.close()
+
+    assert not os.path.exists(path)
+    assert read_status_board(path) is None
+
+
+def test_outdated_board(tmp_path, monkeypatch):
+
+    path = str(tmp_path / "test.status")
+    board = StatusBoard(path)
+    publish(board)
+
+    assert read_status_board(path)
+
+    # the daemon has stopped publishing
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 10)
+
+    assert read_status_board(path) is None
+    assert read_status_board(path, max_age=20)
+
+    board.close()
+
+
+def test_truncation(tmp_path):
+
+    path = str(tmp_path / "test.status")
+    board = StatusBoard(path)
+
+    # multi-byte characters are not split
+    publish(board, status="ä" * 200)
+
+    assert read_status_board(path)["status"] == "ä" * 128
+
+    board.close()
+
+
+def test_torn_read(tmp_path):
+
+    path = str(tmp_path / "test.status")
+    board = StatusBoard(path)
+    publish(board)
+
+    # an update which never finished
+    board._mmap[100] ^= 0xFF
+
+    assert read_status_board(path, retries=2) is None
+
+    board.close()
+
+
+def test_stale_board(tmp_path, monkeypatch):
+
+    path = str(tmp_path / "test.status")
+    board = StatusBoard(path)
+
+    # published by a daemon which is no longer running
+    monkeypatch.setattr(os, "getpid", lambda: 2 ** 31 - 1)
+    publish(board)
+
+    assert read_status_board(path) is None
+
+    board.close()
+
+
+def test_maestral_status_board(m):
+
+    path = status_board_path(m.config_name)
+
+    m._status_board = StatusBoard(path)
+    m._publish_status()
+
+    res = read_status_board(path)
+
+    assert res["status"] == m.status
+    assert res["paused"]
+    assert not res["connected"]
+
+    m._status_board.close()
+
+
+def test_maestral_status_board_error(m, tmp_path):
+
+    # the status board is optional and errors are only logged
+    m._start_status_board(str(tmp_path / "missing" / "test.status"))
+
+    assert m._status_board is None
@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+
+import time
+from pathlib import Path
+from threading import Lock
+
+from datetime import datetime
+
+import pytest
+from dropbox.files import DeletedMetadata, FileMetadata, FolderMetadata
+from watchdog.events import (
+    DirCreatedEvent,
+    FileCreatedEvent,
+    FileDeletedEvent,
+    DirMovedEvent,
+    FileMovedEvent,
+)
+
+from maestral.database import (
+    SyncEvent,
+    SyncStatus,
+    IndexEntry,
+    ItemType,
+    HashCacheEntry,
+)
+from maestral.errors import SyncError, DatabaseError
+from maestral.sync import DB_VERSION
+from maestral.utils.path import content_hash
+
+
+def test_streaming_upload_order(sync, monkeypatch):
+
+    finished = []
+    lock = Lock()
+
+    def create_remote_entry(event):
+        if event.is_directory:
+            time.sleep(0.5)
+        with lock:
+            finished.append(event.dbx_path)
+        event.status = SyncStatus.Done
+        return event
+
+    monkeypatch.setattr(sync, "_create_remote_entry", create_remote_entry)
+
+    new_dir = Path(sync.dropbox_path) / "parent"
+    new_dir.mkdir()
+
+    events = [DirCreatedEvent(str(new_dir))]
+
+    for i in range(5):
+        file = new_dir / f"test_{i}"
+        file.write_text("content")
+        events.append(FileCreatedEvent(str(file)))
+
+    other_file = Path(sync.dropbox_path) / "other"
+    other_file.write_text("content")
+    events.append(FileCreatedEvent(str(other_file)))
+
+    events.append(FileDeletedEvent(str(Path(sync.dropbox_path) / "deleted")))
+
+    results = sync.apply_local_events(events)
+
+    assert len(results) == len(events)
+    assert all(r.status == SyncStatus.Done for r in results)
+
+    # deletions are applied first
+    assert finished[0] == "/deleted"
+
+    # independent items do not wait for unrelated folder creations
+    assert finished.index("/other") < finished.index("/parent")
+
+    # children are only uploaded after their parent folder has been created
+    parent_index = finished.index("/parent")
+    assert all(finished.index(f"/parent/test_{i}") > parent_index for i in range(5))
+
+
+def test_transfer_priority(sync):
+
+    sync.priority_folders = ["/Important/"]
+
+    small = Path(sync.dropbox_path) / "small"
+    small.write_text("a")
+
+    large = Path(sync.dropbox_path) / "large"
+    large.write_bytes(b"a" * 10 ** 6)
+
+    important = Path(sync.dropbox_path) / "important"
+    important.mkdir()
+    large_important = important / "large"
+    large_important.write_bytes(b"a" * 10 ** 6)
+
+    events = [
+        SyncEvent.from_file_system_event(FileCreatedEvent(str(path)), sync)
+        for path in (small, large, large_important)
+    ]
+    priorities = [sync._transfer_priority(e) for e in events]
+
+    assert sync.priority_folders == ["/important"]
+    assert priorities[2] < priorities[0] < priorities[1]
+
+    # large items age: they are eventually preferred over newly queued small items
+    time.sleep(1.1)
+    assert priorities[1] < sync._transfer_priority(events[0])
+
+
+def file_metadata(path, content_hash):
+    return FileMetadata(
+        name=path.split("/")[-1],
+        path_lower=path.lower(),
+        path_display=path,
+        id="id:" + path,
+        rev="0123456789",
+        size=7,
+        content_hash=content_hash,
+        client_modified=datetime(2021, 1, 1),
+        server_modified=datetime(2021, 1, 1),
+    )
+
+
+def index_source(sync, hash_str):
+    sync._db_manager_index.save(
+        IndexEntry(
+            dbx_path_cased="/Source",
+            dbx_path_lower="/source",
+            dbx_id="id:source",
+            item_type=ItemType.File,
+            last_sync=time.time(),
+            rev="abcdef",
+            content_hash=hash_str,
+        )
+    )
+
+
+def test_server_side_copy(sync, monkeypatch):
+
+    copies = []
+
+    def copy(dbx_path, new_path, **kwargs):
+        copies.append((dbx_path, new_path))
+        return file_metadata(new_path, event.content_hash)
+
+    def upload(*args, **kwargs):
+        raise AssertionError("File should be copied on the server")
+
+    monkeypatch.setattr(sync.client, "get_metadata", lambda *args, **kwargs: None)
+    monkeypatch.setattr(sync.client, "copy", copy)
+    monkeypatch.setattr(sync.client, "upload", upload)
+
+    new_file = Path(sync.dropbox_path) / "copy"
+    new_file.write_text("content")
+    event = SyncEvent.from_file_system_event(FileCreatedEvent(str(new_file)), sync)
+
+    index_source(sync, event.content_hash)
+
+    md = sync._on_local_created(event)
+
+    assert copies == [("/source", "/copy")]
+    assert md.path_lower == "/copy"
+    assert sync.get_index_entry("/copy").content_hash == event.content_hash
+
+
+def test_server_side_copy_changed_source(sync, monkeypatch):
+
+    uploads = []
+
+    def upload(local_path, dbx_path, **kwargs):
+        uploads.append((dbx_path, kwargs["mode"]))
+        return file_metadata(dbx_path, event.content_hash)
+
+    monkeypatch.setattr(sync.client, "get_metadata", lambda *args, **kwargs: None)
+    monkeypatch.setattr(
+        sync.client, "copy", lambda src, dst, **kwargs: file_metadata(dst, "0" * 64)
+    )
+    monkeypatch.setattr(sync.client, "upload", upload)
+
+    new_file = Path(sync.dropbox_path) / "copy"
+    new_file.write_text("content")
+    event = SyncEvent.from_file_system_event(FileCreatedEvent(str(new_file)), sync)
+
+    index_source(sync, event.content_hash)
+
+    sync._on_local_created(event)
+
+    # the outdated copy is overwritten with the local content
+    assert len(uploads) == 1
+    assert uploads[0][0] == "/copy"
+    assert uploads[0][1].is_update()
+    assert uploads[0][1].get_update() == "0123456789"
+
+
+def test_server_side_copy_errors(sync, monkeypatch):
+
+    uploads = []
+    removed = []
+
+    def upload(local_path, dbx_path, **kwargs):
+        uploads.append(dbx_path)
+        if kwargs["mode"].is_update():
+            raise SyncError("Upload failed", "")
+        return file_metadata(dbx_path, event.content_hash)
+
+    monkeypatch.setattr(sync.client, "get_metadata", lambda *args, **kwargs: None)
+    monkeypatch.setattr(
+        sync.client, "copy", lambda src, dst, **kwargs: file_metadata(dst, "0" * 64)
+    )
+    monkeypatch.setattr(
+        sync.client, "remove", lambda dbx_path, **kwargs: removed.append(dbx_path)
+    )
+    monkeypatch.setattr(sync.client, "upload", upload)
+
+    new_file = Path(sync.dropbox_path) / "copy"
+    new_file.write_text("content")
+    event = SyncEvent.from_file_system_event(FileCreatedEvent(str(new_file)), sync)
+
+    index_source(sync, event.content_hash)
+
+    md = sync._on_local_created(event)
+
+    # the outdated copy is removed and the file is uploaded instead
+    assert removed == ["/copy"]
+    assert uploads == ["/copy", "/copy"]
+    assert md.path_lower == "/copy"
+
+    # failing copies fall back to an upload
+    def copy(*args, **kwargs):
+        raise SyncError("Copy failed", "")
+
+    monkeypatch.setattr(sync.client, "copy", copy)
+    uploads.clear()
+
+    new_file = Path(sync.dropbox_path) / "other"
+    new_file.write_text("content")
+    event = SyncEvent.from_file_system_event(FileCreatedEvent(str(new_file)), sync)
+
+    sync._on_local_created(event)
+
+    assert uploads == ["/other"]
+
+
+def index_item(sync, dbx_path, item_type, hash_str):
+    sync._db_manager_index.save(
+        IndexEntry(
+            dbx_path_cased=dbx_path,
+            dbx_path_lower=dbx_path.lower(),
+            dbx_id="id:" + dbx_path,
+            item_type=item_type,
+            last_sync=time.time(),
+            rev="abcdef" if item_type is ItemType.File else "folder",
+            content_hash=hash_str,
+        )
+    )
+
+
+def test_local_moves_while_inactive(sync):
+
+    root = Path(sync.dropbox_path)
+
+    # items as synced before the moves
+
+    file = root / "renamed.txt"
+    file.write_text("file content")
+    hash_str, _ = content_hash(str(file))
+    index_item(sync, "/file.txt", ItemType.File, hash_str)
+
+    folder = root / "new folder"
+    (folder / "sub").mkdir(parents=True)
+    index_item(sync, "/folder", ItemType.Folder, "folder")
+    index_item(sync, "/folder/sub", ItemType.Folder, "folder")
+
+    for name in ("a.txt", "sub/b.txt"):
+        child = folder / name
+        child.write_text(name)
+        child_hash, _ = content_hash(str(child))
+        index_item(sync, "/folder/" + name, ItemType.File, child_hash)
+
+    # a deleted file and an unrelated new file with different content
+
+    index_item(sync, "/deleted.txt", ItemType.File, "0" * 64)
+    (root / "other.txt").write_text("other content")
+
+    sync.local_cursor = time.time()
+    events, _ = sync._get_local_changes_while_inactive()
+    events = sync._clean_local_events(events)
+
+    assert set(events) == {
+        FileMovedEvent(str(root / "file.txt"), str(file)),
+        DirMovedEvent(str(root / "folder"), str(folder)),
+        FileDeletedEvent(str(root / "deleted.txt")),
+        FileCreatedEvent(str(root / "other.txt")),
+    }
+
+
+def test_move_candidates_not_hashed(sync, monkeypatch):
+
+    root = Path(sync.dropbox_path)
+
+    index_item(sync, "/folder", ItemType.Folder, "folder")
+    index_item(sync, "/folder/deleted.txt", ItemType.File, "0" * 64)
+    (root / "folder").mkdir()
+    (root / "folder" / "renamed.txt").write_text("content")
+    (root / "moved").mkdir()
+    (root / "moved" / "deleted.txt").write_text("content")
+    (root / "other").mkdir()
+    (root / "other" / "unrelated.txt").write_text("content")
+
+    hashed = []
+    get_local_hash = sync.get_local_hash
+
+    def get_local_hash_counted(path):
+        hashed.append(path)
+        return get_local_hash(path)
+
+    monkeypatch.setattr(sync, "get_local_hash", get_local_hash_counted)
+
+    sync.local_cursor = time.time()
+    events, _ = sync._get_local_changes_while_inactive()
+    sync._reconcile_local_moves(set(events))
+
+    # only files which keep the name or the folder of a deleted file are hashed
+    assert sorted(hashed) == [
+        str(root / "folder" / "renamed.txt"),
+        str(root / "moved" / "deleted.txt"),
+    ]
+
+
+def test_local_folder_move_index(sync, monkeypatch):
+
+    md_folder = FolderMetadata(
+        name="Renamed", path_lower="/renamed", path_display="/Renamed", id="id:/Folder"
+    )
+
+    def list_folder(*args, **kwargs):
+        raise AssertionError("The moved folder should not be listed")
+
+    monkeypatch.setattr(sync.client, "get_metadata", lambda *args, **kwargs: True)
+    monkeypatch.setattr(sync.client, "move", lambda *args, **kwargs: md_folder)
+    monkeypatch.setattr(sync.client, "list_folder", list_folder)
+
+    root = Path(sync.dropbox_path)
+    (root / "Renamed" / "Sub").mkdir(parents=True)
+    (root / "Renamed" / "Sub" / "file.txt").write_text("content")
+
+    index_item(sync, "/Folder", ItemType.Folder, "folder")
+    index_item(sync, "/Folder/Sub", ItemType.Folder, "folder")
+    index_item(sync, "/Folder/Sub/file.txt", ItemType.File, "0" * 64)
+    index_item(sync, "/Folder0", ItemType.Folder, "folder")
+    index_item(sync, "/Folder_1", ItemType.Folder, "folder")
+
+    sync._db_manager_hash_cache.save(
+        HashCacheEntry(
+            local_path=str(root / "Folder" / "Sub" / "file.txt"),
+            hash_str="0" * 64,
+            mtime=1.0,
+        )
+    )
+
+    event = SyncEvent.from_file_system_event(
+        DirMovedEvent(str(root / "Folder"), str(root / "Renamed")), sync
+    )
+    sync._on_local_moved(event)
+
+    assert sorted(e.dbx_path_cased for e in sync.get_index()) == [
+        "/Folder0",
+        "/Folder_1",
+        "/Renamed",
+        "/Renamed/Sub",
+        "/Renamed/Sub/file.txt",
+    ]
+    assert sync.get_index_entry("/renamed/sub/file.txt").content_hash == "0" * 64
+    assert sync._db_manager_hash_cache.get(str(root / "Renamed" / "Sub" / "file.txt"))
+
+
+def test_remove_subtree_from_index(sync):
+
+    for path in ("/folder", "/folder/sub", "/folder/sub/file", "/folder.txt"):
+        index_item(sync, path, ItemType.Folder, "folder")
+
+    for path in ("/folder 1", "/folder0", "/folder0/file"):
+        index_item(sync, path, ItemType.Folder, "folder")
+
+    assert len(sync.get_index_entries_in_subtree("/folder")) == 3
+
+    sync.remove_node_from_index("/folder")
+
+    assert sorted(e.dbx_path_lower for e in sync.get_index()) == [
+        "/folder 1",
+        "/folder.txt",
+        "/folder0",
+        "/folder0/file",
+    ]
+
+
+def test_index_batch_update(sync, monkeypatch):
+
+    index_item(sync, "/folder", ItemType.Folder, "folder")
+    index_item(sync, "/folder/old.txt", ItemType.File, "0" * 64)
+    index_item(sync, "/gone", ItemType.Folder, "folder")
+    index_item(sync, "/gone/file.txt", ItemType.File, "0" * 64)
+
+    def get_metadata(*args, **kwargs):
+        raise AssertionError("Parent casing should be resolved from the batch")
+
+    monkeypatch.setattr(sync.client, "get_metadata", get_metadata)
+
+    entries = [
+        FolderMetadata(
+            name="Folder", path_lower="/folder", path_display="/Folder", id="id:1"
+        ),
+        file_metadata("/folder/old.txt", "1" * 64),
+        file_metadata("/folder/new.txt", "2" * 64),
+        DeletedMetadata(name="gone", path_lower="/gone", path_display="/gone"),
+    ]
+
+    sync.update_index_from_dbx_metadata_batch(entries)
+
+    assert sorted(e.dbx_path_cased for e in sync.get_index()) == [
+        "/Folder",
+        "/Folder/new.txt",
+        "/Folder/old.txt",
+    ]
+    assert sync.get_index_entry("/folder/old.txt").content_hash == "1" * 64
+    assert sync.get_index_entry("/folder/old.txt").last_sync is None
+    assert sync.get_index_entry("/folder").dbx_id == "id:1"
+
+
+def test_newer_database_version(sync):
+
+    sync._db.user_version = DB_VERSION + 1
+
+    # an index from a newer version is not migrated or overwritten
+    with pytest.raises(DatabaseError):
+        sync._migrate_database()
+
+    assert sync._db.user_version == DB_VERSION + 1
+
+
+def test_rescan_deleted_children(sync, monkeypatch):
+
+    queued = []
+    monkeypatch.setattr(sync.fs_events, "queue_event", queued.append)
+
+    root = Path(sync.dropbox_path)
+    (root / "Folder").mkdir()
+
+    index_item(sync, "/Folder", ItemType.Folder, "folder")
+    index_item(sync, "/Folder/Sub", ItemType.Folder, "folder")
+    index_item(sync, "/Folder/Sub/file.txt", ItemType.File, "0" * 64)
+    index_item(sync, "/Folder0/file.txt", ItemType.File, "0" * 64)
+
+    sync.rescan(str(root / "Folder"))
+
+    deleted = [e for e in queued if e.event_type == "deleted"]
+
+    assert sorted(e.src_path for e in deleted) == [
+        str(root / "Folder" / "Sub"),
+        str(root / "Folder" / "Sub" / "file.txt"),
+    ]
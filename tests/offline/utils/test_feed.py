@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+from maestral.utils.feed import ChangeFeed
+
+
+def test_changes():
+
+    feed = ChangeFeed()
+
+    assert feed.update({"a": 1, "b": 1})
+    cursor, changed, removed, reset = feed.changes("")
+
+    assert reset
+    assert cursor == feed.cursor
+    assert sorted(changed) == ["a", "b"]
+
+    # unchanged snapshots do not advance the cursor
+    assert not feed.update({"a": 1, "b": 1})
+    assert feed.changes(cursor) == (cursor, [], [], False)
+
+    feed.update({"a": 2, "b": 1, "c": 1})
+    feed.update({"a": 3, "c": 1})
+
+    # changes are coalesced
+    new_cursor, changed, removed, reset = feed.changes(cursor)
+
+    assert new_cursor == feed.cursor
+    assert (sorted(changed), removed, reset) == (["a", "c"], ["b"], False)
+
+    # a key which is added again is no longer removed
+    feed.update({"a": 3, "b": 2, "c": 1})
+
+    assert feed.changes(new_cursor) == (feed.cursor, ["b"], [], False)
+
+
+def test_reset():
+
+    feed = ChangeFeed(max_removed=1)
+
+    feed.update({"a": 1, "b": 1, "c": 1})
+    cursor0 = feed.cursor
+
+    feed.update({"a": 1, "b": 1})
+    cursor1 = feed.cursor
+
+    feed.update({"a": 1})
+
+    # the removal of "c" has been forgotten
+    assert feed.changes(cursor0) == (feed.cursor, ["a"], [], True)
+    assert feed.changes(cursor1) == (feed.cursor, [], ["b"], False)
+
+    # invalid cursor
+    assert feed.changes("invalid")[3]
+
+
+def test_restart():
+
+    feed = ChangeFeed()
+    feed.update({"a": 1})
+    feed.update({"a": 2})
+    cursor = feed.cursor
+
+    # a new feed, e.g., after a restart, has advanced further
+    new_feed = ChangeFeed()
+
+    for i in range(5):
+        new_feed.update({"a": i})
+
+    assert new_feed.changes(cursor) == (new_feed.cursor, ["a"], [], True)
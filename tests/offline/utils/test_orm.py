@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+
+import timeit
+from enum import Enum
+
+import pytest
+
+from maestral.utils.orm import (
+    Database,
+    Manager,
+    Model,
+    Column,
+    SqlInt,
+    SqlString,
+    SqlFloat,
+    SqlEnum,
+    SqlHex,
+)
+from maestral.database import SyncEvent
+
+
+class User(Model):
+
+    __tablename__ = "users"
+
+    id = Column(SqlInt(), primary_key=True)
+    name = Column(SqlString())
+
+
+class Color(Enum):
+    Red = "red"
+    Blue = "blue"
+
+
+class Item(Model):
+
+    __slots__ = ["_id", "_name", "_color", "_value"]
+
+    __tablename__ = "items"
+
+    id = Column(SqlInt(), primary_key=True)
+    name = Column(SqlString(), nullable=False)
+    color = Column(SqlEnum(Color))
+    value = Column(SqlFloat(), default=1.0)
+
+
+@pytest.fixture
+def manager():
+    db = Database(":memory:", check_same_thread=False)
+    yield Manager(db, User)
+    db.close()
+
+
+def names(manager):
+    return {user.id: user.name for user in manager.all()}
+
+
+def test_save_many(manager):
+
+    users = manager.save_many([User(id=1, name="a"), User(id=2, name="b")])
+    manager.save_many([User(name="c")])
+
+    assert manager.get(1) is users[0]
+    assert names(manager) == {1: "a", 2: "b", 3: "c"}
+
+    # nothing is saved if any primary key already exists
+    with pytest.raises(ValueError):
+        manager.save_many([User(id=4, name="d"), User(id=1, name="e")])
+
+    assert names(manager) == {1: "a", 2: "b", 3: "c"}
+
+
+def test_save_existing(manager):
+
+    manager.save(User(id=1, name="a"))
+
+    with pytest.raises(ValueError):
+        manager.save(User(id=1, name="b"))
+
+    user = manager.save(User(name="c"))
+
+    assert user.id == 2
+
+
+def test_update_many(manager):
+
+    users = manager.save_many([User(id=1, name="a"), User(id=2, name="b")])
+
+    for user in users:
+        user.name = user.name.upper()
+
+    manager.update_many(users)
+    manager.clear_cache()
+
+    assert names(manager) == {1: "A", 2: "B"}
+
+
+def test_delete_many(manager):
+
+    users = manager.save_many([User(id=i, name=str(i)) for i in range(5)])
+
+    manager.delete_many(users[1:4])
+
+    assert names(manager) == {0: "0", 4: "4"}
+    assert manager.get(2) is None
+
+
+def test_upsert(manager):
+
+    manager.save(User(id=1, name="a"))
+
+    manager.upsert(User(id=1, name="b"))
+    manager.upsert_many([User(id=2, name="c"), User(id=3, name="d")])
+    manager.clear_cache()
+
+    assert names(manager) == {1: "b", 2: "c", 3: "d"}
+    assert manager.count() == 3
+
+
+def test_load_rows():
+
+    db = Database(":memory:")
+    manager = Manager(db, Item)
+
+    manager.save(Item(id=1, name="a", color=Color.Red))
+    db.execute("INSERT INTO items (id, name) VALUES (2, 'b')")
+
+    item0, item1 = manager.query_to_objects("SELECT * FROM items ORDER BY id")
+
+    assert (item0.name, item0.color, item0.value) == ("a", Color.Red, 1.0)
+    assert (item1.name, item1.color, item1.value) == ("b", None, 1.0)
+
+    # saved objects are cached, other query results are not
+    assert manager.get(1) is item0
+    assert manager.get(2) is not item1
+
+    # only some columns
+    item = manager.query_to_objects("SELECT id, color FROM items WHERE id = 1")[0]
+    assert item.color is Color.Red
+
+    db.close()
+
+
+def test_slots():
+
+    event = SyncEvent.__new__(SyncEvent)
+
+    assert not hasattr(event, "__dict__")
+    assert not hasattr(Item(id=1, name="a"), "__dict__")
+
+
+def test_load_performance():
+
+    db = Database(":memory:")
+    manager = Manager(db, Item)
+
+    n_rows = 100_000
+    manager.save_many(
+        Item(id=i, name=f"item {i}", color=Color.Blue, value=i) for i in range(n_rows)
+    )
+
+    def load_all():
+        return sum(len(rows) for rows in manager.iter_all())
+
+    # previous loader: sqlite3.Row objects passed through Manager.create
+    reference = Manager(db, Item)
+
+    def load_all_reference():
+        rows = db.execute(f"SELECT * FROM {reference.table_name}").fetchall()
+        return len([reference.create(**row) for row in rows])
+
+    assert load_all() == n_rows
+    assert load_all_reference() == n_rows
+
+    # compare against the previous loader instead of absolute times
+    duration = min(timeit.repeat(load_all, number=1, repeat=3))
+    duration_reference = min(timeit.repeat(load_all_reference, number=1, repeat=3))
+
+    assert duration < duration_reference
+
+    db.close()
+
+
+def test_transaction(manager):
+
+    db = manager.db
+
+    with db.transaction():
+        manager.save(User(id=1, name="a"))
+
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                manager.save(User(id=2, name="b"))
+                raise RuntimeError("inner")
+
+        manager.save(User(id=3, name="c"))
+
+    assert not db.in_transaction
+    assert names(manager) == {1: "a", 3: "c"}
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            manager.delete_many(manager.all())
+            manager.save(User(id=4, name="d"))
+            raise RuntimeError("outer")
+
+    assert names(manager) == {1: "a", 3: "c"}
+
+
+def test_transaction_cache(manager):
+
+    db = manager.db
+
+    manager.save(User(id=1, name="a"))
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            manager.save(User(id=2, name="b"))
+            user = manager.get(1)
+            user.name = "changed"
+            manager.update(user)
+            raise RuntimeError("rollback")
+
+    # cached objects are discarded with the rolled back changes
+    assert manager.count() == 1
+    assert manager.get(2) is None
+    assert manager.get(1).name == "a"
+
+
+def test_cache():
+
+    db = Database(":memory:")
+    manager = Manager(db, User, cache_size=2)
+
+    manager.save_many([User(id=i, name=f"/folder/{i}") for i in range(3)])
+
+    # the first object has been evicted
+    assert manager.cache_stats["size"] == 2
+    assert manager.cache_stats["evictions"] == 1
+
+    user = manager.get(0)
+    assert manager.get(0) is user
+
+    stats = manager.cache_stats
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    # objects returned by queries are taken from the cache
+    assert user in manager.all()
+
+    db.close()
+
+
+def test_cache_prefix():
+
+    db = Database(":memory:")
+
+    class Entry(Model):
+
+        __tablename__ = "entries"
+
+        path = Column(SqlString(), primary_key=True)
+
+    manager = Manager(db, Entry)
+    manager.save_many(Entry(path=p) for p in ("/a", "/a/b", "/c"))
+
+    manager.clear_cache(prefix="/a")
+
+    assert manager.cache_stats["size"] == 1
+    assert manager.get("/c").path == "/c"
+
+    db.close()
+
+
+def test_sql_hex():
+
+    hash_str = "a3f1" * 16
+
+    assert SqlHex.py_to_sql(hash_str) == bytes.fromhex(hash_str)
+    assert SqlHex.sql_to_py(SqlHex.py_to_sql(hash_str)) == hash_str
+
+    # strings which would not round trip are stored as is
+    for value in ("folder", hash_str.upper(), "abc", "", None):
+        assert SqlHex.py_to_sql(value) == value
+        assert SqlHex.sql_to_py(value) == value
+
+
+def test_rebuild_table():
+
+    db = Database(":memory:")
+    db.execute("CREATE TABLE hashes (path TEXT PRIMARY KEY, hash TEXT, old TEXT)")
+    db.execute("INSERT INTO hashes VALUES ('/a', 'abcd', 'x'), ('/b', 'folder', 'y')")
+
+    class Hash(Model):
+
+        __tablename__ = "hashes"
+        __without_rowid__ = True
+
+        path = Column(SqlString(), primary_key=True)
+        hash = Column(SqlHex(), index=True)
+
+    manager = Manager(db, Hash)
+    manager.rebuild_table(batch_size=1)
+
+    rows = db.execute("SELECT * FROM hashes ORDER BY path").fetchall()
+    assert [tuple(row) for row in rows] == [("/a", b"\xab\xcd"), ("/b", "folder")]
+    assert manager.get("/a").hash == "abcd"
+
+    sql = db.execute("SELECT sql FROM sqlite_master WHERE name = 'hashes'").fetchone()
+    assert "WITHOUT ROWID" in sql[0]
+
+    index = db.execute("SELECT * FROM sqlite_master WHERE name = 'idx_hashes_hash'")
+    assert index.fetchone()
+
+    db.close()
+
+
+def test_user_version(manager):
+
+    assert manager.db.user_version == 0
+    manager.db.user_version = 2
+    assert manager.db.user_version == 2
@@ -5,6 +5,7 @@ import os.path as osp
 import pytest
 
 from maestral.utils.path import (
+    copy_file,
     normalized_path_exists,
     equivalent_path_candidates,
     denormalize_path,
@@ -97,3 +98,16 @@ def test_is_child():
     assert is_child("/parent/path/child/", "/parent/path")
     assert not is_child("/parent/path", "/parent/path")
     assert not is_child("/path1", "/path2")
+
+
+def test_copy_file(tmp_path):
+
+    src = tmp_path / "src.txt"
+    dest = tmp_path / "dest.txt"
+
+    src.write_bytes(b"content" * 1000)
+    dest.write_bytes(b"old content which is longer than the new content" * 1000)
+
+    copy_file(str(src), str(dest))
+
+    assert dest.read_bytes() == src.read_bytes()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+from threading import Event
+
+from maestral.utils.scheduling import PriorityExecutor
+
+
+def test_priority_order():
+
+    started = Event()
+    release = Event()
+    order = []
+
+    def block():
+        started.set()
+        release.wait()
+
+    with PriorityExecutor(max_workers=1) as executor:
+
+        # occupy the only worker so that all other tasks are queued
+        executor.submit(block)
+        started.wait()
+
+        futures = [
+            executor.submit(order.append, p, priority=p, key=f"task {p}")
+            for p in (3, 1, 2, 1)
+        ]
+
+        assert executor.queued_keys() == ["task 1", "task 1", "task 2", "task 3"]
+
+        release.set()
+
+        for future in futures:
+            future.result()
+
+    assert order == [1, 1, 2, 3]
+    assert executor.queued_keys() == []
+
+
+def test_exceptions_propagate():
+
+    def fail():
+        raise ValueError("failed")
+
+    with PriorityExecutor(max_workers=2) as executor:
+        future = executor.submit(fail)
+        assert isinstance(future.exception(), ValueError)
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+import time
+from datetime import datetime
+from threading import Event, Thread
+
+import pytest
+
+from maestral.utils.throttling import (
+    TokenBucket,
+    CPUGovernor,
+    BandwidthLimiter,
+    ConcurrencyController,
+    BackoffCoordinator,
+)
+from maestral.utils.integration import CPU_COUNT
+
+
+def test_token_bucket_unlimited():
+    bucket = TokenBucket(rate=None)
+    assert not bucket.enabled
+    assert bucket.try_acquire(10 ** 9)
+    assert bucket.acquire(10 ** 9) == 0
+
+
+def test_token_bucket_try_acquire():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_token_bucket_rate():
+    bucket = TokenBucket(rate=100, capacity=10)
+
+    t0 = time.monotonic()
+    for _ in range(30):
+        bucket.acquire()
+    elapsed = time.monotonic() - t0
+
+    # 10 tokens available initially, 20 tokens refilled at 100 / sec
+    assert 0.15 < elapsed < 0.5
+
+
+def test_cpu_governor_disabled():
+    governor = CPUGovernor(max_cpu_percent=100 * CPU_COUNT)
+    assert not governor.enabled
+    assert governor.acquire() == 0
+    assert governor._thread is None
+
+
+def test_cpu_governor_under_budget():
+    governor = CPUGovernor(max_cpu_percent=50)
+
+    try:
+        assert governor.acquire() == 0
+        assert governor._thread.is_alive()
+
+        governor._update(cpu_percent=20, permit_rate=100)
+        assert not governor.throttling
+        assert governor.acquire() == 0
+    finally:
+        governor.stop()
+
+
+def test_cpu_governor_over_budget():
+    governor = CPUGovernor(max_cpu_percent=50, interval=60)
+
+    try:
+        governor.acquire()
+
+        # usage twice the budget -> permit rate is halved
+        governor._update(cpu_percent=100, permit_rate=100)
+        assert governor.throttling
+        assert governor._bucket.rate == 50
+
+        # rate never drops below minimum
+        governor._update(cpu_percent=1000, permit_rate=1)
+        assert governor._bucket.rate == governor.min_rate
+
+        # back within budget
+        governor._update(cpu_percent=10, permit_rate=1)
+        assert not governor.throttling
+    finally:
+        governor.stop()
+
+
+def test_bandwidth_limiter_profiles():
+
+    profiles = [
+        {"start": "09:00", "end": "17:30", "upload": 1000, "download": 2000},
+        {"start": "22:00", "end": "06:00", "upload": 500},
+    ]
+
+    up = BandwidthLimiter(rate=0, profiles=profiles, direction="upload")
+    down = BandwidthLimiter(rate=3000, profiles=profiles, direction="download")
+
+    assert up.rate_at(datetime(2021, 1, 1, 8, 59)) == 0
+    assert up.rate_at(datetime(2021, 1, 1, 9, 0)) == 1000
+    assert up.rate_at(datetime(2021, 1, 1, 17, 30)) == 0
+    assert up.rate_at(datetime(2021, 1, 1, 23, 0)) == 500
+    assert up.rate_at(datetime(2021, 1, 1, 3, 0)) == 500
+
+    assert down.rate_at(datetime(2021, 1, 1, 12, 0)) == 2000
+    # the default rate applies if a profile does not set the direction
+    assert down.rate_at(datetime(2021, 1, 1, 23, 0)) == 3000
+    assert down.rate_at(datetime(2021, 1, 1, 18, 0)) == 3000
+
+
+def test_bandwidth_limiter_invalid_profile():
+    with pytest.raises(ValueError):
+        BandwidthLimiter(profiles=[{"start": "25:00", "end": "26:00"}])
+
+
+def test_concurrency_controller_slots():
+
+    controller = ConcurrencyController(initial=2)
+
+    controller.acquire()
+    controller.acquire()
+    assert controller.in_flight == 2
+
+    released = Event()
+
+    def acquire_third():
+        controller.acquire()
+        released.set()
+
+    Thread(target=acquire_third, daemon=True).start()
+    assert not released.wait(0.1)
+
+    controller.release()
+    assert released.wait(1)
+
+    # no slot is available without blocking until one is released
+    assert not controller.try_acquire()
+
+    controller.release()
+    assert controller.try_acquire()
+    assert controller.in_flight == 2
+
+
+def test_concurrency_controller_aimd():
+
+    controller = ConcurrencyController(initial=8, minimum=1, maximum=10, window=0)
+
+    # saturated window without problems -> additive increase
+    for _ in range(8):
+        controller.acquire()
+    controller.record(0.1, nbytes=1000)
+    assert controller.limit == 9
+
+    # rate limit error -> multiplicative decrease
+    controller.record_rate_limit()
+    assert controller.limit == 4
+
+    # latency far above the baseline -> decrease by a quarter
+    controller.record(10, nbytes=1000)
+    assert controller.limit == 3
+
+    assert controller.state["rate_limits"] == 1
+
+
+def test_backoff_coordinator_exponential():
+
+    coordinator = BackoffCoordinator(base_delay=1, max_delay=4, jitter=0)
+
+    delays = [coordinator.record_rate_limit("files/upload") for _ in range(4)]
+
+    assert 0.5 <= delays[0] <= 1
+    assert 1 <= delays[1] <= 2
+    assert 2 <= delays[2] <= 4
+    assert 2 <= delays[3] <= 4  # capped at max_delay
+
+    assert coordinator.backoff_remaining() > 1
+    assert coordinator.stats["files/upload"] == dict(rate_limits=4, consecutive=4)
+
+    coordinator.record_success("files/upload")
+    assert coordinator.stats["files/upload"] == dict(rate_limits=4, consecutive=0)
+
+
+def test_backoff_coordinator_retry_after():
+    coordinator = BackoffCoordinator(base_delay=1)
+    assert coordinator.record_rate_limit("files/upload", retry_after=30) == 30
+
+
+def test_backoff_coordinator_wait():
+
+    coordinator = BackoffCoordinator(jitter=0)
+
+    coordinator.set_backoff("files/list_folder/longpoll", 0.2)
+
+    # backoff for a single endpoint does not affect others
+    assert coordinator.wait("files/upload") == 0
+    assert coordinator.wait() == 0
+
+    t0 = time.monotonic()
+    coordinator.wait("files/list_folder/longpoll")
+    assert time.monotonic() - t0 >= 0.2
+
+
+def test_backoff_coordinator_listeners():
+
+    coordinator = BackoffCoordinator()
+    controller = ConcurrencyController(initial=8)
+
+    coordinator.add_listener(controller.record_rate_limit)
+    coordinator.record_rate_limit("files/upload")
+    assert controller.state["rate_limits"] == 1
+
+    # listeners are weakly referenced
+    del controller
+    coordinator.record_rate_limit("files/upload")
+    assert coordinator._listeners == []
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+from threading import Event, Thread
+
+import pytest
+
+from maestral.utils.trie import PathTrie
+
+
+def test_mapping():
+
+    trie = PathTrie()
+
+    trie["/a/b"] = 1
+    trie["/a/b/c"] = 2
+    trie["/a/b"] = 3
+
+    assert len(trie) == 2
+    assert trie["/a/b"] == 3
+    assert trie.get("/a") is None
+    assert "/a/b/c" in trie
+    assert sorted(trie) == ["/a/b", "/a/b/c"]
+
+    assert trie.pop("/a/b") == 3
+    assert trie.pop("/a/b", None) is None
+
+    with pytest.raises(KeyError):
+        del trie["/a/b/c/d"]
+
+    del trie["/a/b/c"]
+
+    assert len(trie) == 0
+    assert trie.subtree_count("/") == 0
+
+    # empty nodes are removed
+    assert trie._root.children == {}
+
+
+def test_subtree():
+
+    trie = PathTrie()
+
+    trie["/a/b/c"] = 1
+    trie["/a/d"] = 2
+    trie["/ab"] = 3
+
+    assert trie.subtree_count("/a") == 2
+    assert trie.subtree_count("/a/b") == 1
+    assert trie.subtree_count("/a/x") == 0
+
+    assert trie.subtree_item("/a/b") == ("/a/b/c", 1)
+    assert trie.subtree_item("/a/d") == ("/a/d", 2)
+    assert trie.subtree_item("/a/b/c/d") is None
+
+    assert sorted(trie.subtree_items("/a")) == [("/a/b/c", 1), ("/a/d", 2)]
+
+    trie["/a"] = 0
+
+    # the value of the path itself is preferred
+    assert trie.subtree_item("/a") == ("/a", 0)
+
+
+def test_concurrent_reads():
+
+    trie = PathTrie()
+    done = Event()
+
+    def write():
+        while not done.is_set():
+            for i in range(100):
+                trie[f"/a/{i}"] = i
+            for i in range(100):
+                del trie[f"/a/{i}"]
+
+    writer = Thread(target=write)
+    writer.start()
+
+    try:
+        for _ in range(5000):
+            values = list(trie.values())
+            items = list(trie.items())
+            assert len(set(values)) == len(values)
+            assert all(trie_key.startswith("/a/") for trie_key, _ in items)
+    finally:
+        done.set()
+        writer.join()